@@ -14,34 +14,163 @@
 """
 Expert System Test Runner
 Runs all tests and shows summary
+
+Results are cached in .test_runner_cache/ keyed by the test input and
+the interpreter sources; pass --no-cache to force a fresh run.
 """
 
+import io
+import os
 import sys
-import subprocess
+import json
+import time
+import signal
+import hashlib
+import tempfile
+from contextlib import redirect_stdout, redirect_stderr
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+_ROOT = Path(__file__).resolve().parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from expert_system import run_expert_system  # noqa: E402
+
+TEST_TIMEOUT = 5
+
+CACHE_DIR = Path('.test_runner_cache')
+CACHE_MAX_AGE_DAYS = 7
+SOURCE_FILES = (
+    'expert_system.py',
+    'parser.py',
+    'lexer.py',
+    'inference_engine.py',
+    'knowledge_graph.py',
+)
+
+
+def _cache_key(test_file):
+    """Hash the test input together with the sources that produce output."""
+    digest = hashlib.sha256()
+    for path in (test_file,) + SOURCE_FILES:
+        digest.update(path.encode())
+        digest.update(b'\0')
+        digest.update(Path(path).read_bytes())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _cache_load(key):
+    """Return the cached (returncode, stdout, stderr) or None on a miss."""
+    try:
+        data = json.loads((CACHE_DIR / f"{key}.json").read_text())
+        return data['returncode'], data['stdout'], data['stderr']
+    except (OSError, ValueError, KeyError):
+        return None
+
 
-def run_test(test_file):
+def _cache_store(key, returncode, stdout, stderr):
+    """Write a cache entry atomically."""
+    CACHE_DIR.mkdir(exist_ok=True)
+    data = {'returncode': returncode, 'stdout': stdout, 'stderr': stderr}
+    fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, CACHE_DIR / f"{key}.json")
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def evict_stale_cache(max_age_days=CACHE_MAX_AGE_DAYS):
+    """Remove cache entries that have not been written for a while."""
+    if not CACHE_DIR.is_dir():
+        return
+    cutoff = time.time() - max_age_days * 86400
+    for entry in CACHE_DIR.iterdir():
+        try:
+            if entry.stat().st_mtime < cutoff:
+                entry.unlink()
+        except OSError:
+            pass
+
+
+class _TestTimeout(BaseException):
+    """Raised by SIGALRM; a BaseException so run_expert_system can't eat it."""
+
+
+def _on_timeout(signum, frame):
+    raise _TestTimeout()
+
+
+def _run_in_process(test_file):
+    """Run the expert system in this process, capturing its output."""
+    out, err = io.StringIO(), io.StringIO()
+    has_timer = hasattr(signal, 'setitimer')
+    if has_timer:
+        previous = signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, TEST_TIMEOUT)
+    try:
+        with redirect_stdout(out), redirect_stderr(err):
+            returncode = run_expert_system(test_file, verbose=False)
+    finally:
+        if has_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    return returncode, out.getvalue(), err.getvalue()
+
+
+def run_test(test_file, use_cache=True):
     """Run a single test file and return success status."""
+    key = None
+    if use_cache:
+        try:
+            key = _cache_key(test_file)
+        except OSError:
+            key = None
+        cached = _cache_load(key) if key else None
+        if cached is not None:
+            returncode, stdout, stderr = cached
+            return returncode == 0, stdout, stderr
+
     try:
-        result = subprocess.run(
-            ['python3', 'expert_system.py', test_file],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        return result.returncode == 0, result.stdout, result.stderr
-    except subprocess.TimeoutExpired:
+        returncode, stdout, stderr = _run_in_process(test_file)
+        if key:
+            _cache_store(key, returncode, stdout, stderr)
+        return returncode == 0, stdout, stderr
+    except _TestTimeout:
         return False, "", "Timeout"
     except Exception as e:
         return False, "", str(e)
 
 
+def find_tests(directory='test'):
+    """List test inputs, largest first so long runs start early."""
+    try:
+        with os.scandir(directory) as it:
+            entries = [
+                e for e in it
+                if e.name.endswith('.txt') and e.is_file()
+            ]
+    except FileNotFoundError:
+        return []
+    entries.sort(key=lambda e: -e.stat().st_size)
+    return entries
+
+
 def main():
     """Run all tests and show summary."""
-    test_files = sorted(Path('.').glob('test/*.txt'))
+    use_cache = '--no-cache' not in sys.argv[1:]
+    if use_cache:
+        evict_stale_cache()
+
+    entries = find_tests()
 
-    if not test_files:
+    if not entries:
         print("No test files found!")
         return 1
 
@@ -51,19 +180,25 @@ def main():
     print()
 
     results = []
-    for test_file in test_files:
-        test_path = str(test_file)
-        test_name = test_file.name
-        success, stdout, stderr = run_test(test_path)
+    write = sys.stdout.write
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        futures = {
+            entry.name: pool.submit(run_test, entry.path, use_cache)
+            for entry in entries
+        }
 
-        status = "OK PASS" if success else "KO FAIL"
-        results.append((test_name, success))
+        for test_name in sorted(futures):
+            success, stdout, stderr = futures[test_name].result()
 
-        print(f"{status} - {test_name}")
+            status = "OK PASS" if success else "KO FAIL"
+            results.append((test_name, success))
 
-        if not success and stderr:
-            print(f"  Error: {stderr[:100]}")
+            line = f"{status} - {test_name}\n"
+            if not success and stderr:
+                line += f"  Error: {stderr[:100]}\n"
+            write(line)
 
+    sys.stdout.flush()
     print()
     print("=" * 70)
     print("SUMMARY")
@@ -16,6 +16,7 @@ Debug version with tracing
 """
 
 import sys
+from pathlib import Path
 
 from parser import parse_input_file
 from inference_engine import InferenceEngine
@@ -28,8 +29,7 @@ def main():
 
     input_file = sys.argv[1]
 
-    with open(input_file, 'r') as f:
-        content = f.read()
+    content = Path(input_file).read_text()
 
     rules, initial_facts, queries = parse_input_file(content)
 
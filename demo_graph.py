@@ -25,6 +25,10 @@ from pathlib import Path
 from parser import parse_input_file
 from knowledge_graph import KnowledgeGraph
 
+_LETTERS = tuple(chr(c) for c in range(ord('A'), ord('Z') + 1))
+# Display order of graph facts: negated conclusions first, as sorted() would.
+_FACT_ORDER = tuple('!' + c for c in _LETTERS) + _LETTERS
+
 
 def demonstrate_graph(content: str | None = None):
     """Demonstrate knowledge graph features.
@@ -59,8 +63,10 @@ A <=> G
 
     print("FACT NODES:")
     print("-" * 70)
-    for fact_name in sorted(graph.fact_nodes.keys()):
-        fact_node = graph.fact_nodes[fact_name]
+    for fact_name in _FACT_ORDER:
+        fact_node = graph.fact_nodes.get(fact_name)
+        if fact_node is None:
+            continue
         initial_mark = " (INITIAL)" if fact_node.is_initial else ""
         print(f"  {fact_name}{initial_mark}")
         print(f"    -> Concluded by: {len(fact_node.concluding_rules)} rule(s)"
@@ -105,12 +111,12 @@ A <=> G
     if fact_node:
         print("Starting from fact 'D':")
         print("  <- Rules that conclude D:")
-        for rule_node in fact_node.concluding_rules:
+        for rule_node in graph.get_rules_concluding('D'):
             cond = [f.fact for f in rule_node.condition_facts]
             print(f"      R{rule_node.rule_id}: {cond} => D")
 
         print("  -> Rules that use D:")
-        for rule_node in fact_node.used_by_rules:
+        for rule_node in graph.get_rules_using('D'):
             concl = [f.fact for f in rule_node.conclusion_facts]
             print(f"      R{rule_node.rule_id}: D => {concl}")
     print()
@@ -18,12 +18,15 @@ Main entry point for the expert system.
 Usage: python3 expert_system.py <input_file>
 """
 
+import re
 import sys
 from pathlib import Path
 
 from parser import parse_input_file
 from inference_engine import InferenceEngine, TruthValue
 
+_FACT_RE = re.compile(r'!?[A-Z]')
+
 
 def print_error(message: str):
     """Print error message to stderr."""
@@ -75,28 +78,28 @@ def validate_input(rules, initial_facts, queries):
     for rule in rules:
         all_facts.update(rule.get_all_facts())
 
-    for fact in all_facts:
-        if fact.startswith('!'):
-            fact = fact[1:]
-        if not (len(fact) == 1 and fact.isupper()):
-            msg = (
-                f"Invalid fact name: {fact}. "
-                "Facts must be single uppercase letters (A-Z)."
-            )
-            return False, msg
-
-    for letter_code in range(ord('A'), ord('Z') + 1):
-        letter = chr(letter_code)
-        if letter in all_facts and ('!' + letter) in all_facts:
-            return False, f"Contradiction: {letter} "
-            "is both asserted and negated."
-
-    for q in queries:
-        qfact = q[1:] if q.startswith('!') else q
-        if not (len(qfact) == 1 and qfact.isupper()):
-            return False, f"Invalid query: {q}. "
+    bad = next((f for f in all_facts if not _FACT_RE.fullmatch(f)), None)
+    if bad is not None:
+        msg = (
+            f"Invalid fact name: {bad.removeprefix('!')}. "
+            "Facts must be single uppercase letters (A-Z)."
+        )
+        return False, msg
+
+    negated = {f[1:] for f in all_facts if f.startswith('!')}
+    contradictions = negated & all_facts
+    if contradictions:
+        letter = min(contradictions)
+        return False, (
+            f"Contradiction: {letter} is both asserted and negated."
+        )
+
+    bad = next((q for q in queries if not _FACT_RE.fullmatch(q)), None)
+    if bad is not None:
+        return False, (
+            f"Invalid query: {bad}. "
             "Queries must be single uppercase letters (A-Z)."
-        pass
+        )
 
     return True, ""
 
@@ -117,8 +120,7 @@ def run_expert_system(input_file: str, verbose: bool = True):
         return 1
 
     try:
-        with open(input_file, 'r') as f:
-            content = f.read()
+        content = Path(input_file).read_text()
     except Exception as e:
         print_error(f"Failed to read input file: {e}")
         return 1
@@ -28,10 +28,46 @@ from parser import (
 )
 from inference_engine import InferenceEngine, TruthValue
 
+_ALPHABET = tuple(chr(c) for c in range(ord('A'), ord('Z') + 1))
+
+_OP_MAP = {
+    NodeType.AND: "∧",
+    NodeType.OR: "∨",
+    NodeType.XOR: "⊕",
+    NodeType.IMPLIES: "⇒",
+    NodeType.IFF: "⇔"
+}
+
+_DOT_HEADER = (
+    "digraph JustificationGraph {\n"
+    "  rankdir=BT;\n"
+    "  node [shape=box, style=rounded];\n"
+    "\n"
+)
+_DOT_NODE_TMPL = (
+    '  "{fact}" [label="{fact}\\n{value}", '
+    'fillcolor={color}, style=filled, shape={shape}];\n'
+)
+_DOT_EDGE_TMPL = '  "{source}" -> "{target}" [label="{label}"];\n'
+_JSON_SEPARATORS = (",", ":")
+_DOT_STYLE = {
+    "initial": ("lightblue", "box"),
+    "derived": ("white", "box"),
+}
+_QUERY_COLORS = {
+    TruthValue.TRUE: "lightgreen",
+    TruthValue.FALSE: "lightcoral",
+    TruthValue.UNDETERMINED: "lightyellow",
+}
+
 
 class ProvenanceNode:
     """Represents a node in the justification graph."""
 
+    __slots__ = (
+        "fact", "value", "node_type", "supporting_facts", "rules_used"
+    )
+
     def __init__(
         self,
         fact: str,
@@ -42,7 +78,7 @@ class ProvenanceNode:
         self.value = value
         self.node_type = node_type
         self.supporting_facts: Set[str] = set()
-        self.rules_used: List[str] = []
+        self.rules_used: Dict[str, None] = {}
 
     def __repr__(self):
         return f"ProvenanceNode({self.fact}, {self.value.name})"
@@ -57,9 +93,25 @@ class JustificationGraph:
         self.engine = InferenceEngine(rules, initial_facts)
         self.nodes: Dict[str, ProvenanceNode] = {}
         self.edges: List[Tuple[str, str, str]] = []
+        self._edge_set: Set[Tuple[str, str, str]] = set()
+        self._query_cache: Dict[str, TruthValue] = {}
+        # Keyed by id(node) and stored with the node, so an entry is
+        # only used for the node it was made from, not a later one
+        # that reuses a freed node's id.
+        self._expr_cache: Dict[int, Tuple[ASTNode, TruthValue]] = {}
+        self._fmt_cache: Dict[int, Tuple[ASTNode, str]] = {}
 
     def format_node(self, node: ASTNode) -> str:
         """Format AST node as string."""
+        cached = self._fmt_cache.get(id(node))
+        if cached is not None and cached[0] is node:
+            return cached[1]
+        text = self._format_node_uncached(node)
+        self._fmt_cache[id(node)] = (node, text)
+        return text
+
+    def _format_node_uncached(self, node: ASTNode) -> str:
+        """Format an AST node that has not been formatted yet."""
         if isinstance(node, FactNode):
             return node.fact
         elif isinstance(node, UnaryOpNode):
@@ -68,14 +120,7 @@ class JustificationGraph:
         elif isinstance(node, BinaryOpNode):
             left = self.format_node(node.left)
             right = self.format_node(node.right)
-            op_map = {
-                NodeType.AND: "∧",
-                NodeType.OR: "∨",
-                NodeType.XOR: "⊕",
-                NodeType.IMPLIES: "⇒",
-                NodeType.IFF: "⇔"
-            }
-            op = op_map.get(node.node_type, "?")
+            op = _OP_MAP.get(node.node_type, "?")
             return f"({left} {op} {right})"
         return "?"
 
@@ -90,6 +135,14 @@ class JustificationGraph:
         """Extract all fact names from AST node."""
         return node.get_facts()
 
+    def _cached_query(self, fact: str) -> TruthValue:
+        """Query the engine once per fact; values are fixed while tracing."""
+        value = self._query_cache.get(fact)
+        if value is None:
+            value = self.engine.query(fact)
+            self._query_cache[fact] = value
+        return value
+
     def build_graph(self, queries: List[str]):
         """Build justification graph by tracing queries."""
         for fact in self.initial_facts:
@@ -115,7 +168,7 @@ class JustificationGraph:
 
         visited.add(fact)
 
-        result = self.engine.query(fact)
+        result = self._cached_query(fact)
 
         if fact not in self.nodes:
             node_type = "query" if is_query else "derived"
@@ -127,25 +180,28 @@ class JustificationGraph:
         if fact in self.initial_facts:
             return
 
-        if fact in self.engine.rules_concluding:
-            for rule in self.engine.rules_concluding[fact]:
+        rules = self.engine.rules_concluding.get(fact)
+        if rules:
+            for rule in rules:
                 cond_value = self._evaluate_expression_trace(
                     rule.condition, visited
                 )
 
                 if cond_value == TruthValue.TRUE:
                     rule_str = self.format_rule(rule)
-                    self.nodes[fact].rules_used.append(rule_str)
+                    provenance = self.nodes[fact]
+                    provenance.rules_used[rule_str] = None
 
-                    supporting = self.get_facts_from_node(rule.condition)
+                    supporting = rule.condition.get_facts()
+                    provenance.supporting_facts.update(supporting)
                     for support_fact in supporting:
-                        self.nodes[fact].supporting_facts.add(support_fact)
                         edge = (
                             support_fact,
                             fact,
                             rule_str
                         )
-                        if edge not in self.edges:
+                        if edge not in self._edge_set:
+                            self._edge_set.add(edge)
                             self.edges.append(edge)
 
                         self._trace_fact(support_fact, False, visited)
@@ -156,9 +212,22 @@ class JustificationGraph:
         visited: Set[str]
     ) -> TruthValue:
         """Evaluate expression and trace dependencies."""
+        cached = self._expr_cache.get(id(node))
+        if cached is not None and cached[0] is node:
+            return cached[1]
+        value = self._evaluate_expression_uncached(node, visited)
+        self._expr_cache[id(node)] = (node, value)
+        return value
+
+    def _evaluate_expression_uncached(
+        self,
+        node: ASTNode,
+        visited: Set[str]
+    ) -> TruthValue:
+        """Evaluate an expression not seen before during this trace."""
         if isinstance(node, FactNode):
             self._trace_fact(node.fact, False, visited)
-            return self.engine.query(node.fact)
+            return self._cached_query(node.fact)
         elif isinstance(node, UnaryOpNode):
             if node.node_type == NodeType.NOT:
                 operand_value = self._evaluate_expression_trace(
@@ -174,6 +243,12 @@ class JustificationGraph:
             left_value = self._evaluate_expression_trace(
                 node.left, visited
             )
+            if (node.node_type == NodeType.AND
+                    and left_value == TruthValue.FALSE):
+                return TruthValue.FALSE
+            if (node.node_type == NodeType.OR
+                    and left_value == TruthValue.TRUE):
+                return TruthValue.TRUE
             right_value = self._evaluate_expression_trace(
                 node.right, visited
             )
@@ -187,79 +262,98 @@ class JustificationGraph:
 
         return TruthValue.UNDETERMINED
 
+    def _dot_node_line(self, fact: str, node: ProvenanceNode) -> str:
+        """Format a single DOT node statement."""
+        if node.node_type == "query":
+            color = _QUERY_COLORS[node.value]
+            shape = "doubleoctagon"
+        else:
+            color, shape = _DOT_STYLE.get(
+                node.node_type, _DOT_STYLE["derived"]
+            )
+        return _DOT_NODE_TMPL.format(
+            fact=fact, value=node.value.name, color=color, shape=shape
+        )
+
     def export_dot(self, output_file: str):
         """Export graph in DOT format for Graphviz."""
-        lines = ["digraph JustificationGraph {"]
-        lines.append("  rankdir=BT;")
-        lines.append("  node [shape=box, style=rounded];")
-        lines.append("")
-
-        for fact, node in self.nodes.items():
-            if node.node_type == "initial":
-                color = "lightblue"
-                shape = "box"
-            elif node.node_type == "query":
-                color = "lightgreen" if node.value == TruthValue.TRUE else (
-                    "lightcoral" if node.value == TruthValue.FALSE
-                    else "lightyellow"
-                )
-                shape = "doubleoctagon"
-            else:
-                color = "white"
-                shape = "box"
-
-            label = f"{fact}\\n{node.value.name}"
-            lines.append(
-                f'  "{fact}" [label="{label}", '
-                f'fillcolor={color}, style=filled, shape={shape}];'
+        with open(output_file, 'w') as f:
+            f.write(_DOT_HEADER)
+            f.writelines(
+                self._dot_node_line(fact, node)
+                for fact, node in self.nodes.items()
             )
-
-        lines.append("")
-
-        for source, target, rule in self.edges:
-            rule_label = rule.replace('"', '\\"')
-            lines.append(
-                f'  "{source}" -> "{target}" '
-                f'[label="{rule_label}"];'
+            f.write("\n")
+            f.writelines(
+                _DOT_EDGE_TMPL.format(
+                    source=source,
+                    target=target,
+                    label=rule.replace('"', '\\"'),
+                )
+                for source, target, rule in self.edges
             )
-
-        lines.append("}")
-
-        with open(output_file, 'w') as f:
-            f.write('\n'.join(lines))
-
-    def export_json(self, output_file: str):
-        """Export graph in JSON format."""
-        graph_data = {
-            "nodes": [],
-            "edges": [],
-            "metadata": {
-                "total_rules": len(self.rules),
-                "initial_facts": sorted(self.initial_facts),
-                "total_nodes": len(self.nodes)
-            }
+            f.write("}")
+
+    def _json_metadata(self) -> Dict:
+        """Summary block of the JSON export."""
+        return {
+            "total_rules": len(self.rules),
+            "initial_facts": [
+                c for c in _ALPHABET if c in self.initial_facts
+            ],
+            "total_nodes": len(self.nodes)
         }
 
+    def _json_nodes(self):
+        """Yield one JSON record per provenance node."""
         for fact, node in self.nodes.items():
-            node_data = {
+            yield {
                 "id": fact,
                 "value": node.value.name,
                 "type": node.node_type,
                 "supporting_facts": sorted(node.supporting_facts),
-                "rules_used": node.rules_used
+                "rules_used": list(node.rules_used)
             }
-            graph_data["nodes"].append(node_data)
 
+    def _json_edges(self):
+        """Yield one JSON record per justification edge."""
         for source, target, rule in self.edges:
-            edge_data = {
+            yield {
                 "from": source,
                 "to": target,
                 "rule": rule
             }
-            graph_data["edges"].append(edge_data)
+
+    def export_json(self, output_file: str, pretty: bool = False):
+        """Export graph in JSON format.
+
+        The default output is compact and written record by record;
+        pretty=True builds the whole document and indents it.
+        """
+        if pretty:
+            graph_data = {
+                "nodes": list(self._json_nodes()),
+                "edges": list(self._json_edges()),
+                "metadata": self._json_metadata()
+            }
+            with open(output_file, 'w') as f:
+                json.dump(graph_data, f, indent=2)
+            return
 
         with open(output_file, 'w') as f:
-            json.dump(graph_data, f, indent=2)
+            f.write('{"metadata":')
+            json.dump(self._json_metadata(), f, separators=_JSON_SEPARATORS)
+            for key, records in (
+                ("nodes", self._json_nodes()),
+                ("edges", self._json_edges()),
+            ):
+                f.write(f',"{key}":[')
+                for i, record in enumerate(records):
+                    if i:
+                        f.write(',')
+                    json.dump(record, f, separators=_JSON_SEPARATORS)
+                f.write(']')
+            f.write('}')
 
 
 def main():
@@ -273,6 +367,7 @@ def main():
         print("Options:")
         print("  --dot <file>   Export to DOT format (Graphviz)")
         print("  --json <file>  Export to JSON format")
+        print("  --pretty       Indent the JSON export")
         print()
         print("Examples:")
         print("  python3 graph_exporter.py test.txt --dot graph.dot")
@@ -291,6 +386,7 @@ def main():
 
     dot_output = None
     json_output = None
+    pretty = False
 
     i = 2
     while i < len(sys.argv):
@@ -300,6 +396,9 @@ def main():
         elif sys.argv[i] == "--json" and i + 1 < len(sys.argv):
             json_output = sys.argv[i + 1]
             i += 2
+        elif sys.argv[i] == "--pretty":
+            pretty = True
+            i += 1
         else:
             print(f"Unknown option: {sys.argv[i]}", file=sys.stderr)
             return 1
@@ -310,8 +409,7 @@ def main():
         return 1
 
     try:
-        with open(input_file, 'r') as f:
-            content = f.read()
+        content = Path(input_file).read_text()
         rules, initial_facts, queries = parse_input_file(content)
     except Exception as e:
         print(f"Error parsing input file: {e}", file=sys.stderr)
@@ -333,7 +431,7 @@ def main():
         )
 
     if json_output:
-        graph.export_json(json_output)
+        graph.export_json(json_output, pretty=pretty)
         print(f"JSON export written to: {json_output}")
 
     return 0
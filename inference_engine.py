@@ -17,21 +17,157 @@ Determines if queries are true, false, or undetermined based
 on rules and facts.
 """
 
-from typing import Set, Dict, List
-from enum import Enum, auto
-from parser import Rule, ASTNode, NodeType, FactNode, UnaryOpNode, BinaryOpNode
-from knowledge_graph import KnowledgeGraph
-
+import math
+from typing import Set, Dict, List, Optional, Tuple
+from enum import IntEnum
+from parser import (
+    Rule, ASTNode, NodeType, CompiledExpr, compile_ast, fact_bits
+)
+from array import array
+from knowledge_graph import (
+    KnowledgeGraph, FACT_SLOTS, OP_FACT, OP_NOT, OP_AND, OP_OR, OP_XOR,
+    OP_IMPLIES
+)
+
+
+class TruthValue(IntEnum):
+    """
+    Possible truth values for facts.
 
-class TruthValue(Enum):
-    """Possible truth values for facts."""
-    TRUE = auto()
-    FALSE = auto()
-    UNDETERMINED = auto()
+    Encoded as Kleene integers so the three-valued connectives reduce
+    to integer arithmetic: AND is min, OR is max, NOT is negation.
+    """
+    FALSE = -1
+    UNDETERMINED = 0
+    TRUE = 1
 
     def __repr__(self):
         return self.name
 
+    def __str__(self):
+        return f"{type(self).__name__}.{self.name}"
+
+    def __format__(self, format_spec):
+        return format(str(self), format_spec)
+
+
+_FROM_INT = {
+    -1: TruthValue.FALSE,
+    0: TruthValue.UNDETERMINED,
+    1: TruthValue.TRUE,
+}
+
+
+def _kleene_and(left: int, right: int) -> int:
+    """AND over Kleene integers."""
+    return min(left, right)
+
+
+def _kleene_or(left: int, right: int) -> int:
+    """OR over Kleene integers."""
+    return max(left, right)
+
+
+def _kleene_xor(left: int, right: int) -> int:
+    """
+    XOR over Kleene integers: the product is 0 when either side is
+    undetermined and -1 when the sides differ.
+    """
+    return -(left * right)
+
+
+def _kleene_implies(left: int, right: int) -> int:
+    """IMPLIES over Kleene integers: !left | right."""
+    return max(-left, right)
+
+
+def _kleene_iff(left: int, right: int) -> int:
+    """IFF over Kleene integers: equal sides give 1."""
+    return left * right
+
+
+def _truth_table(combine) -> Tuple[TruthValue, ...]:
+    """Tabulate a Kleene connective, indexed by 3 * left + right + 4."""
+    return tuple(
+        _FROM_INT[combine(left, right)]
+        for left in (-1, 0, 1)
+        for right in (-1, 0, 1)
+    )
+
+
+_AND_TABLE = _truth_table(_kleene_and)
+_OR_TABLE = _truth_table(_kleene_or)
+_XOR_TABLE = _truth_table(_kleene_xor)
+_IMPLIES_TABLE = _truth_table(_kleene_implies)
+_IFF_TABLE = _truth_table(_kleene_iff)
+
+
+def _eval_postfix_masks(
+    opcodes: array,
+    fids: array,
+    true_mask: int,
+    false_mask: int
+) -> int:
+    """
+    Run flattened postfix code whose OP_FACT args are fact bit indexes,
+    reading each fact straight from the known-true / known-false masks
+    (a fact in neither is undetermined). Returns a Kleene integer.
+    """
+    stack: List[int] = []
+    push = stack.append
+    pop = stack.pop
+    for op, fid in zip(opcodes, fids):
+        if op == OP_FACT:
+            push((true_mask >> fid & 1) - (false_mask >> fid & 1))
+        elif op == OP_NOT:
+            push(-pop())
+        else:
+            right = pop()
+            left = pop()
+            if op == OP_AND:
+                push(left if left < right else right)
+            elif op == OP_OR:
+                push(left if left > right else right)
+            elif op == OP_XOR:
+                push(-(left * right))
+            elif op == OP_IMPLIES:
+                push(-left if -left > right else right)
+            else:
+                push(left * right)
+    return stack[-1]
+
+
+_LETTER_IDS = 26
+
+_DEFINITE_PARENTS = (NodeType.AND,)
+_POSSIBLE_PARENTS = (NodeType.OR, NodeType.XOR)
+
+
+def _conclusion_effects(conclusion: ASTNode) -> Dict[str, TruthValue]:
+    """
+    Map each positive fact a conclusion establishes to what firing the
+    rule implies for it: TRUE when only AND nodes lead to the fact, and
+    UNDETERMINED once an OR or XOR lies on the path (the rule proves the
+    disjunction, not the fact). Negated facts, NOT over non-facts and
+    nested => / <=> establish nothing here; negations are indexed
+    separately under '!X' by the knowledge graph.
+    """
+    effects: Dict[str, TruthValue] = {}
+    stack = [(conclusion, TruthValue.TRUE)]
+    while stack:
+        node, effect = stack.pop()
+        node_type = node.node_type
+        if node_type is NodeType.FACT:
+            effects[node.fact] = max(
+                effects.get(node.fact, TruthValue.UNDETERMINED), effect)
+        elif node_type in _DEFINITE_PARENTS:
+            stack.append((node.right, effect))
+            stack.append((node.left, effect))
+        elif node_type in _POSSIBLE_PARENTS:
+            stack.append((node.right, TruthValue.UNDETERMINED))
+            stack.append((node.left, TruthValue.UNDETERMINED))
+    return effects
+
 
 class InferenceEngine:
     """
@@ -55,19 +191,43 @@ class InferenceEngine:
 
     def __init__(self, rules: List[Rule], initial_facts: Set[str]):
         self.rules = rules
-        self.initial_facts = initial_facts
+        self.initial_facts = set(initial_facts)
+        self._assumptions: List[str] = []
 
         self.knowledge_graph = KnowledgeGraph(rules, initial_facts)
 
-        self.cache: Dict[str, TruthValue] = {}
+        self.all_facts: Set[str] = self.knowledge_graph.get_all_facts()
 
-        self.evaluating: Set[str] = set()
+        self._fact_id: Dict[str, int] = {}
+        self._fact_names: List[Optional[str]] = [None] * _LETTER_IDS
+        for fact in sorted(self.all_facts | set(initial_facts)):
+            self._intern(fact)
 
-        self.all_facts: Set[str] = self.knowledge_graph.get_all_facts()
+        self._initial_mask = fact_bits(initial_facts)
+
+        self._known_true = 0
+        self._known_false = 0
+        self._known_undetermined = 0
+        self._evaluating = 0
+        self._cycle_cuts = 0
+        self._epoch = 0
+        self._cond_cache: Dict[int, Tuple[int, TruthValue]] = {}
 
         self.rules_concluding: Dict[str, List[Rule]] = {}
         self._index_rules()
 
+        self._rule_cond: List[CompiledExpr] = []
+        self._rule_cond_ids: List[Tuple[int, ...]] = []
+        self._rule_cond_mask: List[int] = []
+        self._rule_opcodes: List[array] = []
+        self._rule_fact_args: List[array] = []
+        self._rule_concl_effect: List[Dict[int, TruthValue]] = []
+        self._rules_concluding_idx: Dict[int, List[int]] = {}
+        self._rules_negating_idx: Dict[int, List[int]] = {}
+        self._build_rule_arrays()
+
+        self._cyclic_mask = self._find_cyclic_facts()
+
     def _index_rules(self):
         """
         Build legacy index from knowledge graph for backward compatibility.
@@ -76,74 +236,207 @@ class InferenceEngine:
         FactGraphNode.concluding_rules, but we keep this index for
         compatibility with existing code that uses rules_concluding dict.
         """
-        for fact_name, fact_node in self.knowledge_graph.fact_nodes.items():
+        graph = self.knowledge_graph
+        for fact_name, fact_node in graph.fact_nodes.items():
             if fact_node.concluding_rules:
                 self.rules_concluding[fact_name] = [
-                    rule_node.rule for rule_node in fact_node.concluding_rules
+                    rule_node.rule
+                    for rule_node in graph.get_rules_concluding(fact_name)
                 ]
 
-    def _get_concluded_facts(self, node: ASTNode) -> Set[str]:
+    def _intern(self, fact: str) -> int:
+        """
+        Return the bit index of a fact, assigning one if it is new.
+        Facts A-Z take the bit parser.fact_bits gives them, so the
+        parser's fact bit sets are valid engine masks; anything else
+        is numbered after them.
         """
-        Get all facts that can be directly concluded from a conclusion node.
-        For AND conclusions (A + B), returns both A and B.
-        For OR/XOR conclusions (A | B, A ^ B), returns both A and B.
-        For simple facts, returns just that fact.
-        For NOT, returns the negated fact.
+        fid = self._fact_id.get(fact)
+        if fid is None:
+            if len(fact) == 1 and 'A' <= fact <= 'Z':
+                fid = ord(fact) - 65
+                self._fact_id[fact] = fid
+                self._fact_names[fid] = fact
+                return fid
+            fid = len(self._fact_names)
+            self._fact_id[fact] = fid
+            self._fact_names.append(fact)
+        return fid
+
+    def _build_rule_arrays(self):
         """
-        if isinstance(node, FactNode):
-            return {node.fact}
-        elif isinstance(node, UnaryOpNode) and node.node_type == NodeType.NOT:
-            if isinstance(node.operand, FactNode):
-                return {f"!{node.operand.fact}"}
-            return set()
-        elif isinstance(node, BinaryOpNode):
-            if node.node_type in (NodeType.AND, NodeType.OR, NodeType.XOR):
-                return self._get_concluded_facts(
-                    node.left) | self._get_concluded_facts(
-                    node.right)
-        return set()
+        Lay the rules out as parallel arrays indexed by rule number,
+        which is the rule node's index in the knowledge graph: the
+        condition closure compiled by the graph, its postfix opcodes
+        with fact args rebased from table slots to fact ids, the ids
+        (and mask) of the condition facts and, per concluded fact id,
+        the truth value the conclusion gives that fact. The per-fact
+        indexes are slices of the graph's CSR arrays: slot k holds the
+        rules concluding fact k, slot 26 + k those concluding !k.
+        """
+        graph = self.knowledge_graph
+        for rule_node in graph.rule_nodes:
+            rule = rule_node.rule
+            cond_ids = tuple(
+                self._intern(name) for name in rule_node.cond_fact_table
+            )
+            self._rule_cond.append(rule_node.cond_fn)
+            self._rule_opcodes.append(rule_node.opcodes)
+            self._rule_fact_args.append(array('H', (
+                cond_ids[arg] if op == OP_FACT else 0
+                for op, arg in zip(rule_node.opcodes, rule_node.args)
+            )))
+            self._rule_cond_ids.append(cond_ids)
+            self._rule_cond_mask.append(rule.condition.get_fact_bits())
+            self._rule_concl_effect.append({
+                self._intern(name): effect
+                for name, effect in _conclusion_effects(
+                    rule.conclusion).items()
+            })
+
+        offsets = graph.concluding_offsets
+        data = graph.concluding_data
+        for slot in range(FACT_SLOTS):
+            start, end = offsets[slot], offsets[slot + 1]
+            if start == end:
+                continue
+            negated = slot >= 26
+            fid = self._intern(chr(65 + slot - 26 * negated))
+            target = (self._rules_negating_idx if negated
+                      else self._rules_concluding_idx)
+            target[fid] = data[start:end].tolist()
+
+    def _find_cyclic_facts(self) -> int:
+        """
+        Mask of facts that lie on a cycle of the rule dependency graph
+        (fact -> facts in the conditions of rules concluding it or its
+        negation), found with an iterative Tarjan SCC pass. Only these
+        facts can ever re-enter their own evaluation, so only they need
+        the in-progress guard.
+        """
+        deps: List[Set[int]] = []
+        for fid in range(len(self._fact_names)):
+            deps.append({
+                dep
+                for ri in (self._rules_concluding_idx.get(fid, [])
+                           + self._rules_negating_idx.get(fid, []))
+                for dep in self._rule_cond_ids[ri]
+            })
+
+        cyclic = 0
+        index: Dict[int, int] = {}
+        lowlink: Dict[int, int] = {}
+        scc_stack: List[int] = []
+        on_stack: Set[int] = set()
+        for root in range(len(deps)):
+            if root in index:
+                continue
+            work = [(root, iter(deps[root]))]
+            index[root] = lowlink[root] = len(index)
+            scc_stack.append(root)
+            on_stack.add(root)
+            while work:
+                fid, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = lowlink[child] = len(index)
+                        scc_stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(deps[child])))
+                        break
+                    if child in on_stack:
+                        lowlink[fid] = min(lowlink[fid], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[fid])
+                    if lowlink[fid] != index[fid]:
+                        continue
+                    component = []
+                    while True:
+                        member = scc_stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == fid:
+                            break
+                    if len(component) > 1 or fid in deps[fid]:
+                        for member in component:
+                            cyclic |= 1 << member
+        return cyclic
 
     def query(self, fact: str) -> TruthValue:
         """
         Determine the truth value of a fact using backward chaining.
         Returns: TRUE, FALSE, or UNDETERMINED
         """
-        if fact in self.cache:
-            return self.cache[fact]
+        fid = self._fact_id.get(fact)
+        if fid is None:
+            fid = self._intern(fact)
+        return self._query_id(fid)
 
-        if fact in self.evaluating:
+    def _query_id(self, fid: int) -> TruthValue:
+        """
+        Bit-indexed core of query(): the cache is a set of known-true /
+        known-false / known-undetermined masks and the cycle guard is a
+        mask of facts whose evaluation is in progress. Facts off every
+        dependency cycle cannot re-enter themselves and skip the guard.
+
+        UNDETERMINED is only cached when no cycle was cut while computing
+        it; a cut answer depends on which ancestors were in progress and
+        could differ when the fact is reached from elsewhere.
+        """
+        bit = 1 << fid
+        if self._known_true & bit:
+            return TruthValue.TRUE
+        if self._known_false & bit:
+            return TruthValue.FALSE
+        if self._known_undetermined & bit:
             return TruthValue.UNDETERMINED
 
-        self.evaluating.add(fact)
+        guarded = self._cyclic_mask & bit
+        if guarded:
+            if self._evaluating & bit:
+                self._cycle_cuts += 1
+                return TruthValue.UNDETERMINED
+            self._evaluating |= bit
+
+        cuts = self._cycle_cuts
 
         try:
-            result = self._evaluate_fact(fact)
-            if result != TruthValue.UNDETERMINED:
-                self.cache[fact] = result
+            result = self._evaluate_fact(self._fact_names[fid])
+            if result == TruthValue.TRUE:
+                self._known_true |= bit
+            elif result == TruthValue.FALSE:
+                self._known_false |= bit
+            elif cuts == self._cycle_cuts:
+                self._known_undetermined |= bit
             return result
         finally:
-            self.evaluating.discard(fact)
+            if guarded:
+                self._evaluating &= ~bit
 
     def _evaluate_fact(self, fact: str) -> TruthValue:
         """Evaluate a single fact."""
-        if fact in self.initial_facts:
+        fid = self._fact_id[fact]
+        if self._initial_mask >> fid & 1:
             return TruthValue.TRUE
 
-        has_fact = fact in self.rules_concluding
-        has_negation = f"!{fact}" in self.rules_concluding
-        if not has_fact and not has_negation:
+        concluding = self._rules_concluding_idx.get(fid)
+        negating = self._rules_negating_idx.get(fid)
+        if not concluding and not negating:
             return TruthValue.FALSE
 
         can_be_true = False
         is_undetermined = False
 
-        if fact in self.rules_concluding:
-            for rule in self.rules_concluding[fact]:
-                condition_value = self._evaluate_expression(rule.condition)
+        if concluding:
+            effects = self._rule_concl_effect
+            for ri in concluding:
+                condition_value = self._evaluate_rule(ri)
 
                 if condition_value == TruthValue.TRUE:
-                    conclusion_value = self._check_conclusion_for_fact(
-                        rule.conclusion, fact)
+                    conclusion_value = effects[ri].get(fid, TruthValue.FALSE)
                     if conclusion_value == TruthValue.TRUE:
                         can_be_true = True
                     elif conclusion_value == TruthValue.UNDETERMINED:
@@ -151,10 +444,9 @@ class InferenceEngine:
                 elif condition_value == TruthValue.UNDETERMINED:
                     is_undetermined = True
 
-        negated_fact = f"!{fact}"
-        if negated_fact in self.rules_concluding:
-            for rule in self.rules_concluding[negated_fact]:
-                condition_value = self._evaluate_expression(rule.condition)
+        if negating:
+            for ri in negating:
+                condition_value = self._evaluate_rule(ri)
 
                 if condition_value == TruthValue.TRUE:
                     if can_be_true:
@@ -169,136 +461,53 @@ class InferenceEngine:
         else:
             return TruthValue.FALSE
 
-    def _check_conclusion_for_fact(
-        self,
-        conclusion: ASTNode,
-        fact: str,
-    ) -> TruthValue:
+    def _evaluate_rule(self, ri: int) -> TruthValue:
         """
-        Check if a conclusion node makes a specific fact true.
-        Used for complex conclusions like A + B, A | B, or A ^ B.
+        Evaluate the condition of rule number ri.
+
+        Results are memoized and tagged with the cache epoch, so
+        reset_cache invalidates them without clearing the dict. As in
+        _query_id, UNDETERMINED is only kept when no cycle was cut.
+
+        When every condition fact is already resolved the flattened
+        postfix code is run directly on the cache masks; otherwise the
+        compiled closure queries the facts.
         """
-        if isinstance(conclusion, FactNode):
-            if conclusion.fact == fact:
-                return TruthValue.TRUE
-            return TruthValue.FALSE
-        elif isinstance(conclusion, UnaryOpNode):
-            if conclusion.node_type == NodeType.NOT:
-                if isinstance(conclusion.operand, FactNode):
-                    if conclusion.operand.fact == fact:
-                        return TruthValue.FALSE
-                    return TruthValue.FALSE
-                return TruthValue.UNDETERMINED
-        elif isinstance(conclusion, BinaryOpNode):
-            if conclusion.node_type == NodeType.AND:
-                left_result = self._check_conclusion_for_fact(
-                    conclusion.left, fact
-                )
-                right_result = self._check_conclusion_for_fact(
-                    conclusion.right, fact
-                )
-
-                if (
-                    left_result == TruthValue.TRUE
-                    or right_result == TruthValue.TRUE
-                ):
-                    return TruthValue.TRUE
-
-                return TruthValue.FALSE
-            elif conclusion.node_type == NodeType.OR:
-                left_result = self._check_conclusion_for_fact(
-                    conclusion.left, fact
-                )
-                right_result = self._check_conclusion_for_fact(
-                    conclusion.right, fact
-                )
-
-                if (
-                    left_result == TruthValue.TRUE
-                    or right_result == TruthValue.TRUE
-                ):
-                    return TruthValue.UNDETERMINED
-
-                return TruthValue.FALSE
-            elif conclusion.node_type == NodeType.XOR:
-                left_result = self._check_conclusion_for_fact(
-                    conclusion.left, fact
-                )
-                right_result = self._check_conclusion_for_fact(
-                    conclusion.right, fact
-                )
-
-                if (
-                    left_result == TruthValue.TRUE
-                    or right_result == TruthValue.TRUE
-                ):
-                    return TruthValue.UNDETERMINED
-
-                return TruthValue.FALSE
-
-        return TruthValue.UNDETERMINED
+        entry = self._cond_cache.get(ri)
+        if entry is not None and entry[0] == self._epoch:
+            return entry[1]
+
+        known_true = self._known_true
+        known_false = self._known_false
+        known = known_true | known_false | self._known_undetermined
+        if not self._rule_cond_mask[ri] & ~known:
+            value = _FROM_INT[_eval_postfix_masks(
+                self._rule_opcodes[ri], self._rule_fact_args[ri],
+                known_true, known_false)]
+            self._cond_cache[ri] = (self._epoch, value)
+            return value
+
+        cuts = self._cycle_cuts
+        value = _FROM_INT[self._rule_cond[ri](self.query)]
+        if value != TruthValue.UNDETERMINED or cuts == self._cycle_cuts:
+            self._cond_cache[ri] = (self._epoch, value)
+        return value
 
     def _evaluate_expression(self, node: ASTNode) -> TruthValue:
         """Evaluate a logical expression to TRUE, FALSE, or UNDETERMINED."""
-        if isinstance(node, FactNode):
-            return self.query(node.fact)
-
-        elif isinstance(node, UnaryOpNode):
-            if node.node_type == NodeType.NOT:
-                operand_value = self._evaluate_expression(node.operand)
-                if operand_value == TruthValue.TRUE:
-                    return TruthValue.FALSE
-                elif operand_value == TruthValue.FALSE:
-                    return TruthValue.TRUE
-                else:
-                    return TruthValue.UNDETERMINED
-
-        elif isinstance(node, BinaryOpNode):
-            left_value = self._evaluate_expression(node.left)
-            right_value = self._evaluate_expression(node.right)
-
-            if node.node_type == NodeType.AND:
-                return self._eval_and(left_value, right_value)
-            elif node.node_type == NodeType.OR:
-                return self._eval_or(left_value, right_value)
-            elif node.node_type == NodeType.XOR:
-                return self._eval_xor(left_value, right_value)
-            elif node.node_type == NodeType.IMPLIES:
-                return self._eval_implies(left_value, right_value)
-            elif node.node_type == NodeType.IFF:
-                return self._eval_iff(left_value, right_value)
-
-        return TruthValue.UNDETERMINED
+        return _FROM_INT[compile_ast(node)(self.query)]
 
     def _eval_and(self, left: TruthValue, right: TruthValue) -> TruthValue:
         """Evaluate AND operation."""
-        if left == TruthValue.FALSE or right == TruthValue.FALSE:
-            return TruthValue.FALSE
-        elif left == TruthValue.TRUE and right == TruthValue.TRUE:
-            return TruthValue.TRUE
-        else:
-            return TruthValue.UNDETERMINED
+        return _AND_TABLE[3 * left + right + 4]
 
     def _eval_or(self, left: TruthValue, right: TruthValue) -> TruthValue:
         """Evaluate OR operation."""
-        if left == TruthValue.TRUE or right == TruthValue.TRUE:
-            return TruthValue.TRUE
-        elif left == TruthValue.FALSE and right == TruthValue.FALSE:
-            return TruthValue.FALSE
-        else:
-            return TruthValue.UNDETERMINED
+        return _OR_TABLE[3 * left + right + 4]
 
     def _eval_xor(self, left: TruthValue, right: TruthValue) -> TruthValue:
         """Evaluate XOR (exclusive OR) operation."""
-        if left == TruthValue.UNDETERMINED or right == TruthValue.UNDETERMINED:
-            return TruthValue.UNDETERMINED
-        elif (
-            (left == TruthValue.TRUE and right == TruthValue.FALSE)
-            or (left == TruthValue.FALSE and right == TruthValue.TRUE)
-        ):
-            return TruthValue.TRUE
-        else:
-            return TruthValue.FALSE
+        return _XOR_TABLE[3 * left + right + 4]
 
     def _eval_implies(self, left: TruthValue, right: TruthValue) -> TruthValue:
         """
@@ -306,15 +515,7 @@ class InferenceEngine:
         True if: left is false OR right is true
         False if: left is true AND right is false
         """
-        if left == TruthValue.FALSE:
-            return TruthValue.TRUE
-        elif left == TruthValue.TRUE:
-            return right
-        else:
-            if right == TruthValue.TRUE:
-                return TruthValue.TRUE
-            else:
-                return TruthValue.UNDETERMINED
+        return _IMPLIES_TABLE[3 * left + right + 4]
 
     def _eval_iff(self, left: TruthValue, right: TruthValue) -> TruthValue:
         """
@@ -322,21 +523,106 @@ class InferenceEngine:
         True if: both are true OR both are false
         False if: one is true and the other is false
         """
-        if left == TruthValue.UNDETERMINED or right == TruthValue.UNDETERMINED:
-            return TruthValue.UNDETERMINED
-        elif left == right:
-            return TruthValue.TRUE
-        else:
-            return TruthValue.FALSE
+        return _IFF_TABLE[3 * left + right + 4]
 
     def query_all(self, queries: List[str]) -> Dict[str, TruthValue]:
-        """Query multiple facts and return results."""
+        """
+        Query multiple facts and return results.
+
+        When the queries cover a large share of the facts, every fact is
+        first resolved once in dependency order (see _forward_saturate),
+        so each query is answered from the cache.
+        """
+        if len(queries) >= math.sqrt(len(self.all_facts)):
+            self._forward_saturate()
+
         results = {}
         for query in queries:
             results[query] = self.query(query)
         return results
 
+    def _dependency_order(self) -> Optional[List[int]]:
+        """
+        Order fact ids so every fact comes after the facts its rules
+        depend on. Initial facts need no rules and contribute no edges.
+        Returns None when the remaining dependencies contain a cycle.
+        """
+        deps: Dict[int, Set[int]] = {}
+        for fact, fid in self._fact_id.items():
+            if fact.startswith('!') or self._initial_mask >> fid & 1:
+                deps[fid] = set()
+                continue
+            rules = (self.rules_concluding.get(fact, [])
+                     + self.rules_concluding.get(f"!{fact}", []))
+            deps[fid] = {
+                self._fact_id[name]
+                for rule in rules
+                for name in rule.condition.get_facts()
+            }
+
+        order = []
+        state: Dict[int, int] = {}
+        for root in deps:
+            if root in state:
+                continue
+            state[root] = 1
+            stack = [(root, iter(deps[root]))]
+            while stack:
+                fid, children = stack[-1]
+                for child in children:
+                    seen = state.get(child)
+                    if seen is None:
+                        state[child] = 1
+                        stack.append((child, iter(deps[child])))
+                        break
+                    if seen == 1:
+                        return None
+                else:
+                    stack.pop()
+                    state[fid] = 2
+                    order.append(fid)
+        return order
+
+    def _forward_saturate(self):
+        """
+        Resolve every fact bottom-up, from initial facts toward the
+        facts that depend on them. Over an acyclic rule base this
+        reaches the fixed point in one pass and gives exactly the
+        backward-chaining answers. With cycles the result depends on
+        query order, so backward chaining stays in charge.
+        """
+        order = self._dependency_order()
+        if order is None:
+            return
+        for fid in order:
+            if not self._fact_names[fid].startswith('!'):
+                self._query_id(fid)
+
     def reset_cache(self):
         """Clear the cache and evaluation state."""
-        self.cache.clear()
-        self.evaluating.clear()
+        self._known_true = 0
+        self._known_false = 0
+        self._known_undetermined = 0
+        self._evaluating = 0
+        self._epoch += 1
+
+    def push_assumption(self, fact: str):
+        """
+        Temporarily assert a fact on top of the initial facts.
+        Reuses the built knowledge graph; only the cache is dropped.
+        """
+        if fact in self.initial_facts:
+            return
+        self._assumptions.append(fact)
+        self.initial_facts.add(fact)
+        self._initial_mask |= 1 << self._intern(fact)
+        self.reset_cache()
+
+    def pop_assumption(self, fact: str):
+        """Retract a fact previously asserted with push_assumption."""
+        if fact not in self._assumptions:
+            return
+        self._assumptions.remove(fact)
+        self.initial_facts.discard(fact)
+        self._initial_mask &= ~(1 << self._fact_id[fact])
+        self.reset_cache()
@@ -18,9 +18,13 @@ Allows users to change facts interactively to check the same query
 against different inputs without modifying the source file.
 """
 
+import re
 import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from parser import parse_input_file
+from typing import Dict, FrozenSet, List, Optional, Set
+from parser import NodeType, Rule, parse_input_file
 from inference_engine import InferenceEngine, TruthValue
 from graph_exporter import JustificationGraph
 
@@ -42,6 +46,15 @@ except Exception:
     pass
 
 
+_ASCII_OPS = {
+    NodeType.AND: " + ",
+    NodeType.OR: " | ",
+    NodeType.XOR: " ^ ",
+    NodeType.IMPLIES: " => ",
+    NodeType.IFF: " <=> "
+}
+
+
 def print_separator():
     """Print a separator line."""
     print("=" * 70)
@@ -94,7 +107,7 @@ def print_help():
 
 def format_rule(rule):
     """Format a rule for display."""
-    from parser import NodeType, FactNode, UnaryOpNode, BinaryOpNode
+    from parser import FactNode, UnaryOpNode, BinaryOpNode
 
     def format_node(node):
         if isinstance(node, FactNode):
@@ -105,13 +118,7 @@ def format_rule(rule):
         elif isinstance(node, BinaryOpNode):
             left = format_node(node.left)
             right = format_node(node.right)
-            op = {
-                NodeType.AND: " + ",
-                NodeType.OR: " | ",
-                NodeType.XOR: " ^ ",
-                NodeType.IMPLIES: " => ",
-                NodeType.IFF: " <=> "
-            }.get(node.node_type, " ? ")
+            op = _ASCII_OPS.get(node.node_type, " ? ")
             return f"({left}{op}{right})"
         return "?"
 
@@ -119,6 +126,326 @@ def format_rule(rule):
     return f"{format_node(rule.condition)} {op} {format_node(rule.conclusion)}"
 
 
+_FACT_SEPARATORS = re.compile(r'[, ]')
+
+
+@dataclass
+class _Session:
+    """State shared by the interactive command handlers."""
+    rules: List[Rule]
+    all_facts: Set[str]
+    original_facts: Set[str]
+    current_facts: Set[str]
+    sorted_facts: List[str] = field(init=False)
+    positive_facts: List[str] = field(init=False)
+    temp_stack: List[Dict[str, Set[str]]] = field(default_factory=list)
+    engines: Dict[FrozenSet[str], InferenceEngine] = field(
+        default_factory=dict)
+    graphs: Dict[FrozenSet[str], JustificationGraph] = field(
+        default_factory=dict)
+    rules_listing: Optional[str] = None
+
+    def __post_init__(self):
+        self.sorted_facts = sorted(self.all_facts)
+        self.positive_facts = [
+            f for f in self.sorted_facts if not f.startswith('!')
+        ]
+
+    def effective_facts(self) -> Set[str]:
+        """Current facts with the what-if stack applied."""
+        eff = set(self.current_facts)
+        for item in self.temp_stack:
+            eff.update(item['add'])
+            for r in item['remove']:
+                eff.discard(r)
+        return eff
+
+    def engine_for(self, facts: Set[str]) -> InferenceEngine:
+        """
+        Engine over the given facts, built once per distinct fact set.
+        The cache is reset on reuse so every command starts fresh.
+        """
+        key = frozenset(facts)
+        engine = self.engines.get(key)
+        if engine is None:
+            engine = self.engines[key] = InferenceEngine(self.rules, facts)
+        else:
+            engine.reset_cache()
+        return engine
+
+    def graph_for(self, facts: Set[str]) -> JustificationGraph:
+        """Justification graph over all facts, built once per fact set."""
+        key = frozenset(facts)
+        graph = self.graphs.get(key)
+        if graph is None:
+            graph = JustificationGraph(self.rules, facts)
+            graph.build_graph(self.positive_facts)
+            self.graphs[key] = graph
+        return graph
+
+
+@lru_cache(maxsize=8)
+def _load_parsed(path, mtime_ns, size):
+    """
+    Parse an input file once per (path, mtime, size); a changed file
+    gets a new key and is parsed again.
+    """
+    return parse_input_file(Path(path).read_text())
+
+
+def _fact_letters(text):
+    """Strip list separators from a fact list like 'A, B'."""
+    return _FACT_SEPARATORS.sub('', text.upper())
+
+
+def _cmd_quit(session, user_input):
+    """Leave interactive mode."""
+    print("Exiting interactive mode.")
+    return True
+
+
+def _cmd_help(session, user_input):
+    """Show the command list."""
+    print_help()
+
+
+def _cmd_facts(session, user_input):
+    """Show the current facts."""
+    print_facts_status(session.current_facts)
+
+
+def _cmd_reset(session, user_input):
+    """Restore the original facts and drop the what-if stack."""
+    session.current_facts = set(session.original_facts)
+    session.temp_stack.clear()
+    print("Reset to original facts.")
+    print_facts_status(session.current_facts)
+
+
+def _cmd_rules(session, user_input):
+    """List the loaded rules."""
+    rules = session.rules
+    if session.rules_listing is None:
+        session.rules_listing = ''.join(
+            f"  {i}. {format_rule(rule)}\n"
+            for i, rule in enumerate(rules, 1)
+        )
+    sys.stdout.write(
+        f"\nLoaded {len(rules)} rule(s):\n{session.rules_listing}")
+
+
+def _cmd_add(session, user_input):
+    """Persistently set facts to TRUE: +A, +B, ..."""
+    added = []
+    for fact in _fact_letters(user_input[1:]):
+        if fact.isalpha() and len(fact) == 1:
+            session.current_facts.add(fact)
+            added.append(fact)
+        else:
+            print(f"Invalid fact: {fact}")
+    if added:
+        print(f"Added fact(s): {', '.join(added)}")
+        print_facts_status(session.current_facts)
+
+
+def _cmd_remove(session, user_input):
+    """Persistently remove facts: -A, -B, ..."""
+    removed = []
+    for fact in _fact_letters(user_input[1:]):
+        if fact.isalpha() and len(fact) == 1:
+            session.current_facts.discard(fact)
+            removed.append(fact)
+        else:
+            print(f"Invalid fact: {fact}")
+    if removed:
+        print(f"Removed fact(s): {', '.join(removed)}")
+        print_facts_status(session.current_facts)
+
+
+def _cmd_push(session, user_input):
+    """Push a temporary assertion: push +A or push -A."""
+    rest = user_input[4:].strip()
+    if not rest:
+        print("Usage: push +A or push -A (use + to add, - to remove)")
+        return
+    adds = set()
+    removes = set()
+    if rest.startswith('+'):
+        for f in rest[1:].upper():
+            if f.isalpha():
+                adds.add(f)
+    elif rest.startswith('-'):
+        for f in rest[1:].upper():
+            if f.isalpha():
+                removes.add(f)
+    else:
+        print("Push must start with + or -")
+        return
+
+    session.temp_stack.append({'add': adds, 'remove': removes})
+    print(f"Pushed temporary assertion: +{''.join(sorted(adds))} \
+                  - {''.join(sorted(removes))}")
+
+
+def _cmd_pop(session, user_input):
+    """Pop the last temporary assertion."""
+    if not session.temp_stack:
+        print('No temporary assertions to pop.')
+    else:
+        item = session.temp_stack.pop()
+        print(f"Popped: +{''.join(sorted(item['add']))} \
+                      - {''.join(sorted(item['remove']))}")
+
+
+def _cmd_temp(session, user_input):
+    """Show the what-if stack."""
+    if not session.temp_stack:
+        print('Temporary stack is empty.')
+    else:
+        lines = ['Temporary assertions (last is top):\n']
+        for i, item in enumerate(session.temp_stack, 1):
+            lines.append(f"  {i}. +{''.join(sorted(item['add']))} \
+                          - {''.join(sorted(item['remove']))}\n")
+        sys.stdout.write(''.join(lines))
+
+
+def _cmd_clear_temp(session, user_input):
+    """Clear the what-if stack."""
+    session.temp_stack.clear()
+    print('Cleared temporary assertions.')
+
+
+def _cmd_suggest(session, user_input):
+    """Find single facts whose addition makes a target TRUE."""
+    parts = user_input.split()
+    if len(parts) != 2:
+        print('Usage: suggest A')
+        return
+    target = parts[1].upper()
+    if not (len(target) == 1 and target.isalpha()):
+        print('Suggestion target must be a single fact letter.')
+        return
+
+    suggestions = []
+    base_eff = frozenset(session.effective_facts())
+    engine_base = session.engine_for(base_eff)
+    base_result = engine_base.query(target)
+    if base_result == TruthValue.TRUE:
+        print(f"{target} is already TRUE with current facts.")
+        return
+
+    for cand in session.sorted_facts:
+        if cand == target:
+            continue
+        if cand in base_eff:
+            continue
+        engine_base.push_assumption(cand)
+        res = engine_base.query(target)
+        engine_base.pop_assumption(cand)
+        if res == TruthValue.TRUE:
+            suggestions.append(cand)
+
+    if suggestions:
+        print(f"Asserting any of these would make {target} \
+                    TRUE: {', '.join(suggestions)}")
+    else:
+        print(f"No single-fact suggestion found to make {target} \
+                    TRUE.")
+
+
+def _cmd_export(session, user_input):
+    """Export the justification graph as DOT or JSON."""
+    parts = user_input.split()
+    if len(parts) < 3:
+        print('Usage: export dot <filename> or export json <filename>')
+        return
+
+    export_format = parts[1].lower()
+    filename = parts[2]
+
+    if export_format not in ['dot', 'json']:
+        print('Format must be "dot" or "json"')
+        return
+
+    try:
+        graph = session.graph_for(session.effective_facts())
+
+        if export_format == 'dot':
+            graph.export_dot(filename)
+            print(f'Graph exported to {filename} (DOT format)')
+            print(
+                f'  Visualize with: dot -Tpng {filename} -o graph.png')
+        else:
+            graph.export_json(filename)
+            print(f'Graph exported to {filename} (JSON format)')
+    except Exception as e:
+        print(f'Export failed: {e}')
+
+
+def _cmd_query(session, user_input):
+    """Query facts against the current facts: ?A, ?B, ..."""
+    queries = _fact_letters(user_input[1:])
+    if not queries:
+        print("No queries specified.")
+        return
+
+    engine = session.engine_for(session.current_facts)
+
+    print_separator()
+    print("QUERY RESULTS")
+    print_separator()
+
+    for fact in queries:
+        if fact.isalpha() and len(fact) == 1:
+            result = engine.query(fact)
+            print_query_result(fact, result)
+        else:
+            print(f"Invalid query: {fact}")
+
+
+_PREFIX_COMMANDS = {
+    '+': _cmd_add,
+    '-': _cmd_remove,
+    '?': _cmd_query,
+}
+
+_COMMANDS = {
+    'quit': _cmd_quit,
+    'exit': _cmd_quit,
+    'q': _cmd_quit,
+    'help': _cmd_help,
+    'facts': _cmd_facts,
+    'reset': _cmd_reset,
+    'rules': _cmd_rules,
+    'pop': _cmd_pop,
+    'temp': _cmd_temp,
+    'clear_temp': _cmd_clear_temp,
+}
+
+_WORD_PREFIX_COMMANDS = (
+    ('push', _cmd_push),
+    ('suggest', _cmd_suggest),
+    ('export', _cmd_export),
+)
+
+
+def _find_command(user_input):
+    """Resolve an input line to its handler, or None if unknown."""
+    handler = _PREFIX_COMMANDS.get(user_input[0])
+    if handler is not None:
+        return handler
+
+    cmd = user_input.lower()
+    handler = _COMMANDS.get(cmd)
+    if handler is not None:
+        return handler
+
+    for word, handler in _WORD_PREFIX_COMMANDS:
+        if cmd.startswith(word):
+            return handler
+    return None
+
+
 def run_interactive_mode(input_file):
     """Run the interactive fact validation mode."""
     if not Path(input_file).exists():
@@ -126,27 +453,30 @@ def run_interactive_mode(input_file):
         return 1
 
     try:
-        with open(input_file, 'r') as f:
-            content = f.read()
-        rules, initial_facts, original_queries = parse_input_file(content)
+        stat = Path(input_file).stat()
+        rules, initial_facts, original_queries = _load_parsed(
+            input_file, stat.st_mtime_ns, stat.st_size)
     except Exception as e:
         print(f"Error parsing input file: {e}", file=sys.stderr)
         return 1
 
-    original_facts = set(initial_facts)
-    current_facts = set(initial_facts)
-    temp_stack = []
-
     all_facts = set()
     for rule in rules:
         all_facts.update(rule.get_all_facts())
     all_facts.update(initial_facts)
 
+    session = _Session(
+        rules=rules,
+        all_facts=all_facts,
+        original_facts=set(initial_facts),
+        current_facts=set(initial_facts),
+    )
+
     print_separator()
     print("INTERACTIVE FACT VALIDATION MODE")
     print_separator()
     print(f"Loaded {len(rules)} rule(s) from {input_file}")
-    print_facts_status(current_facts)
+    print_facts_status(session.current_facts)
     print_help()
 
     while True:
@@ -159,208 +489,12 @@ def run_interactive_mode(input_file):
         if not user_input:
             continue
 
-        cmd = user_input.lower()
-
-        if cmd in ['quit', 'exit', 'q']:
-            print("Exiting interactive mode.")
-            break
-
-        elif cmd == 'help':
-            print_help()
-
-        elif cmd == 'facts':
-            print_facts_status(current_facts)
-
-        elif cmd == 'reset':
-            current_facts = set(original_facts)
-            temp_stack.clear()
-            print("Reset to original facts.")
-            print_facts_status(current_facts)
-
-        elif cmd == 'rules':
-            print(f"\nLoaded {len(rules)} rule(s):")
-            for i, rule in enumerate(rules, 1):
-                print(f"  {i}. {format_rule(rule)}")
-
-        elif user_input.startswith('+'):
-            facts_to_add = user_input[1:].upper().replace(
-                ',', '').replace(' ', '')
-            added = []
-            for fact in facts_to_add:
-                if fact.isalpha() and len(fact) == 1:
-                    current_facts.add(fact)
-                    added.append(fact)
-                else:
-                    print(f"Invalid fact: {fact}")
-            if added:
-                print(f"Added fact(s): {', '.join(added)}")
-                print_facts_status(current_facts)
-
-        elif user_input.startswith('-'):
-            facts_to_remove = user_input[1:].upper().replace(
-                ',', '').replace(' ', '')
-            removed = []
-            for fact in facts_to_remove:
-                if fact.isalpha() and len(fact) == 1:
-                    current_facts.discard(fact)
-                    removed.append(fact)
-                else:
-                    print(f"Invalid fact: {fact}")
-            if removed:
-                print(f"Removed fact(s): {', '.join(removed)}")
-                print_facts_status(current_facts)
-
-        elif cmd.startswith('push'):
-            rest = user_input[4:].strip()
-            if not rest:
-                print("Usage: push +A or push -A (use + to add, - to remove)")
-                continue
-            adds = set()
-            removes = set()
-            if rest.startswith('+'):
-                for f in rest[1:].upper():
-                    if f.isalpha():
-                        adds.add(f)
-            elif rest.startswith('-'):
-                for f in rest[1:].upper():
-                    if f.isalpha():
-                        removes.add(f)
-            else:
-                print("Push must start with + or -")
-                continue
-
-            temp_stack.append({'add': adds, 'remove': removes})
-            print(f"Pushed temporary assertion: +{''.join(sorted(adds))} \
-                  - {''.join(sorted(removes))}")
-
-        elif cmd == 'pop':
-            if not temp_stack:
-                print('No temporary assertions to pop.')
-            else:
-                item = temp_stack.pop()
-                print(f"Popped: +{''.join(sorted(item['add']))} \
-                      - {''.join(sorted(item['remove']))}")
-
-        elif cmd == 'temp':
-            if not temp_stack:
-                print('Temporary stack is empty.')
-            else:
-                print('Temporary assertions (last is top):')
-                for i, item in enumerate(temp_stack, 1):
-                    print(f"  {i}. +{''.join(sorted(item['add']))} \
-                          - {''.join(sorted(item['remove']))}")
-
-        elif cmd == 'clear_temp':
-            temp_stack.clear()
-            print('Cleared temporary assertions.')
-
-        elif cmd.startswith('suggest'):
-            parts = user_input.split()
-            if len(parts) != 2:
-                print('Usage: suggest A')
-                continue
-            target = parts[1].upper()
-            if not (len(target) == 1 and target.isalpha()):
-                print('Suggestion target must be a single fact letter.')
-                continue
-
-            def compute_effective_facts():
-                eff = set(current_facts)
-                for item in temp_stack:
-                    eff.update(item['add'])
-                    for r in item['remove']:
-                        eff.discard(r)
-                return eff
-
-            suggestions = []
-            base_eff = compute_effective_facts()
-            engine_base = InferenceEngine(rules, base_eff)
-            base_result = engine_base.query(target)
-            if base_result == TruthValue.TRUE:
-                print(f"{target} is already TRUE with current facts.")
-                continue
-
-            for cand in sorted(all_facts):
-                if cand == target:
-                    continue
-                if cand in base_eff:
-                    continue
-                eff = set(base_eff)
-                eff.add(cand)
-                engine = InferenceEngine(rules, eff)
-                res = engine.query(target)
-                if res == TruthValue.TRUE:
-                    suggestions.append(cand)
-
-            if suggestions:
-                print(f"Asserting any of these would make {target} \
-                    TRUE: {', '.join(suggestions)}")
-            else:
-                print(f"No single-fact suggestion found to make {target} \
-                    TRUE.")
-
-        elif cmd.startswith('export'):
-            parts = user_input.split()
-            if len(parts) < 3:
-                print('Usage: export dot <filename> or export json <filename>')
-                continue
-
-            export_format = parts[1].lower()
-            filename = parts[2]
-
-            if export_format not in ['dot', 'json']:
-                print('Format must be "dot" or "json"')
-                continue
-
-            def compute_effective_facts():
-                eff = set(current_facts)
-                for item in temp_stack:
-                    eff.update(item['add'])
-                    for r in item['remove']:
-                        eff.discard(r)
-                return eff
-
-            try:
-                eff = compute_effective_facts()
-                graph = JustificationGraph(rules, eff)
-
-                query_list = sorted(
-                    [f for f in all_facts if not f.startswith('!')])
-                graph.build_graph(query_list)
-
-                if export_format == 'dot':
-                    graph.export_dot(filename)
-                    print(f'Graph exported to {filename} (DOT format)')
-                    print(
-                        f'  Visualize with: dot -Tpng {filename} -o graph.png')
-                else:
-                    graph.export_json(filename)
-                    print(f'Graph exported to {filename} (JSON format)')
-            except Exception as e:
-                print(f'Export failed: {e}')
-
-        elif user_input.startswith('?'):
-            queries = user_input[1:].upper().replace(',', '').replace(' ', '')
-            if not queries:
-                print("No queries specified.")
-                continue
-
-            engine = InferenceEngine(rules, current_facts)
-
-            print_separator()
-            print("QUERY RESULTS")
-            print_separator()
-
-            for fact in queries:
-                if fact.isalpha() and len(fact) == 1:
-                    result = engine.query(fact)
-                    print_query_result(fact, result)
-                else:
-                    print(f"Invalid query: {fact}")
-
-        else:
+        handler = _find_command(user_input)
+        if handler is None:
             print(f"Unknown command: {user_input}")
             print("Type 'help' for available commands.")
+        elif handler(session, user_input):
+            break
 
     return 0
 
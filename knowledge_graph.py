@@ -22,9 +22,67 @@ This module implements a level-5 data structure for expert system:
 - Graph traversal capabilities for proof visualization and analysis
 """
 
-from typing import Set, List, Dict, Optional
+from array import array
+from typing import Set, List, Dict, FrozenSet, Optional, Tuple
 from dataclasses import dataclass, field
-from parser import Rule, ASTNode
+from parser import (
+    Rule, ASTNode, NodeType, CompiledExpr, compile_ast, fact_bits,
+    facts_from_bits
+)
+
+
+OP_FACT, OP_NOT, OP_AND, OP_OR, OP_XOR, OP_IMPLIES, OP_IFF = range(7)
+
+_OPCODES = {
+    NodeType.FACT: OP_FACT,
+    NodeType.NOT: OP_NOT,
+    NodeType.AND: OP_AND,
+    NodeType.OR: OP_OR,
+    NodeType.XOR: OP_XOR,
+    NodeType.IMPLIES: OP_IMPLIES,
+    NodeType.IFF: OP_IFF,
+}
+
+# Facts A-Z take slots 0-25 of the CSR rule indexes, and the negated
+# conclusions !A-!Z slots 26-51.
+FACT_SLOTS = 52
+
+
+def fact_slot(fact: str) -> int:
+    """Slot of a fact (or negated fact) in the CSR rule indexes."""
+    if fact[0] == '!':
+        return ord(fact[1]) - 39
+    return ord(fact) - 65
+
+
+def flatten(
+    node: ASTNode,
+    opcodes: array,
+    args: array,
+    facts: List[str]
+):
+    """
+    Append node to opcodes/args in postfix order. For OP_FACT the arg
+    is the fact's slot in facts (added on first use); other opcodes
+    take 0.
+    """
+    node_type = node.node_type
+    if node_type is NodeType.FACT:
+        if node.fact not in facts:
+            facts.append(node.fact)
+        opcodes.append(OP_FACT)
+        args.append(facts.index(node.fact))
+        return
+    if node_type is NodeType.NOT:
+        flatten(node.operand, opcodes, args, facts)
+    else:
+        flatten(node.left, opcodes, args, facts)
+        flatten(node.right, opcodes, args, facts)
+    opcodes.append(_OPCODES[node_type])
+    args.append(0)
+
+
+CompiledCondition = Tuple[CompiledExpr, array, array, Tuple[str, ...]]
 
 
 @dataclass
@@ -33,15 +91,19 @@ class FactGraphNode:
     Represents a fact in the knowledge graph.
 
     Contains bidirectional links to rules that:
-    - Use this fact in their condition (incoming_rules)
+    - Use this fact in their condition (used_by_rules)
     - Conclude this fact (concluding_rules)
+
+    Both are arrays of indexes into KnowledgeGraph.rule_nodes, in the
+    order the rules were linked; get_rules_concluding/get_rules_using
+    resolve them to nodes.
     """
     fact: str
     is_initial: bool = False
 
-    concluding_rules: Set['RuleGraphNode'] = field(default_factory=set)
+    concluding_rules: array = field(default_factory=lambda: array('I'))
 
-    used_by_rules: Set['RuleGraphNode'] = field(default_factory=set)
+    used_by_rules: array = field(default_factory=lambda: array('I'))
 
     def __hash__(self):
         return hash(self.fact)
@@ -64,6 +126,10 @@ class RuleGraphNode:
     Contains bidirectional links to facts:
     - Facts used in the condition (condition_facts)
     - Facts that can be concluded (conclusion_facts)
+
+    cond_fn is the condition compiled by parser.compile_ast; opcodes
+    and args hold it flattened to postfix (see flatten), with
+    cond_fact_table naming the fact in each slot.
     """
     rule_id: int
     rule: Rule
@@ -72,6 +138,18 @@ class RuleGraphNode:
 
     conclusion_facts: Set[FactGraphNode] = field(default_factory=set)
 
+    cond_fn: Optional[CompiledExpr] = field(
+        default=None, repr=False, compare=False)
+
+    opcodes: array = field(
+        default_factory=lambda: array('B'), repr=False, compare=False)
+
+    args: array = field(
+        default_factory=lambda: array('B'), repr=False, compare=False)
+
+    cond_fact_table: Tuple[str, ...] = field(
+        default=(), repr=False, compare=False)
+
     def __hash__(self):
         return hash(self.rule_id)
 
@@ -92,6 +170,9 @@ class KnowledgeGraph:
     - fact_nodes: Dict[str, FactGraphNode] - all facts in the system
     - rule_nodes: List[RuleGraphNode] - all rules in the system
     - Bidirectional edges maintained automatically
+    - concluding_offsets/concluding_data, using_offsets/using_data -
+      the fact -> rule edges in CSR layout: the rule indexes of the
+      fact in slot k (see fact_slot) are data[offsets[k]:offsets[k + 1]]
 
     Benefits:
     - O(1) lookup of rules concluding a fact
@@ -105,20 +186,37 @@ class KnowledgeGraph:
         self.fact_nodes: Dict[str, FactGraphNode] = {}
         self.rule_nodes: List[RuleGraphNode] = []
         self.initial_facts = initial_facts
+        self._compiled: Dict[int, CompiledCondition] = {}
+        self._dep_cache: Dict[str, FrozenSet[str]] = {}
+        self.concluding_offsets = array('I')
+        self.concluding_data = array('I')
+        self.using_offsets = array('I')
+        self.using_data = array('I')
 
         self._build_graph(rules, initial_facts)
+        self._build_rule_indexes()
 
     def _build_graph(self, rules: List[Rule], initial_facts: Set[str]):
-        """Build the global knowledge graph from rules and facts."""
-        all_facts = set(initial_facts)
+        """
+        Build the global knowledge graph from rules and facts.
+        The facts in play are collected as a 26-bit set (see
+        parser.fact_bits), so the unions are plain integer ORs, and
+        fact nodes are created straight from its set bits.
+        """
+        initial_bits = fact_bits(initial_facts)
+        bits = initial_bits
         for rule in rules:
-            all_facts.update(rule.get_all_facts())
+            bits |= (rule.condition.get_fact_bits()
+                     | rule.conclusion.get_fact_bits())
 
-        for fact in all_facts:
+        while bits:
+            low = bits & -bits
+            fact = chr(64 + low.bit_length())
             self.fact_nodes[fact] = FactGraphNode(
                 fact=fact,
-                is_initial=(fact in initial_facts)
+                is_initial=bool(initial_bits & low)
             )
+            bits ^= low
 
         for idx, rule in enumerate(rules):
             self._add_rule(idx, rule)
@@ -128,95 +226,104 @@ class KnowledgeGraph:
         rule_node = RuleGraphNode(rule_id=rule_id, rule=rule)
 
         if rule.is_biconditional:
-            self._link_rule_direction(
-                rule_node,
-                rule.condition,
-                rule.conclusion,
-                rule_id * 2
-            )
-
             reverse_node = RuleGraphNode(
                 rule_id=rule_id * 2 + 1,
-                rule=Rule(rule.conclusion, rule.condition, False)
-            )
-            self._link_rule_direction(
-                reverse_node,
-                rule.conclusion,
-                rule.condition,
-                rule_id * 2 + 1
+                rule=rule.reverse()
             )
+            reverse_index = len(self.rule_nodes)
             self.rule_nodes.append(reverse_node)
-        else:
-            self._link_rule_direction(
-                rule_node,
-                rule.condition,
-                rule.conclusion,
-                rule_id
-            )
 
+        index = len(self.rule_nodes)
         self.rule_nodes.append(rule_node)
+        self._link_rule_direction(rule_node, index)
 
-    def _link_rule_direction(
-        self,
-        rule_node: RuleGraphNode,
-        condition: ASTNode,
-        conclusion: ASTNode,
-        rule_id: int
-    ):
-        """Link a rule's condition facts and conclusion facts."""
-        condition_fact_names = condition.get_facts()
-        for fact_name in condition_fact_names:
+        if rule.is_biconditional:
+            self._link_rule_direction(reverse_node, reverse_index)
+
+    def _link_rule_direction(self, rule_node: RuleGraphNode, index: int):
+        """
+        Link a rule's condition facts and conclusion facts, and attach
+        the compiled condition. index is the rule node's position in
+        rule_nodes; the fact names come precomputed on the Rule.
+        Conditions are compiled once per node: the parser shares
+        identical subexpressions, so rules with the same condition
+        share its closure and postfix arrays.
+        """
+        rule = rule_node.rule
+        condition = rule.condition
+        compiled = self._compiled.get(id(condition))
+        if compiled is None:
+            opcodes, args, facts = array('B'), array('B'), []
+            flatten(condition, opcodes, args, facts)
+            compiled = (compile_ast(condition), opcodes, args, tuple(facts))
+            self._compiled[id(condition)] = compiled
+        (rule_node.cond_fn, rule_node.opcodes, rule_node.args,
+         rule_node.cond_fact_table) = compiled
+
+        for fact_name in rule.condition_fact_names:
             if fact_name not in self.fact_nodes:
                 self.fact_nodes[fact_name] = FactGraphNode(fact=fact_name)
 
             fact_node = self.fact_nodes[fact_name]
 
             rule_node.condition_facts.add(fact_node)
-            fact_node.used_by_rules.add(rule_node)
+            fact_node.used_by_rules.append(index)
 
-        concluded_fact_names = self._get_concluded_facts(conclusion)
-        for fact_name in concluded_fact_names:
+        for fact_name in rule.concluded_fact_names:
             if fact_name not in self.fact_nodes:
                 self.fact_nodes[fact_name] = FactGraphNode(fact=fact_name)
 
             fact_node = self.fact_nodes[fact_name]
 
             rule_node.conclusion_facts.add(fact_node)
-            fact_node.concluding_rules.add(rule_node)
-
-    def _get_concluded_facts(self, node: ASTNode) -> Set[str]:
-        """Extract facts that can be concluded from a conclusion node."""
-        from parser import FactNode, UnaryOpNode, BinaryOpNode, NodeType
-
-        if isinstance(node, FactNode):
-            return {node.fact}
-        elif isinstance(node, UnaryOpNode) and node.node_type == NodeType.NOT:
-            if isinstance(node.operand, FactNode):
-                return {f"!{node.operand.fact}"}
-            return set()
-        elif isinstance(node, BinaryOpNode):
-            if node.node_type in (NodeType.AND, NodeType.OR, NodeType.XOR):
-                return (self._get_concluded_facts(node.left) |
-                        self._get_concluded_facts(node.right))
-        return set()
+            fact_node.concluding_rules.append(index)
+
+    def _build_rule_indexes(self):
+        """
+        Pack the per-fact rule index arrays into the CSR arrays, one
+        contiguous run per fact slot, so a lookup is a single slice.
+        """
+        fact_nodes = self.fact_nodes
+        self.concluding_offsets.append(0)
+        self.using_offsets.append(0)
+        for slot in range(FACT_SLOTS):
+            fact_node = fact_nodes.get(
+                chr(65 + slot) if slot < 26 else '!' + chr(39 + slot))
+            if fact_node is not None:
+                self.concluding_data.extend(fact_node.concluding_rules)
+                self.using_data.extend(fact_node.used_by_rules)
+            self.concluding_offsets.append(len(self.concluding_data))
+            self.using_offsets.append(len(self.using_data))
+
+    def rule_indexes_concluding(self, fact: str) -> array:
+        """Indexes into rule_nodes of the rules concluding a fact."""
+        if fact not in self.fact_nodes:
+            return array('I')
+        slot = fact_slot(fact)
+        offsets = self.concluding_offsets
+        return self.concluding_data[offsets[slot]:offsets[slot + 1]]
+
+    def rule_indexes_using(self, fact: str) -> array:
+        """Indexes into rule_nodes of the rules using a fact."""
+        if fact not in self.fact_nodes:
+            return array('I')
+        slot = fact_slot(fact)
+        offsets = self.using_offsets
+        return self.using_data[offsets[slot]:offsets[slot + 1]]
 
     def get_fact_node(self, fact: str) -> Optional[FactGraphNode]:
         """Get fact node by name."""
         return self.fact_nodes.get(fact)
 
-    def get_rules_concluding(self, fact: str) -> Set[RuleGraphNode]:
+    def get_rules_concluding(self, fact: str) -> List[RuleGraphNode]:
         """Get all rules that can conclude a fact (O(1) lookup)."""
-        fact_node = self.fact_nodes.get(fact)
-        if fact_node:
-            return fact_node.concluding_rules
-        return set()
+        rule_nodes = self.rule_nodes
+        return [rule_nodes[i] for i in self.rule_indexes_concluding(fact)]
 
-    def get_rules_using(self, fact: str) -> Set[RuleGraphNode]:
+    def get_rules_using(self, fact: str) -> List[RuleGraphNode]:
         """Get all rules that use a fact in their condition (O(1) lookup)."""
-        fact_node = self.fact_nodes.get(fact)
-        if fact_node:
-            return fact_node.used_by_rules
-        return set()
+        rule_nodes = self.rule_nodes
+        return [rule_nodes[i] for i in self.rule_indexes_using(fact)]
 
     def is_initial_fact(self, fact: str) -> bool:
         """Check if a fact is an initial fact."""
@@ -227,24 +334,90 @@ class KnowledgeGraph:
         """Get all facts in the graph."""
         return set(self.fact_nodes.keys())
 
-    def get_dependency_chain(self, fact: str) -> Set[str]:
-        """Get all facts that a given fact depends on (transitive)."""
-        visited = set()
-        to_visit = {fact}
-
-        while to_visit:
-            current = to_visit.pop()
-            if current in visited:
+    def get_dependency_chain(self, fact: str) -> FrozenSet[str]:
+        """
+        Get all facts that a given fact depends on (transitive).
+        The graph does not change after construction, so the chains of
+        all facts are computed together on first use (see
+        compute_all_dependencies) and looked up afterwards.
+        """
+        if not self._dep_cache:
+            self.compute_all_dependencies()
+        return self._dep_cache.get(fact, frozenset())
+
+    def compute_all_dependencies(self) -> Dict[str, FrozenSet[str]]:
+        """
+        Compute the dependency chain of every fact in one pass.
+
+        A fact depends on the condition facts of the rules concluding
+        it. Facts on a common cycle depend on each other, so an
+        iterative Tarjan pass collapses each cycle into a component;
+        components come out successors first, so each one's closure is
+        the OR of its members' bits and of the finished closures it
+        points to. Closures are 26-bit fact sets (parser.fact_bits); a
+        fact is never part of its own chain.
+        """
+        rule_nodes = self.rule_nodes
+        successors: Dict[str, Set[str]] = {
+            fact: {
+                fact_node.fact
+                for i in fact_node.concluding_rules
+                for fact_node in rule_nodes[i].condition_facts
+            }
+            for fact, fact_node in self.fact_nodes.items()
+        }
+
+        closure: Dict[str, int] = {}
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        scc_stack: List[str] = []
+        on_stack: Set[str] = set()
+        for root in successors:
+            if root in index:
                 continue
-            visited.add(current)
-
-            for rule_node in self.get_rules_concluding(current):
-                for fact_node in rule_node.condition_facts:
-                    if fact_node.fact not in visited:
-                        to_visit.add(fact_node.fact)
-
-        visited.discard(fact)
-        return visited
+            work = [(root, iter(successors[root]))]
+            index[root] = lowlink[root] = len(index)
+            scc_stack.append(root)
+            on_stack.add(root)
+            while work:
+                fact, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = lowlink[child] = len(index)
+                        scc_stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(successors[child])))
+                        break
+                    if child in on_stack:
+                        lowlink[fact] = min(lowlink[fact], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[fact])
+                    if lowlink[fact] != index[fact]:
+                        continue
+                    component = []
+                    while True:
+                        member = scc_stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == fact:
+                            break
+                    bits = fact_bits(
+                        member for member in component
+                        if not member.startswith('!'))
+                    for member in component:
+                        for child in successors[member]:
+                            bits |= closure.get(child, 0)
+                    for member in component:
+                        closure[member] = bits
+
+        for fact, bits in closure.items():
+            if not fact.startswith('!'):
+                bits &= ~fact_bits(fact)
+            self._dep_cache[fact] = frozenset(facts_from_bits(bits))
+        return self._dep_cache
 
     def __repr__(self):
         return (f"KnowledgeGraph(facts={len(self.fact_nodes)}, "
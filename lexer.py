@@ -16,9 +16,9 @@
 Tokenizes input files according to the project specification.
 """
 
+import re
 from enum import Enum, auto
-from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, NamedTuple
 
 
 class TokenType(Enum):
@@ -40,13 +40,16 @@ class TokenType(Enum):
     COMMENT = auto()     # #
 
 
-@dataclass(frozen=True)
-class Token:
-    """Represents a token in the input."""
+class Token(NamedTuple):
+    """
+    Represents a token in the input (a tuple, so no per-token dict).
+    ttype is type.value as a plain int, cheap to compare and hash.
+    """
     type: TokenType
     value: str
     line: int
     column: int
+    ttype: int
 
     def __repr__(self):
         parts = (
@@ -63,185 +66,115 @@ class Token:
         return "".join(parts)
 
 
+_SINGLE_CHAR_TOKENS = {
+    char: (token_type, token_type.value)
+    for char, token_type in (
+        ('(', TokenType.LPAREN),
+        (')', TokenType.RPAREN),
+        ('!', TokenType.NOT),
+        ('+', TokenType.AND),
+        ('|', TokenType.OR),
+        ('^', TokenType.XOR),
+        ('?', TokenType.QUERY),
+    )
+}
+
+_FACT = TokenType.FACT.value
+_IMPLIES = TokenType.IMPLIES.value
+_IFF = TokenType.IFF.value
+_EQUALS = TokenType.EQUALS.value
+_NEWLINE = TokenType.NEWLINE.value
+_EOF = TokenType.EOF.value
+
+
+# Blanks and comments are consumed as a prefix of the next match
+# instead of being matches of their own; the final \Z alternative
+# swallows whatever trails the last token and has no group.
+_TOKEN_RE = re.compile(
+    r'(?:[ \t\r]+|#[^\n]*)*'
+    r'(?:(?P<iff><=>)'
+    r'|(?P<impl>=>)'
+    r'|(?P<eq>=)'
+    r'|(?P<sym>[()!+|^?])'
+    r'|(?P<fact>[A-Z])'
+    r'|(?P<nl>\n)'
+    r'|(?P<bad>.)'
+    r'|\Z)',
+    re.DOTALL,
+)
+
+
 class Lexer:
     """Tokenizes input according to expert system language rules."""
 
     def __init__(self, text: str):
         self.text = text
-        self.pos = 0
-        self.line = 1
-        self.column = 1
         self.tokens: List[Token] = []
 
-    def current_char(self) -> Optional[str]:
-        """Get current character without advancing."""
-        if self.pos >= len(self.text):
-            return None
-        return self.text[self.pos]
-
-    def peek_char(self, offset: int = 1) -> Optional[str]:
-        """Look ahead at character without advancing."""
-        pos = self.pos + offset
-        if pos >= len(self.text):
-            return None
-        return self.text[pos]
-
-    def advance(self) -> Optional[str]:
-        """Move to next character and return current."""
-        if self.pos >= len(self.text):
-            return None
-
-        char = self.text[self.pos]
-        self.pos += 1
-
-        if char == '\n':
-            self.line += 1
-            self.column = 1
-        else:
-            self.column += 1
-
-        return char
-
-    def skip_whitespace(self, skip_newlines: bool = True):
-        """Skip whitespace characters."""
-        while self.current_char() is not None:
-            if self.current_char() == '\n' and not skip_newlines:
+    def tokenize(self) -> List[Token]:
+        """
+        Tokenize the entire input with one scan of _TOKEN_RE.
+
+        Columns follow the original character-by-character lexer:
+        single-character tokens report a 0-based column, multi-character
+        operators and '=' a 1-based one. Each line break yields a
+        NEWLINE token, so a whole file can be tokenized at once. Line
+        numbers advance per NEWLINE match only; nothing is done per
+        character or per blank.
+        """
+        tokens: List[Token] = []
+        append = tokens.append
+        single = _SINGLE_CHAR_TOKENS
+        line = 1
+        line_start = 0
+
+        for match in _TOKEN_RE.finditer(self.text):
+            kind = match.lastgroup
+            if kind is None:
                 break
-            if self.current_char() in ' \t\r\n':
-                self.advance()
+            start = match.start(kind)
+
+            if kind == 'sym':
+                value = match.group(kind)
+                token_type, ttype = single[value]
+                append(Token(
+                    token_type, value, line, start - line_start, ttype))
+            elif kind == 'fact':
+                append(Token(
+                    TokenType.FACT, match.group(kind), line,
+                    start - line_start, _FACT))
+            elif kind == 'nl':
+                append(Token(
+                    TokenType.NEWLINE, '\n', line, start - line_start,
+                    _NEWLINE))
+                line += 1
+                line_start = start + 1
+            elif kind == 'impl':
+                append(Token(
+                    TokenType.IMPLIES, '=>', line, start - line_start + 1,
+                    _IMPLIES))
+            elif kind == 'iff':
+                append(Token(
+                    TokenType.IFF, '<=>', line, start - line_start + 1,
+                    _IFF))
+            elif kind == 'eq':
+                append(Token(
+                    TokenType.EQUALS, '=', line, start - line_start + 1,
+                    _EQUALS))
             else:
-                break
-
-    def skip_comment(self):
-        """Skip comment line (from # to end of line)."""
-        if self.current_char() == '#':
-            while True:
-                ch = self.current_char()
-                if ch is None or ch == '\n':
-                    break
-                self.advance()
-
-    def make_token(self, token_type: TokenType, value: str) -> Token:
-        """Create a token at current position."""
-        return Token(token_type, value, self.line, self.column - len(value))
-
-    def tokenize(self) -> List[Token]:
-        """Tokenize the entire input."""
-        self.tokens = []
-
-        while self.current_char() is not None:
-            if self.current_char() in ' \t\r':
-                self.advance()
-                continue
-
-            if self.current_char() == '\n':
-                self.advance()
-                continue
-
-            if self.current_char() == '#':
-                self.skip_comment()
-                continue
-
-            if self.current_char() == '(':
-                tok = self.make_token(TokenType.LPAREN, '(')
-                self.tokens.append(tok)
-                self.advance()
-                continue
-
-            if self.current_char() == ')':
-                tok = self.make_token(TokenType.RPAREN, ')')
-                self.tokens.append(tok)
-                self.advance()
-                continue
-
-            if self.current_char() == '!':
-                tok = self.make_token(TokenType.NOT, '!')
-                self.tokens.append(tok)
-                self.advance()
-                continue
-
-            if self.current_char() == '+':
-                tok = self.make_token(TokenType.AND, '+')
-                self.tokens.append(tok)
-                self.advance()
-                continue
-
-            if self.current_char() == '|':
-                tok = self.make_token(TokenType.OR, '|')
-                self.tokens.append(tok)
-                self.advance()
-                continue
-
-            if self.current_char() == '^':
-                tok = self.make_token(TokenType.XOR, '^')
-                self.tokens.append(tok)
-                self.advance()
-                continue
-
-            if self.current_char() == '<':
-                start_col = self.column
-                self.advance()
-                if self.current_char() == '=' and self.peek_char() == '>':
-                    self.advance()
-                    self.advance()
-                    self.tokens.append(
-                        Token(
-                            TokenType.IFF,
-                            '<=>',
-                            self.line,
-                            start_col,
-                        )
-                    )
-                else:
+                ch = match.group(kind)
+                column = start - line_start + 1
+                if ch == '<':
                     raise SyntaxError(
-                        f"Invalid character '<' at line {self.line}, "
-                        f"column {start_col}"
-                    )
-                continue
-
-            if self.current_char() == '=':
-                start_col = self.column
-                self.advance()
-                if self.current_char() == '>':
-                    self.advance()
-                    self.tokens.append(
-                        Token(
-                            TokenType.IMPLIES,
-                            '=>',
-                            self.line,
-                            start_col,
-                        )
-                    )
-                else:
-                    self.tokens.append(
-                        Token(
-                            TokenType.EQUALS,
-                            '=',
-                            self.line,
-                            start_col,
-                        )
+                        f"Invalid character '<' at line {line}, "
+                        f"column {column}"
                     )
-                continue
-
-            if self.current_char() == '?':
-                tok = self.make_token(TokenType.QUERY, '?')
-                self.tokens.append(tok)
-                self.advance()
-                continue
-
-            if self.current_char().isupper():
-                fact = self.current_char()
-                tok = self.make_token(TokenType.FACT, fact)
-                self.tokens.append(tok)
-                self.advance()
-                continue
-
-            msg = (
-                "Unexpected character '"
-                + str(self.current_char())
-                + f"' at line {self.line}, column {self.column}"
-            )
-            raise SyntaxError(msg)
-
-        self.tokens.append(Token(TokenType.EOF, '', self.line, self.column))
-        return self.tokens
+                raise SyntaxError(
+                    f"Unexpected character '{ch}' at line {line}, "
+                    f"column {column}"
+                )
+
+        append(Token(
+            TokenType.EOF, '', line, len(self.text) - line_start + 1, _EOF))
+        self.tokens = tokens
+        return tokens
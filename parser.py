@@ -18,12 +18,35 @@ operator precedence: (), !, +, |, ^, =>, <=>
 """
 
 import sys
-from dataclasses import dataclass
-from typing import List, Set
+from dataclasses import dataclass, field
+from typing import (
+    Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+)
 from enum import Enum, auto
 from lexer import Token, TokenType, Lexer
 
 
+_FACT_BIT = {chr(c): 1 << (c - 65) for c in range(65, 91)}
+
+
+def fact_bits(facts: Iterable[str]) -> int:
+    """Pack facts (A-Z) into a 26-bit set: bit k marks chr(65 + k)."""
+    bits = 0
+    for fact in facts:
+        bits |= _FACT_BIT[fact]
+    return bits
+
+
+def facts_from_bits(bits: int) -> List[str]:
+    """Unpack a fact bit set into its facts, in alphabetical order."""
+    facts = []
+    while bits:
+        low = bits & -bits
+        facts.append(chr(64 + low.bit_length()))
+        bits ^= low
+    return facts
+
+
 class NodeType(Enum):
     """Types of AST nodes."""
     FACT = auto()
@@ -35,78 +58,148 @@ class NodeType(Enum):
     IFF = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class ASTNode:
-    """Base class for AST nodes."""
+    """Base class for AST nodes (slotted: rule bases build many)."""
     node_type: NodeType
-
-    def get_facts(self) -> Set[str]:
-        """Get all facts referenced in this node."""
+    _facts: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    _bits: int = field(init=False, repr=False, compare=False)
+
+    def get_facts(self) -> FrozenSet[str]:
+        """
+        Get all facts referenced in this node.
+        Nodes are immutable after parsing, so subclasses compute the set
+        once, bottom-up, in __init__.
+        """
         raise NotImplementedError
 
+    def get_fact_bits(self) -> int:
+        """Get the facts referenced in this node as a bit set."""
+        return self._bits
 
-@dataclass
+
+@dataclass(slots=True)
 class FactNode(ASTNode):
     """Represents a single fact (A-Z)."""
     fact: str
 
     def __init__(self, fact: str):
-        super().__init__(NodeType.FACT)
+        self.node_type = NodeType.FACT
         self.fact = fact
+        self._facts = frozenset((fact,))
+        self._bits = _FACT_BIT[fact]
 
-    def get_facts(self) -> Set[str]:
-        return {self.fact}
+    def get_facts(self) -> FrozenSet[str]:
+        return self._facts
 
     def __repr__(self):
         return f"Fact({self.fact})"
 
 
-@dataclass
+@dataclass(slots=True)
 class UnaryOpNode(ASTNode):
     """Represents a unary operation (NOT)."""
     operand: ASTNode
 
     def __init__(self, node_type: NodeType, operand: ASTNode):
-        super().__init__(node_type)
+        self.node_type = node_type
         self.operand = operand
+        self._facts = operand._facts
+        self._bits = operand._bits
 
-    def get_facts(self) -> Set[str]:
-        return self.operand.get_facts()
+    def get_facts(self) -> FrozenSet[str]:
+        return self._facts
 
     def __repr__(self):
         return f"{self.node_type.name}({self.operand})"
 
 
-@dataclass
+@dataclass(slots=True)
 class BinaryOpNode(ASTNode):
     """Represents a binary operation (AND, OR, XOR, IMPLIES, IFF)."""
     left: ASTNode
     right: ASTNode
 
     def __init__(self, node_type: NodeType, left: ASTNode, right: ASTNode):
-        super().__init__(node_type)
+        self.node_type = node_type
         self.left = left
         self.right = right
+        self._facts = left._facts | right._facts
+        self._bits = left._bits | right._bits
 
-    def get_facts(self) -> Set[str]:
-        return self.left.get_facts() | self.right.get_facts()
+    def get_facts(self) -> FrozenSet[str]:
+        return self._facts
 
     def __repr__(self):
         return f"{self.node_type.name}({self.left}, {self.right})"
 
 
+_CONCLUSION_PARENTS = frozenset((NodeType.AND, NodeType.OR, NodeType.XOR))
+
+
+def concluded_facts(node: ASTNode) -> Tuple[str, ...]:
+    """
+    Facts a conclusion can establish, sorted: the facts under AND / OR /
+    XOR, with a NOT over a fact giving '!fact'.
+    """
+    facts: Set[str] = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        node_type = current.node_type
+        if node_type is NodeType.FACT:
+            facts.add(current.fact)
+        elif node_type is NodeType.NOT:
+            if current.operand.node_type is NodeType.FACT:
+                facts.add(f"!{current.operand.fact}")
+        elif node_type in _CONCLUSION_PARENTS:
+            stack.append(current.right)
+            stack.append(current.left)
+    return tuple(sorted(facts))
+
+
 @dataclass
 class Rule:
     """
     Represents a rule: condition => conclusion or condition <=> conclusion.
+
+    The fact names of both sides are worked out once, on construction:
+    condition_fact_names lists every condition fact and
+    concluded_fact_names what the conclusion establishes (see
+    concluded_facts).
     """
     condition: ASTNode
     conclusion: ASTNode
     is_biconditional: bool = False
-
-    def get_all_facts(self) -> Set[str]:
-        """Get all facts used in this rule."""
-        return self.condition.get_facts() | self.conclusion.get_facts()
+    condition_fact_names: Tuple[str, ...] = field(
+        init=False, repr=False, compare=False)
+    concluded_fact_names: Tuple[str, ...] = field(
+        init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.condition_fact_names = tuple(sorted(self.condition.get_facts()))
+        self.concluded_fact_names = concluded_facts(self.conclusion)
+
+    def get_all_facts(self) -> FrozenSet[str]:
+        """Get all facts used in this rule (computed on first use)."""
+        try:
+            return self._all_facts
+        except AttributeError:
+            self._all_facts = (self.condition.get_facts()
+                               | self.conclusion.get_facts())
+            return self._all_facts
+
+    def reverse(self) -> 'Rule':
+        """
+        Get the conclusion => condition direction of a biconditional.
+        Built on first use and kept, so every knowledge graph built from
+        this rule shares one reverse Rule.
+        """
+        try:
+            return self._reverse
+        except AttributeError:
+            self._reverse = Rule(self.conclusion, self.condition, False)
+            return self._reverse
 
     def __repr__(self):
         op = "<=>" if self.is_biconditional else "=>"
@@ -116,6 +209,91 @@ class Rule:
         )
 
 
+_FACT_NODES = {fact: FactNode(fact) for fact in _FACT_BIT}
+
+
+ValueOf = Callable[[str], int]
+CompiledExpr = Callable[[ValueOf], int]
+
+
+def compile_ast(node: ASTNode) -> CompiledExpr:
+    """
+    Compile an expression into a closure, walking the AST only once.
+
+    The closure takes value_of(fact) returning a Kleene integer
+    (-1 false, 0 undetermined, 1 true) and returns the value of the
+    whole expression in the same encoding. AND and OR stop after the
+    left operand when it already decides the result.
+    """
+    node_type = node.node_type
+    if node_type is NodeType.FACT:
+        name = node.fact
+        return lambda value_of: value_of(name)
+
+    if node_type is NodeType.NOT:
+        inner = compile_ast(node.operand)
+        return lambda value_of: -inner(value_of)
+
+    left = compile_ast(node.left)
+    right = compile_ast(node.right)
+
+    if node_type is NodeType.AND:
+        def evaluate(value_of: ValueOf) -> int:
+            value = left(value_of)
+            if value == -1:
+                return -1
+            other = right(value_of)
+            return value if value < other else other
+    elif node_type is NodeType.OR:
+        def evaluate(value_of: ValueOf) -> int:
+            value = left(value_of)
+            if value == 1:
+                return 1
+            other = right(value_of)
+            return value if value > other else other
+    elif node_type is NodeType.XOR:
+        def evaluate(value_of: ValueOf) -> int:
+            value = left(value_of)
+            return -(value * right(value_of))
+    elif node_type is NodeType.IMPLIES:
+        def evaluate(value_of: ValueOf) -> int:
+            value = -left(value_of)
+            other = right(value_of)
+            return value if value > other else other
+    else:
+        def evaluate(value_of: ValueOf) -> int:
+            value = left(value_of)
+            return value * right(value_of)
+    return evaluate
+
+
+_LPAREN = TokenType.LPAREN.value
+_NOT = TokenType.NOT.value
+_IMPLIES = TokenType.IMPLIES.value
+_IFF = TokenType.IFF.value
+_FACT = TokenType.FACT.value
+_EQUALS = TokenType.EQUALS.value
+_QUERY = TokenType.QUERY.value
+_NEWLINE = TokenType.NEWLINE.value
+_EOF = TokenType.EOF.value
+
+_BINARY_PRECEDENCE = {
+    _IFF: 1,
+    _IMPLIES: 2,
+    TokenType.OR.value: 3,
+    TokenType.XOR.value: 4,
+    TokenType.AND.value: 5,
+}
+
+_BINARY_NODE_TYPES = {
+    _IFF: NodeType.IFF,
+    _IMPLIES: NodeType.IMPLIES,
+    TokenType.OR.value: NodeType.OR,
+    TokenType.XOR.value: NodeType.XOR,
+    TokenType.AND.value: NodeType.AND,
+}
+
+
 class Parser:
     """Parses tokens into an AST.
 
@@ -128,11 +306,47 @@ class Parser:
     and     -> not ('+' not)*
     not     -> '!' not | primary
     primary -> '(' iff ')' | FACT
+
+    The binary levels are parsed by one precedence-climbing loop
+    (parse_binary) driven by _BINARY_PRECEDENCE.
+
+    Nodes are hash-consed: facts map to the 26 module-level
+    _FACT_NODES, and an operator subexpression that was already built
+    (by this parser or another one sharing the nodes table) is
+    returned again instead of being rebuilt. Operators are keyed by
+    their token's int ttype and children by identity, which is sound
+    because the table keeps them alive and nodes are never mutated
+    after parsing.
+
+    Token types are compared through Token.ttype: ints compare and
+    hash in C, while TokenType hashes in Python.
     """
 
-    def __init__(self, tokens: List[Token]):
+    def __init__(
+        self,
+        tokens: List[Token],
+        nodes: Optional[Dict[tuple, ASTNode]] = None
+    ):
         self.tokens = tokens
         self.pos = 0
+        self.nodes: Dict[tuple, ASTNode] = {} if nodes is None else nodes
+
+    def _not(self, operand: ASTNode) -> ASTNode:
+        """Get the shared NOT node over operand."""
+        key = (_NOT, id(operand))
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = UnaryOpNode(NodeType.NOT, operand)
+        return node
+
+    def _binary(self, ttype: int, left: ASTNode, right: ASTNode) -> ASTNode:
+        """Get the shared node for the binary operator token ttype."""
+        key = (ttype, id(left), id(right))
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = BinaryOpNode(
+                _BINARY_NODE_TYPES[ttype], left, right)
+        return node
 
     def current_token(self) -> Token:
         """Get current token."""
@@ -169,15 +383,15 @@ class Parser:
         """Parse primary expression: '(' expression ')' | FACT"""
         token = self.current_token()
 
-        if token.type == TokenType.LPAREN:
+        if token.ttype == _LPAREN:
             self.advance()
-            node = self.parse_iff()
+            node = self.parse_binary()
             self.expect(TokenType.RPAREN)
             return node
 
-        if token.type == TokenType.FACT:
+        if token.ttype == _FACT:
             self.advance()
-            return FactNode(token.value)
+            return _FACT_NODES[token.value]
 
         raise SyntaxError(
             f"Expected '(' or FACT, got {token.type.name} "
@@ -188,75 +402,37 @@ class Parser:
         """Parse NOT expression: '!' not | primary"""
         token = self.current_token()
 
-        if token.type == TokenType.NOT:
+        if token.ttype == _NOT:
             self.advance()
             operand = self.parse_not()
-            return UnaryOpNode(NodeType.NOT, operand)
+            return self._not(operand)
 
         return self.parse_primary()
 
-    def parse_and(self) -> ASTNode:
-        """Parse AND expression: not ( '+' not )*"""
+    def parse_binary(self, min_prec: int = 1) -> ASTNode:
+        """
+        Parse a chain of binary operators by precedence climbing.
+        Every operator is left-associative, so the right operand is
+        parsed one precedence level tighter.
+        """
         left = self.parse_not()
 
-        while self.current_token().type == TokenType.AND:
+        while True:
+            ttype = self.current_token().ttype
+            prec = _BINARY_PRECEDENCE.get(ttype)
+            if prec is None or prec < min_prec:
+                return left
             self.advance()
-            right = self.parse_not()
-            left = BinaryOpNode(NodeType.AND, left, right)
-
-        return left
-
-    def parse_xor(self) -> ASTNode:
-        """Parse XOR expression: and ( '^' and )*"""
-        left = self.parse_and()
-
-        while self.current_token().type == TokenType.XOR:
-            self.advance()
-            right = self.parse_and()
-            left = BinaryOpNode(NodeType.XOR, left, right)
-
-        return left
-
-    def parse_or(self) -> ASTNode:
-        """Parse OR expression: xor ( '|' xor )*"""
-        left = self.parse_xor()
-
-        while self.current_token().type == TokenType.OR:
-            self.advance()
-            right = self.parse_xor()
-            left = BinaryOpNode(NodeType.OR, left, right)
-
-        return left
-
-    def parse_implies(self) -> ASTNode:
-        """Parse IMPLIES expression: or ( '=>' or )*"""
-        left = self.parse_or()
-
-        while self.current_token().type == TokenType.IMPLIES:
-            self.advance()
-            right = self.parse_or()
-            left = BinaryOpNode(NodeType.IMPLIES, left, right)
-
-        return left
-
-    def parse_iff(self) -> ASTNode:
-        """Parse IFF expression: implies ( '<=>' implies )*"""
-        left = self.parse_implies()
-
-        while self.current_token().type == TokenType.IFF:
-            self.advance()
-            right = self.parse_implies()
-            left = BinaryOpNode(NodeType.IFF, left, right)
-
-        return left
+            right = self.parse_binary(prec + 1)
+            left = self._binary(ttype, left, right)
 
     def parse_expression(self) -> ASTNode:
         """Parse a complete expression."""
-        return self.parse_iff()
+        return self.parse_binary()
 
     def parse_rule(self) -> Rule:
         """Parse a rule: expression (=> | <=>) expression"""
-        expr = self.parse_iff()
+        expr = self.parse_binary()
 
         if isinstance(expr, BinaryOpNode):
             if expr.node_type == NodeType.IMPLIES:
@@ -273,22 +449,117 @@ def parse_input_file(text: str) -> tuple[List[Rule], Set[str], List[str]]:
     Parse the entire input file.
     Returns: (rules, initial_facts, queries)
 
-    Strategy: Parse line by line. Each line can be:
+    Strategy: Tokenize the whole file once and walk it line by line,
+    splitting on NEWLINE tokens. Each line can be:
     - A rule (contains => or <=>)
     - Initial facts (starts with =)
     - Queries (starts with ?)
     - Comment (starts with #)
     - Empty line
+
+    Files the single pass cannot take as a whole (a lexical error, or a
+    line starting with '=>') go through _parse_lines, which lexes each
+    line on its own and so reports errors exactly as before.
     """
+    try:
+        tokens = Lexer(text).tokenize()
+    except SyntaxError:
+        return _parse_lines(text)
+
+    spans = []
+    start = 0
+    has_implies = False
+    for end, token in enumerate(tokens):
+        ttype = token.ttype
+        if ttype == _IMPLIES or ttype == _IFF:
+            has_implies = True
+        elif ttype == _NEWLINE or ttype == _EOF:
+            if end > start:
+                if tokens[start].ttype == _IMPLIES:
+                    return _parse_lines(text)
+                spans.append((start, end, has_implies))
+            start = end + 1
+            has_implies = False
+
     rules: List[Rule] = []
     initial_facts: Set[str] = set()
     queries: List[str] = []
+    nodes: Dict[tuple, ASTNode] = {}
+    parser = Parser(tokens, nodes)
+    lines: Optional[List[str]] = None
 
-    for line_num, line in enumerate(text.split('\n'), 1):
-        if '#' in line:
-            line = line[:line.index('#')]
+    for start, end, has_implies in spans:
+        first = tokens[start].ttype
+
+        if first == _EQUALS:
+            for token in tokens[start + 1:end]:
+                if token.ttype == _FACT:
+                    initial_facts.add(token.value)
+
+        elif first == _QUERY:
+            for token in tokens[start + 1:end]:
+                if token.ttype == _FACT:
+                    queries.append(token.value)
+
+        elif has_implies and end - start > 1:
+            parser.pos = start
+            try:
+                rules.append(parser.parse_rule())
+            except Exception:
+                # Positions in the message are relative to the line,
+                # so lex and parse it alone to report the error.
+                if lines is None:
+                    lines = text.split('\n')
+                line_num = tokens[start].line
+                _parse_rule_line(
+                    _clean_line(lines[line_num - 1]), line_num, nodes, rules)
+
+    return rules, initial_facts, queries
+
+
+def _clean_line(line: str) -> str:
+    """Drop a trailing comment and surrounding whitespace."""
+    if '#' in line:
+        line = line[:line.index('#')]
+    return line.strip()
+
+
+def _parse_rule_line(
+    line: str,
+    line_num: int,
+    nodes: Dict[tuple, ASTNode],
+    rules: List[Rule]
+):
+    """Lex and parse a single rule line, warning if it is malformed."""
+    try:
+        lexer = Lexer(line)
+        tokens = lexer.tokenize()
+
+        has_implies = any(
+            t.type in [
+                TokenType.IMPLIES,
+                TokenType.IFF] for t in tokens)
+
+        if has_implies and len(tokens) > 2:
+            parser = Parser(tokens, nodes)
+            rule = parser.parse_rule()
+            rules.append(rule)
+    except (SyntaxError, Exception) as e:
+        print(
+            f"Warning: Could not parse line {line_num}: {line}",
+            file=sys.stderr)
+        print(f"  Error: {e}", file=sys.stderr)
+
+
+def _parse_lines(text: str) -> tuple[List[Rule], Set[str], List[str]]:
+    """Parse an input file lexing each line separately."""
+    rules: List[Rule] = []
+    initial_facts: Set[str] = set()
+    queries: List[str] = []
+    nodes: Dict[tuple, ASTNode] = {}
 
-        line = line.strip()
+    for line_num, line in enumerate(text.split('\n'), 1):
+        line = _clean_line(line)
 
         if not line:
             continue
@@ -310,23 +581,6 @@ def parse_input_file(text: str) -> tuple[List[Rule], Set[str], List[str]]:
                     queries.append(token.value)
 
         else:
-            try:
-                lexer = Lexer(line)
-                tokens = lexer.tokenize()
-
-                has_implies = any(
-                    t.type in [
-                        TokenType.IMPLIES,
-                        TokenType.IFF] for t in tokens)
-
-                if has_implies and len(tokens) > 2:
-                    parser = Parser(tokens)
-                    rule = parser.parse_rule()
-                    rules.append(rule)
-            except (SyntaxError, Exception) as e:
-                print(
-                    f"Warning: Could not parse line {line_num}: {line}",
-                    file=sys.stderr)
-                print(f"  Error: {e}", file=sys.stderr)
+            _parse_rule_line(line, line_num, nodes, rules)
 
     return rules, initial_facts, queries
@@ -27,81 +27,181 @@ from parser import (
 )
 from inference_engine import InferenceEngine, TruthValue
 
+_FORMAL_OPS = {
+    NodeType.AND: "∧",
+    NodeType.OR: "∨",
+    NodeType.XOR: "⊕",
+    NodeType.IMPLIES: "⇒",
+    NodeType.IFF: "⇔"
+}
+
+_NAT_OPS = {
+    NodeType.AND: "AND",
+    NodeType.OR: "OR",
+    NodeType.XOR: "XOR",
+    NodeType.IMPLIES: "IMPLIES",
+    NodeType.IFF: "IF-AND-ONLY-IF"
+}
+
 
 class ReasoningVisualizer:
     """Visualizes the reasoning process for queries."""
 
-    def __init__(self, rules, initial_facts):
+    def __init__(self, rules, initial_facts, sink=None, record_steps=True):
         self.rules = rules
-        self.initial_facts = initial_facts
+        self.initial_facts = frozenset(initial_facts)
         self.engine = InferenceEngine(rules, initial_facts)
         self.reasoning_steps = []
+        # Optional callable such as sys.stdout.write; when set, each
+        # step line is written to it as soon as it is produced.
+        self.sink = sink
+        # Summary-only mode: steps are dropped unformatted, with no
+        # per-step check, by shadowing add_step on the instance.
+        self.record_steps = record_steps
+        if not record_steps:
+            self.add_step = self._skip_step
         self.depth = 0
+        self._fact_cache = {}
+        # Formatted strings keyed by id(node), stored as (node, string):
+        # callers may format nodes that are freed later and their ids
+        # reused, so an entry counts only for the node it was made from.
+        self._fmt_cache = {}
+        self._fmt_nat_cache = {}
+        # Explanation programs as (condition, program), keyed the same
+        # way; see _compile_explanation.
+        self._programs = {}
+        self._indents = [""]
+        # Operators explained step by step: word, symbol and the
+        # engine's table lookup for each.
+        self._binops = {
+            NodeType.AND: ("AND", "∧", self.engine._eval_and),
+            NodeType.OR: ("OR", "∨", self.engine._eval_or),
+            NodeType.XOR: ("XOR", "⊕", self.engine._eval_xor),
+        }
 
     def format_node(self, node):
         """Format an AST node as a string."""
-        if isinstance(node, FactNode):
-            return node.fact
-        elif isinstance(node, UnaryOpNode):
-            if node.node_type == NodeType.NOT:
-                operand = self.format_node(node.operand)
-                return f"¬{operand}"
-        elif isinstance(node, BinaryOpNode):
-            left = self.format_node(node.left)
-            right = self.format_node(node.right)
-            op_map = {
-                NodeType.AND: "∧",
-                NodeType.OR: "∨",
-                NodeType.XOR: "⊕",
-                NodeType.IMPLIES: "⇒",
-                NodeType.IFF: "⇔"
-            }
-            op = op_map.get(node.node_type, "?")
-            return f"({left} {op} {right})"
-        return "?"
+        cached = self._fmt_cache.get(id(node))
+        if cached is not None and cached[0] is node:
+            return cached[1]
+        handler = _FORMAT_HANDLERS.get(type(node), _format_unknown)
+        result = handler(self, node)
+        self._fmt_cache[id(node)] = (node, result)
+        return result
 
     def format_node_natural(self, node):
         """Format an AST node in natural language."""
-        if isinstance(node, FactNode):
-            return node.fact
-        elif isinstance(node, UnaryOpNode):
-            if node.node_type == NodeType.NOT:
-                operand = self.format_node_natural(node.operand)
-                return f"NOT {operand}"
-        elif isinstance(node, BinaryOpNode):
-            left = self.format_node_natural(node.left)
-            right = self.format_node_natural(node.right)
-            op_map = {
-                NodeType.AND: "AND",
-                NodeType.OR: "OR",
-                NodeType.XOR: "XOR",
-                NodeType.IMPLIES: "IMPLIES",
-                NodeType.IFF: "IF-AND-ONLY-IF"
-            }
-            op = op_map.get(node.node_type, "?")
-            return f"({left} {op} {right})"
+        cached = self._fmt_nat_cache.get(id(node))
+        if cached is not None and cached[0] is node:
+            return cached[1]
+        handler = _FORMAT_NATURAL_HANDLERS.get(type(node), _format_unknown)
+        result = handler(self, node)
+        self._fmt_nat_cache[id(node)] = (node, result)
+        return result
+
+    def _format_unary(self, node):
+        """Format a unary operator node as a string."""
+        if node.node_type == NodeType.NOT:
+            return f"¬{self.format_node(node.operand)}"
+        return "?"
+
+    def _format_binary(self, node):
+        """Format a binary operator node as a string."""
+        left = self.format_node(node.left)
+        right = self.format_node(node.right)
+        op = _FORMAL_OPS.get(node.node_type, "?")
+        return f"({left} {op} {right})"
+
+    def _format_unary_natural(self, node):
+        """Format a unary operator node in natural language."""
+        if node.node_type == NodeType.NOT:
+            return f"NOT {self.format_node_natural(node.operand)}"
         return "?"
 
+    def _format_binary_natural(self, node):
+        """Format a binary operator node in natural language."""
+        left = self.format_node_natural(node.left)
+        right = self.format_node_natural(node.right)
+        op = _NAT_OPS.get(node.node_type, "?")
+        return f"({left} {op} {right})"
+
+    def _indent(self):
+        """Return the indent for the current depth, built once per depth."""
+        indents = self._indents
+        while len(indents) <= self.depth:
+            indents.append(indents[-1] + "  ")
+        return indents[self.depth]
+
     def add_step(self, message, formal=None):
         """Add a reasoning step."""
-        indent = "  " * self.depth
-        self.reasoning_steps.append(f"{indent}• {message}")
+        indent = self._indent()
+        self._emit(f"{indent}• {message}")
         if formal:
-            self.reasoning_steps.append(f"{indent}  Formal: {formal}")
+            self._emit(f"{indent}  Formal: {formal}")
+
+    def _skip_step(self, message, formal=None):
+        """Discard a reasoning step (record_steps=False)."""
+
+    def _emit(self, line):
+        """Record a step line, also writing it to the sink if set."""
+        self.reasoning_steps.append(line)
+        if self.sink is not None:
+            self.sink(line + "\n")
 
     def explain_query(self, fact):
         """Generate explanation for why a fact has its truth value."""
         self.reasoning_steps = []
         self.depth = 0
+        self._fact_cache = {}
 
-        result = self._explain_fact(fact)
+        # The cache is reset per query, so the queried fact's own steps
+        # are never replayed: mark it for cycle detection but do not
+        # copy the whole trace into the cache.
+        self._fact_cache[fact] = (TruthValue.UNDETERMINED, None)
+        result = self._explain_fact_uncached(fact)
 
         summary = self._generate_summary(fact, result)
 
+        if not self.record_steps:
+            return summary, result, []
         return summary, result, self.reasoning_steps
 
     def _explain_fact(self, fact):
-        """Explain the evaluation of a fact."""
+        """
+        Explain the evaluation of a fact, once per query.
+
+        A fact met again replays its cached steps at the current depth
+        instead of being walked again. The cache holds a None snippet
+        while the fact is being explained, so a rule cycle back to it
+        stops there as UNDETERMINED.
+        """
+        cached = self._fact_cache.get(fact)
+        if cached is not None:
+            result, snippet = cached
+            if snippet is None:
+                self.add_step(
+                    f"{fact} is UNDETERMINED (already being evaluated)",
+                    f"{fact} = ?"
+                )
+            else:
+                indent = self._indent()
+                lines = [indent + step for step in snippet]
+                self.reasoning_steps.extend(lines)
+                if self.sink is not None:
+                    self.sink("".join(line + "\n" for line in lines))
+            return result
+
+        self._fact_cache[fact] = (TruthValue.UNDETERMINED, None)
+        start = len(self.reasoning_steps)
+        result = self._explain_fact_uncached(fact)
+        strip = 2 * self.depth
+        self._fact_cache[fact] = (result, [
+            step[strip:] for step in self.reasoning_steps[start:]
+        ])
+        return result
+
+    def _explain_fact_uncached(self, fact):
+        """Explain the evaluation of a fact, walking its rules."""
         if fact in self.initial_facts:
             self.add_step(
                 f"{fact} is TRUE (given as initial fact)",
@@ -109,8 +209,11 @@ class ReasoningVisualizer:
             )
             return TruthValue.TRUE
 
-        has_rules = fact in self.engine.rules_concluding
-        has_negation = f"!{fact}" in self.engine.rules_concluding
+        rules_concluding = self.engine.rules_concluding
+        pos_rules = rules_concluding.get(fact)
+        neg_rules = rules_concluding.get("!" + fact)
+        has_rules = pos_rules is not None
+        has_negation = neg_rules is not None
 
         if not has_rules and not has_negation:
             msg = (
@@ -127,7 +230,7 @@ class ReasoningVisualizer:
             self.add_step(f"Checking rules that can conclude {fact}:")
             self.depth += 1
 
-            for i, rule in enumerate(self.engine.rules_concluding[fact], 1):
+            for i, rule in enumerate(pos_rules, 1):
                 rule_str = self.format_node(rule.condition)
                 conclusion_str = self.format_node(rule.conclusion)
                 rule_nat = self.format_node_natural(rule.condition)
@@ -165,11 +268,13 @@ class ReasoningVisualizer:
 
             self.depth -= 1
 
-        if f"!{fact}" in self.engine.rules_concluding and not can_be_true:
+        if has_negation and not can_be_true:
             self.add_step(f"Checking rules that can conclude NOT {fact}:")
             self.depth += 1
 
-            for rule in self.engine.rules_concluding[f"!{fact}"]:
+            # The outcome below depends only on the positive rules, so
+            # the first negation rule that fires settles the check.
+            for rule in neg_rules:
                 condition_result = self._explain_expression(rule.condition)
                 if condition_result == TruthValue.TRUE:
                     msg = (
@@ -181,9 +286,7 @@ class ReasoningVisualizer:
                         f"{fact} = ?"
                     )
                     self.add_step(msg, formal)
-                    if can_be_true:
-                        self.depth -= 1
-                        return TruthValue.UNDETERMINED
+                    break
 
             self.depth -= 1
 
@@ -203,93 +306,88 @@ class ReasoningVisualizer:
             return TruthValue.FALSE
 
     def _explain_expression(self, node):
-        """Explain the evaluation of an expression."""
-        if isinstance(node, FactNode):
-            return self._explain_fact(node.fact)
-
-        elif isinstance(node, UnaryOpNode):
-            if node.node_type == NodeType.NOT:
+        """
+        Explain the evaluation of an expression by running its
+        explanation program: operands are explained between an
+        operator's enter and exit instructions, and their values kept
+        on a stack until the operator combines them.
+        """
+        cached = self._programs.get(id(node))
+        if cached is not None and cached[0] is node:
+            program = cached[1]
+        else:
+            program = _compile_explanation(node)
+            self._programs[id(node)] = (node, program)
+
+        values = []
+        for opcode, node in program:
+            if opcode == _EXPLAIN_FACT:
+                values.append(self._explain_fact(node.fact))
+            elif opcode == _EXPLAIN_ENTER_NOT:
                 operand_str = self.format_node(node.operand)
                 self.add_step(f"Evaluating NOT {operand_str}")
                 self.depth += 1
-                operand_value = self._explain_expression(node.operand)
+            elif opcode == _EXPLAIN_EXIT_NOT:
                 self.depth -= 1
-
-                if operand_value == TruthValue.TRUE:
-                    result = TruthValue.FALSE
-                    self.add_step(
-                        "NOT TRUE = FALSE",
-                        "¬⊤ = ⊥"
-                    )
-                elif operand_value == TruthValue.FALSE:
-                    result = TruthValue.TRUE
-                    self.add_step(
-                        "NOT FALSE = TRUE",
-                        "¬⊥ = ⊤"
-                    )
-                else:
-                    result = TruthValue.UNDETERMINED
-                    self.add_step(
-                        "NOT UNDETERMINED = UNDETERMINED",
-                        "¬? = ?"
-                    )
-                return result
-
-        elif isinstance(node, BinaryOpNode):
-            left_str = self.format_node(node.left)
-            right_str = self.format_node(node.right)
-
-            msg = self.format_node_natural(node)
-            self.add_step(
-                f"Evaluating {msg}",
-                self.format_node(node)
-            )
-            self.depth += 1
-
-            left_value = self._explain_expression(node.left)
-            right_value = self._explain_expression(node.right)
-
-            self.depth -= 1
-
-            if node.node_type == NodeType.AND:
-                result = self.engine._eval_and(left_value, right_value)
-                msg = (
-                    f"{left_str}={left_value.name} AND "
-                    f"{right_str}={right_value.name} = {result.name}"
-                )
-                formal = (
-                    f"{left_str} ∧ {right_str} = "
-                    f"{self._truth_symbol(result)}"
-                )
-                self.add_step(msg, formal)
-            elif node.node_type == NodeType.OR:
-                result = self.engine._eval_or(left_value, right_value)
-                msg = (
-                    f"{left_str}={left_value.name} OR "
-                    f"{right_str}={right_value.name} = {result.name}"
-                )
-                formal = (
-                    f"{left_str} ∨ {right_str} = "
-                    f"{self._truth_symbol(result)}"
-                )
-                self.add_step(msg, formal)
-            elif node.node_type == NodeType.XOR:
-                result = self.engine._eval_xor(left_value, right_value)
-                msg = (
-                    f"{left_str}={left_value.name} XOR "
-                    f"{right_str}={right_value.name} = {result.name}"
-                )
-                formal = (
-                    f"{left_str} ⊕ {right_str} = "
-                    f"{self._truth_symbol(result)}"
+                values.append(self._explain_not(values.pop()))
+            elif opcode == _EXPLAIN_ENTER_BINARY:
+                msg = self.format_node_natural(node)
+                self.add_step(
+                    f"Evaluating {msg}",
+                    self.format_node(node)
                 )
-                self.add_step(msg, formal)
+                self.depth += 1
+            elif opcode == _EXPLAIN_EXIT_BINARY:
+                self.depth -= 1
+                right_value = values.pop()
+                left_value = values.pop()
+                values.append(
+                    self._explain_binary(node, left_value, right_value))
             else:
-                result = TruthValue.UNDETERMINED
+                values.append(TruthValue.UNDETERMINED)
+        return values[0]
 
-            return result
+    def _explain_not(self, operand_value):
+        """Explain negating an already explained operand."""
+        if operand_value == TruthValue.TRUE:
+            result = TruthValue.FALSE
+            self.add_step(
+                "NOT TRUE = FALSE",
+                "¬⊤ = ⊥"
+            )
+        elif operand_value == TruthValue.FALSE:
+            result = TruthValue.TRUE
+            self.add_step(
+                "NOT FALSE = TRUE",
+                "¬⊥ = ⊤"
+            )
+        else:
+            result = TruthValue.UNDETERMINED
+            self.add_step(
+                "NOT UNDETERMINED = UNDETERMINED",
+                "¬? = ?"
+            )
+        return result
 
-        return TruthValue.UNDETERMINED
+    def _explain_binary(self, node, left_value, right_value):
+        """Explain combining the already explained operands of a node."""
+        binop = self._binops.get(node.node_type)
+        if binop is None:
+            return TruthValue.UNDETERMINED
+        left_str = self.format_node(node.left)
+        right_str = self.format_node(node.right)
+        word, symbol, evaluate = binop
+        result = evaluate(left_value, right_value)
+        msg = (
+            f"{left_str}={left_value.name} {word} "
+            f"{right_str}={right_value.name} = {result.name}"
+        )
+        formal = (
+            f"{left_str} {symbol} {right_str} = "
+            f"{self._truth_symbol(result)}"
+        )
+        self.add_step(msg, formal)
+        return result
 
     def _truth_symbol(self, value):
         """Convert TruthValue to formal logic symbol."""
@@ -316,6 +414,71 @@ class ReasoningVisualizer:
         return summary
 
 
+def _format_fact(visualizer, node):
+    """Format a fact leaf; the same in either notation."""
+    return node.fact
+
+
+def _format_unknown(visualizer, node):
+    """Format a node of an unexpected type."""
+    return "?"
+
+
+# Handlers keyed by exact node class: the parser only builds these
+# three classes, never subclasses, so one dict lookup on type(node)
+# replaces the isinstance chain.
+_FORMAT_HANDLERS = {
+    FactNode: _format_fact,
+    UnaryOpNode: ReasoningVisualizer._format_unary,
+    BinaryOpNode: ReasoningVisualizer._format_binary,
+}
+
+_FORMAT_NATURAL_HANDLERS = {
+    FactNode: _format_fact,
+    UnaryOpNode: ReasoningVisualizer._format_unary_natural,
+    BinaryOpNode: ReasoningVisualizer._format_binary_natural,
+}
+
+
+(_EXPLAIN_FACT, _EXPLAIN_ENTER_NOT, _EXPLAIN_EXIT_NOT,
+ _EXPLAIN_ENTER_BINARY, _EXPLAIN_EXIT_BINARY,
+ _EXPLAIN_UNDETERMINED) = range(6)
+
+
+def _compile_explanation(root):
+    """
+    Flatten an expression into (opcode, node) instructions in the
+    order _explain_expression visits them: a NOT or binary node is
+    entered, its operands follow left to right, then it is exited.
+    Any other unary node explains to UNDETERMINED without its operand.
+    """
+    program = []
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        kind = type(node)
+        if kind is FactNode:
+            program.append((_EXPLAIN_FACT, node))
+        elif kind is UnaryOpNode and node.node_type == NodeType.NOT:
+            if expanded:
+                program.append((_EXPLAIN_EXIT_NOT, node))
+            else:
+                program.append((_EXPLAIN_ENTER_NOT, node))
+                stack.append((node, True))
+                stack.append((node.operand, False))
+        elif kind is BinaryOpNode:
+            if expanded:
+                program.append((_EXPLAIN_EXIT_BINARY, node))
+            else:
+                program.append((_EXPLAIN_ENTER_BINARY, node))
+                stack.append((node, True))
+                stack.append((node.right, False))
+                stack.append((node.left, False))
+        else:
+            program.append((_EXPLAIN_UNDETERMINED, node))
+    return program
+
+
 def main():
     """Main entry point for reasoning visualizer."""
     if len(sys.argv) != 2:
@@ -334,14 +497,14 @@ def main():
         return 1
 
     try:
-        with open(input_file, 'r') as f:
-            content = f.read()
+        content = Path(input_file).read_text()
         rules, initial_facts, queries = parse_input_file(content)
     except Exception as e:
         print(f"Error parsing input file: {e}", file=sys.stderr)
         return 1
 
-    visualizer = ReasoningVisualizer(rules, initial_facts)
+    visualizer = ReasoningVisualizer(
+        rules, initial_facts, sink=sys.stdout.write)
 
     print("=" * 70)
     print("REASONING VISUALIZATION")
@@ -358,10 +521,7 @@ def main():
         print(f"QUERY: {query}")
         print(f"{'=' * 70}")
 
-        summary, result, steps = visualizer.explain_query(query)
-
-        for step in steps:
-            print(step)
+        summary, result, _ = visualizer.explain_query(query)
 
         print()
         print(f"CONCLUSION: {summary}")
@@ -21,6 +21,7 @@ Provides comprehensive statistics about the rule set, including:
 - Performance analysis
 """
 
+import heapq
 import sys
 from pathlib import Path
 from collections import defaultdict
@@ -30,56 +31,108 @@ from parser import (
 )
 from inference_engine import InferenceEngine
 
+_ASCII_OPS = {
+    NodeType.AND: " + ",
+    NodeType.OR: " | ",
+    NodeType.XOR: " ^ ",
+    NodeType.IMPLIES: " => ",
+    NodeType.IFF: " <=> "
+}
+
+_OP_NAMES = {
+    NodeType.NOT: "NOT (!)",
+    NodeType.AND: "AND (+)",
+    NodeType.OR: "OR (|)",
+    NodeType.XOR: "XOR (^)",
+    NodeType.IMPLIES: "IMPLIES (=>)",
+    NodeType.IFF: "IFF (<=>)",
+}
+
 
 class StatisticsAnalyzer:
     """Analyzes rules and provides statistics."""
 
     def __init__(self, rules, initial_facts):
         self.rules = rules
-        self.initial_facts = initial_facts
+        self.initial_facts = frozenset(initial_facts)
         self.engine = InferenceEngine(rules, initial_facts)
+        # Formatted nodes, and per-rule metrics and formatted strings,
+        # keyed by id() and stored as (object, value): an entry counts
+        # only for the very object it was computed from, since ids are
+        # reused once objects are freed. All are dropped together when
+        # self.rules is replaced.
+        self._fmt_cache = {}
+        self._rule_metrics_cache = {}
+        self._rule_str_cache = {}
+        self._metrics_rules = rules
+
+    def _walk(self, node, counts, depth=0):
+        """
+        Walk an AST once, iteratively and in pre-order: add its
+        operators to counts and return (number of operators, maximum
+        depth). Fact names need no walk: get_facts() is precomputed.
+        """
+        operators = 0
+        max_depth = depth
+        stack = [(node, depth)]
+        while stack:
+            node, depth = stack.pop()
+            if isinstance(node, UnaryOpNode):
+                counts[node.node_type] += 1
+                operators += 1
+                stack.append((node.operand, depth + 1))
+            elif isinstance(node, BinaryOpNode):
+                counts[node.node_type] += 1
+                operators += 1
+                stack.append((node.right, depth + 1))
+                stack.append((node.left, depth + 1))
+            elif depth > max_depth:
+                max_depth = depth
+        return operators, max_depth
 
     def count_operators(self, node):
         """Count operators in an AST node."""
         counts = defaultdict(int)
-
-        if isinstance(node, FactNode):
-            pass
-        elif isinstance(node, UnaryOpNode):
-            counts[node.node_type] += 1
-            sub_counts = self.count_operators(node.operand)
-            for k, v in sub_counts.items():
-                counts[k] += v
-        elif isinstance(node, BinaryOpNode):
-            counts[node.node_type] += 1
-            left_counts = self.count_operators(node.left)
-            right_counts = self.count_operators(node.right)
-            for k, v in left_counts.items():
-                counts[k] += v
-            for k, v in right_counts.items():
-                counts[k] += v
-
+        self._walk(node, counts)
         return counts
 
     def get_rule_complexity(self, rule):
         """Calculate complexity score for a rule."""
-        cond_ops = self.count_operators(rule.condition)
-        concl_ops = self.count_operators(rule.conclusion)
-
-        total = sum(cond_ops.values()) + sum(concl_ops.values())
-        return total
+        return self._rule_metrics(rule)[4]
 
     def get_rule_depth(self, node, depth=0):
         """Get maximum depth of an AST."""
-        if isinstance(node, FactNode):
-            return depth
-        elif isinstance(node, UnaryOpNode):
-            return self.get_rule_depth(node.operand, depth + 1)
-        elif isinstance(node, BinaryOpNode):
-            left_depth = self.get_rule_depth(node.left, depth + 1)
-            right_depth = self.get_rule_depth(node.right, depth + 1)
-            return max(left_depth, right_depth)
-        return depth
+        return self._walk(node, defaultdict(int), depth)[1]
+
+    def _rule_metrics(self, rule):
+        """
+        Return (operator counts, depth, facts used, facts concluded,
+        complexity) for a rule, walking each side once and caching the
+        result until self.rules is replaced.
+        """
+        self._sync_rule_caches()
+        cached = self._rule_metrics_cache.get(id(rule))
+        if cached is not None and cached[0] is rule:
+            metrics = cached[1]
+        else:
+            counts = defaultdict(int)
+            cond_ops, cond_depth = self._walk(rule.condition, counts)
+            concl_ops, concl_depth = self._walk(rule.conclusion, counts)
+            metrics = (
+                dict(counts), max(cond_depth, concl_depth),
+                rule.condition.get_facts(), rule.conclusion.get_facts(),
+                cond_ops + concl_ops,
+            )
+            self._rule_metrics_cache[id(rule)] = (rule, metrics)
+        return metrics
+
+    def _sync_rule_caches(self):
+        """Drop the caches if self.rules has been replaced."""
+        if self.rules is not self._metrics_rules:
+            self._fmt_cache.clear()
+            self._rule_metrics_cache.clear()
+            self._rule_str_cache.clear()
+            self._metrics_rules = self.rules
 
     def analyze_rules(self):
         """Analyze all rules and return statistics."""
@@ -89,33 +142,37 @@ class StatisticsAnalyzer:
             'total_operators': defaultdict(int),
             'complexity_scores': [],
             'max_depth': 0,
-            'facts_used': set(),
-            'facts_concluded': set(),
             'rule_types': defaultdict(int),
+            'dependencies': defaultdict(set),
         }
 
+        total_operators = stats['total_operators']
+        dependencies = stats['dependencies']
+        used_sets = []
+        concluded_sets = []
         for rule in self.rules:
             if rule.is_biconditional:
                 stats['biconditional_rules'] += 1
 
-            cond_ops = self.count_operators(rule.condition)
-            concl_ops = self.count_operators(rule.conclusion)
+            counts, depth, used, concluded, complexity = (
+                self._rule_metrics(rule))
+            for op_type, count in counts.items():
+                total_operators[op_type] += count
+            used_sets.append(used)
+            concluded_sets.append(concluded)
 
-            for k, v in cond_ops.items():
-                stats['total_operators'][k] += v
-            for k, v in concl_ops.items():
-                stats['total_operators'][k] += v
-
-            complexity = self.get_rule_complexity(rule)
             stats['complexity_scores'].append(complexity)
-
-            cond_depth = self.get_rule_depth(rule.condition)
-            concl_depth = self.get_rule_depth(rule.conclusion)
-            max_rule_depth = max(cond_depth, concl_depth)
-            stats['max_depth'] = max(stats['max_depth'], max_rule_depth)
-
-            stats['facts_used'].update(rule.condition.get_facts())
-            stats['facts_concluded'].update(rule.conclusion.get_facts())
+            stats['max_depth'] = max(stats['max_depth'], depth)
+
+            # A fact depends on the condition facts of every rule
+            # direction concluding it, as in engine.rules_concluding.
+            directions = ((rule, rule.reverse()) if rule.is_biconditional
+                          else (rule,))
+            for direction in directions:
+                for fact in direction.concluded_fact_names:
+                    if not fact.startswith('!'):
+                        dependencies[fact].update(
+                            direction.condition_fact_names)
 
         if stats['complexity_scores']:
             total_complexity = sum(stats['complexity_scores'])
@@ -124,138 +181,156 @@ class StatisticsAnalyzer:
             stats['max_complexity'] = max(stats['complexity_scores'])
             stats['min_complexity'] = min(stats['complexity_scores'])
 
-        stats['facts_used'] = sorted(stats['facts_used'])
-        stats['facts_concluded'] = sorted(
-            stats['facts_concluded'])
+        # One C-level union over the precomputed per-rule sets
+        stats['facts_used'] = sorted(set().union(*used_sets))
+        stats['facts_concluded'] = sorted(set().union(*concluded_sets))
+
+        # Display orderings, so every report reuses one sort
+        stats['sorted_operators'] = sorted(
+            total_operators.items(), key=lambda x: -x[1])
+        stats['formatted_dependencies'] = [
+            (fact, ', '.join(sorted(deps)))
+            for fact, deps in sorted(dependencies.items()) if deps]
+        stats['top_complex_rules'] = [
+            (complexity, self.format_rule(rule))
+            for rule, complexity in heapq.nlargest(
+                5, zip(self.rules, stats['complexity_scores']),
+                key=lambda x: x[1])]
 
         return stats
 
     def analyze_dependencies(self):
         """Analyze fact dependencies."""
-        dependencies = defaultdict(set)
-
-        for fact in self.engine.all_facts:
-            if fact.startswith('!'):
-                continue
-
-            if fact in self.engine.rules_concluding:
-                for rule in self.engine.rules_concluding[fact]:
-                    deps = rule.condition.get_facts()
-                    dependencies[fact].update(deps)
-
-        return dependencies
+        return self.analyze_rules()['dependencies']
 
     def print_statistics(self):
         """Print comprehensive statistics."""
         stats = self.analyze_rules()
-        deps = self.analyze_dependencies()
-
-        print("=" * 70)
-        print("RULE SET STATISTICS")
-        print("=" * 70)
-        print()
-
-        print("BASIC METRICS")
-        print("-" * 70)
-        print(f"Total rules:            {stats['total_rules']}")
-        print(f"Biconditional rules:    {stats['biconditional_rules']}")
+        # Collected and written at once rather than printed per line.
+        lines = []
+        out = lines.append
+
+        out("=" * 70)
+        out("RULE SET STATISTICS")
+        out("=" * 70)
+        out("")
+
+        out("BASIC METRICS")
+        out("-" * 70)
+        out(f"Total rules:            {stats['total_rules']}")
+        out(f"Biconditional rules:    {stats['biconditional_rules']}")
         regular = stats['total_rules'] - stats['biconditional_rules']
-        print(f"Regular rules:          {regular}")
-        print()
+        out(f"Regular rules:          {regular}")
+        out("")
 
-        print("FACTS")
-        print("-" * 70)
+        out("FACTS")
+        out("-" * 70)
         init_facts_str = (', '.join(sorted(self.initial_facts))
                           if self.initial_facts else 'None')
-        print(f"Initial facts:          {init_facts_str}")
+        out(f"Initial facts:          {init_facts_str}")
         used_str = ', '.join(stats['facts_used'])
-        print(
+        out(
             f"Total facts used:       {len(stats['facts_used'])} "
             f"({used_str})")
         concl_str = ', '.join(stats['facts_concluded'])
-        print(
+        out(
             f"Facts concluded:        {len(stats['facts_concluded'])} "
             f"({concl_str})")
-        print()
+        out("")
 
-        print("OPERATORS USED")
-        print("-" * 70)
-        op_names = {
-            NodeType.NOT: "NOT (!)",
-            NodeType.AND: "AND (+)",
-            NodeType.OR: "OR (|)",
-            NodeType.XOR: "XOR (^)",
-            NodeType.IMPLIES: "IMPLIES (=>)",
-            NodeType.IFF: "IFF (<=>)",
-        }
-        sorted_ops = sorted(
-            stats['total_operators'].items(), key=lambda x: -x[1])
-        for op_type, count in sorted_ops:
-            op_name = op_names.get(op_type, str(op_type))
-            print(f"  {op_name:20} {count:3} times")
-        print()
+        out("OPERATORS USED")
+        out("-" * 70)
+        for op_type, count in stats['sorted_operators']:
+            op_name = _OP_NAMES.get(op_type, str(op_type))
+            out(f"  {op_name:20} {count:3} times")
+        out("")
 
         if stats['complexity_scores']:
-            print("COMPLEXITY METRICS")
-            print("-" * 70)
-            print(f"Average complexity:     {stats['avg_complexity']:.2f}")
-            print(f"Maximum complexity:     {stats['max_complexity']}")
-            print(f"Minimum complexity:     {stats['min_complexity']}")
-            print(f"Maximum nesting depth:  {stats['max_depth']}")
-            print()
-
-        if deps:
-            print("FACT DEPENDENCIES")
-            print("-" * 70)
-            for fact, dependencies in sorted(deps.items()):
-                if dependencies:
-                    dep_str = ', '.join(sorted(dependencies))
-                    print(f"  {fact} depends on: {dep_str}")
-            print()
+            out("COMPLEXITY METRICS")
+            out("-" * 70)
+            out(f"Average complexity:     {stats['avg_complexity']:.2f}")
+            out(f"Maximum complexity:     {stats['max_complexity']}")
+            out(f"Minimum complexity:     {stats['min_complexity']}")
+            out(f"Maximum nesting depth:  {stats['max_depth']}")
+            out("")
+
+        if stats['formatted_dependencies']:
+            out("FACT DEPENDENCIES")
+            out("-" * 70)
+            for fact, dep_str in stats['formatted_dependencies']:
+                out(f"  {fact} depends on: {dep_str}")
+            out("")
 
         if stats['complexity_scores']:
-            print("MOST COMPLEX RULES")
-            print("-" * 70)
-            rules_with_complexity = list(
-                zip(self.rules, stats['complexity_scores']))
-            rules_with_complexity.sort(key=lambda x: -x[1])
-
-            top_rules = rules_with_complexity[:5]
-            for i, (rule, complexity) in enumerate(top_rules, 1):
-                rule_str = self.format_rule(rule)
-                print(f"  {i}. [{complexity}] {rule_str}")
-            print()
-
-    def format_rule(self, rule):
-        """Format a rule for display."""
-        def format_node(node):
+            out("MOST COMPLEX RULES")
+            out("-" * 70)
+            for i, (complexity, rule_str) in enumerate(
+                    stats['top_complex_rules'], 1):
+                out(f"  {i}. [{complexity}] {rule_str}")
+            out("")
+
+        sys.stdout.write("\n".join(lines) + "\n")
+
+    def _format_node(self, root):
+        """
+        Format an AST in rule syntax with an iterative post-order walk:
+        a node is revisited once its children's strings are on the out
+        stack. Every node's string is cached as (node, string).
+        """
+        cache = self._fmt_cache
+        out = []
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            key = id(node)
+            if not expanded:
+                cached = cache.get(key)
+                if cached is not None and cached[0] is node:
+                    out.append(cached[1])
+                    continue
+            result = "?"
             if isinstance(node, FactNode):
-                return node.fact
+                result = node.fact
             elif isinstance(node, UnaryOpNode):
+                if not expanded:
+                    stack.append((node, True))
+                    stack.append((node.operand, False))
+                    continue
+                operand = out.pop()
                 if node.node_type == NodeType.NOT:
-                    return f"!{format_node(node.operand)}"
+                    result = f"!{operand}"
             elif isinstance(node, BinaryOpNode):
-                left = format_node(node.left)
-                right = format_node(node.right)
-                op_map = {
-                    NodeType.AND: " + ",
-                    NodeType.OR: " | ",
-                    NodeType.XOR: " ^ ",
-                    NodeType.IMPLIES: " => ",
-                    NodeType.IFF: " <=> "
-                }
-                op = op_map.get(node.node_type, " ? ")
+                if not expanded:
+                    stack.append((node, True))
+                    stack.append((node.right, False))
+                    stack.append((node.left, False))
+                    continue
+                right = out.pop()
+                left = out.pop()
+                op = _ASCII_OPS.get(node.node_type, " ? ")
                 if isinstance(node.left, BinaryOpNode):
                     left = f"({left})"
                 if isinstance(node.right, BinaryOpNode):
                     right = f"({right})"
-                return f"{left}{op}{right}"
-            return "?"
+                result = f"{left}{op}{right}"
+            cache[key] = (node, result)
+            out.append(result)
+        return out[0]
 
-        op = "<=>" if rule.is_biconditional else "=>"
-        cond_str = format_node(rule.condition)
-        concl_str = format_node(rule.conclusion)
-        return f"{cond_str} {op} {concl_str}"
+    def format_rule(self, rule):
+        """Format a rule for display, cached per rule."""
+        self._sync_rule_caches()
+        cached = self._rule_str_cache.get(id(rule))
+        if cached is not None and cached[0] is rule:
+            rule_str = cached[1]
+        else:
+            format_node = self._format_node
+            op = "<=>" if rule.is_biconditional else "=>"
+            cond_str = format_node(rule.condition)
+            concl_str = format_node(rule.conclusion)
+            rule_str = f"{cond_str} {op} {concl_str}"
+            self._rule_str_cache[id(rule)] = (rule, rule_str)
+        return rule_str
 
 
 def main():
@@ -281,8 +356,7 @@ def main():
         return 1
 
     try:
-        with open(input_file, 'r') as f:
-            content = f.read()
+        content = Path(input_file).read_text()
         rules, initial_facts, queries = parse_input_file(content)
     except Exception as e:
         print(f"Error parsing input file: {e}", file=sys.stderr)
@@ -16,17 +16,29 @@ Debug with detailed tracing
 """
 
 import sys
+from pathlib import Path
 from parser import parse_input_file
 from inference_engine import InferenceEngine
 
 original_evaluate_fact = InferenceEngine._evaluate_fact
 
+_depth = 0
+_indents = [""]
+
 
 def traced_evaluate_fact(self, fact):
-    indent = "  " * len(self.evaluating)
-    print(f"{indent}Evaluating {fact}...")
-    result = original_evaluate_fact(self, fact)
-    print(f"{indent}  -> {result}")
+    global _depth
+    _depth += 1
+    while len(_indents) <= _depth:
+        _indents.append(_indents[-1] + "  ")
+    indent = _indents[_depth]
+    write = sys.stdout.write
+    write(f"{indent}Evaluating {fact}...\n")
+    try:
+        result = original_evaluate_fact(self, fact)
+    finally:
+        _depth -= 1
+    write(f"{indent}  -> {result}\n")
     return result
 
 
@@ -36,8 +48,7 @@ InferenceEngine._evaluate_fact = traced_evaluate_fact
 def main():
     input_file = sys.argv[1]
 
-    with open(input_file, 'r') as f:
-        content = f.read()
+    content = Path(input_file).read_text()
 
     rules, initial_facts, queries = parse_input_file(content)
     engine = InferenceEngine(rules, initial_facts)
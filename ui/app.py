@@ -4,10 +4,14 @@ Main application window for the Expert System UI.
 """
 
 import os
+import re
 import sys
 import tkinter as tk
 import tkinter.ttk as ttk
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import filedialog, messagebox
+from functools import lru_cache
 from pathlib import Path
 
 # Ensure parent directory is in path for imports
@@ -24,12 +28,67 @@ from ui.widgets import (
 from parser import parse_input_file
 from inference_engine import InferenceEngine, TruthValue
 from reasoning_visualizer import ReasoningVisualizer
-from statistics_analyzer import StatisticsAnalyzer
+from statistics_analyzer import StatisticsAnalyzer, _OP_NAMES
+
+
+_NON_UPPER_RE = re.compile(r"[^A-Z]")
+
+# Separator lines of the reasoning and statistics text panels
+_SEP_THICK = "─" * 60 + "\n"
+_SEP_THIN = "─" * 50 + "\n"
+_OPERATOR_LINE = "  {:20s} {:3d}×\n".format
+
+_RESULT_TAGS = {
+    TruthValue.TRUE: "true_text",
+    TruthValue.FALSE: "false_text",
+    TruthValue.UNDETERMINED: "undetermined_text",
+}
+
+_PRED_TO_TV = {
+    "TRUE": TruthValue.TRUE,
+    "FALSE": TruthValue.FALSE,
+    "UNDETERMINED": TruthValue.UNDETERMINED,
+}
+
+
+def _step_tag(step):
+    """Text tag for a reasoning step: formal notation, or by its value."""
+    if step.lstrip().startswith("Formal:"):
+        return "formal"
+    if "=" in step:
+        if "TRUE" in step:
+            return "true_text"
+        if "FALSE" in step:
+            return "false_text"
+    if "UNDETERMINED" in step:
+        return "undetermined_text"
+    return "step"
+
+
+def _mklabel(parent, text, *, font, fg=Colors.TEXT_SECONDARY, bg=Colors.BG_DARK, **pack):
+    """Create a label on the dark background and pack it in one call."""
+    label = tk.Label(parent, text=text, font=font, fg=fg, bg=bg)
+    label.pack(**pack)
+    return label
+
+
+@lru_cache(maxsize=4)
+def _parse_content(content):
+    """
+    Parse editor content once per distinct text. Pressing Run on an
+    unchanged buffer, or undoing back to a recent version, reuses the
+    parse instead of running the parser again.
+    """
+    return parse_input_file(content)
 
 
 class ExpertSystemApp:
     """Main application class."""
 
+    IO_POLL_MS = 30
+    FACT_CELL_W = 36
+    FACT_CELL_H = 30
+
     # ------------------------------------------------------------------ #
     #  Construction
     # ------------------------------------------------------------------ #
@@ -46,12 +105,41 @@ class ExpertSystemApp:
         self.rules = []
         self.initial_facts = set()
         self.queries = []
+        # Joined for display once per parse, see _update_info
+        self._initial_facts_str = ""
+        self._queries_str = ""
         self.engine = None
         self.results = {}
         self.active_facts = set()     # for interactive toggles
+        self._active_facts_str = None  # sorted join, None when stale
         self._active_nav = None
-        self.predictions = {}         # user predictions per query
-        self.prediction_vars = {}     # tk StringVars for dropdowns
+        self.predictions = {}         # user predictions per query, set on click
+        # Results for the current parse only: tagged reasoning text per
+        # query, interactive query_all output per (facts, queries), and
+        # the statistics panel text; see _clear_parse_caches.
+        self._explain_cache = {}
+        self._interactive_cache = {}
+        self._stats_segments = None
+        # What each text panel shows, so an unchanged refill is skipped
+        self._reasoning_shown = None
+        self._stats_shown = None
+        # Result panel rows kept across rebuilds and reconfigured in
+        # place; see _pooled_rows.
+        self._prediction_rows = []
+        self._result_rows = {}        # fact -> result card row
+        self._badge_row = None
+        self._score_row = None
+        self._hint_row = None
+        self._results_separator = None
+        # Order of what _display_results last packed, so a run that
+        # keeps the same layout only reconfigures the packed rows.
+        self._results_layout = None
+        # Facts panel result widgets, reused across interactive queries
+        self._interactive_header = None
+        self._interactive_cards = {}  # fact -> ResultCard
+        self._interactive_layout = None
+        # File reads and writes run here, off the Tk main loop
+        self._io_executor = ThreadPoolExecutor(max_workers=2)
 
         self._build_ui()
         self._bind_shortcuts()
@@ -100,17 +188,17 @@ class ExpertSystemApp:
         title_texts = tk.Frame(logo_frame, bg=Colors.BG_DARK)
         title_texts.pack(side="left")
 
-        tk.Label(
-            title_texts, text="Expert System",
-            font=Fonts.get_sans_bold(Fonts.SIZE_TITLE),
-            fg=Colors.LAVENDER, bg=Colors.BG_DARK,
-        ).pack(anchor="w")
+        _mklabel(
+            title_texts, "Expert System",
+            font=Fonts.get_sans_bold(Fonts.SIZE_TITLE), fg=Colors.LAVENDER,
+            anchor="w",
+        )
 
-        tk.Label(
-            title_texts, text="Propositional Calculus Inference Engine",
-            font=Fonts.get_sans(Fonts.SIZE_SMALL),
-            fg=Colors.TEXT_MUTED, bg=Colors.BG_DARK,
-        ).pack(anchor="w")
+        _mklabel(
+            title_texts, "Propositional Calculus Inference Engine",
+            font=Fonts.get_sans(Fonts.SIZE_SMALL), fg=Colors.TEXT_MUTED,
+            anchor="w",
+        )
 
         # Right side: file indicator
         self.file_label = tk.Label(
@@ -148,11 +236,11 @@ class ExpertSystemApp:
         self.sidebar.pack(side="left", fill="y")
         self.sidebar.pack_propagate(False)
 
-        tk.Label(
-            self.sidebar, text="PANELS",
-            font=Fonts.get_sans_bold(Fonts.SIZE_SMALL),
-            fg=Colors.TEXT_MUTED, bg=Colors.BG_DARK,
-        ).pack(anchor="w", padx=Spacing.XL, pady=(Spacing.LG, Spacing.SM))
+        _mklabel(
+            self.sidebar, "PANELS",
+            font=Fonts.get_sans_bold(Fonts.SIZE_SMALL), fg=Colors.TEXT_MUTED,
+            anchor="w", padx=Spacing.XL, pady=(Spacing.LG, Spacing.SM),
+        )
 
         self.nav_buttons = {}
         panels = [
@@ -180,11 +268,11 @@ class ExpertSystemApp:
         self.quick_info = tk.Frame(self.sidebar, bg=Colors.BG_DARK)
         self.quick_info.pack(fill="x", padx=Spacing.XL)
 
-        tk.Label(
-            self.quick_info, text="INFO",
-            font=Fonts.get_sans_bold(Fonts.SIZE_SMALL),
-            fg=Colors.TEXT_MUTED, bg=Colors.BG_DARK,
-        ).pack(anchor="w", pady=(0, Spacing.SM))
+        _mklabel(
+            self.quick_info, "INFO",
+            font=Fonts.get_sans_bold(Fonts.SIZE_SMALL), fg=Colors.TEXT_MUTED,
+            anchor="w", pady=(0, Spacing.SM),
+        )
 
         self.info_rules = tk.Label(
             self.quick_info, text="Rules: -",
@@ -220,9 +308,16 @@ class ExpertSystemApp:
         self.panels = {}
         self._build_editor_panel()
         self._build_results_panel()
-        self._build_reasoning_panel()
-        self._build_statistics_panel()
-        self._build_facts_panel()
+
+        # The other panels are built on their first visit; a run before
+        # then marks the text panels stale so they are filled on build.
+        self._panel_builders = {
+            "reasoning": self._build_reasoning_panel,
+            "statistics": self._build_statistics_panel,
+            "facts": self._build_facts_panel,
+        }
+        self._stale_panels = set()
+        self.fact_cells = {}
 
         # Show editor by default
         self._switch_panel("editor")
@@ -236,17 +331,17 @@ class ExpertSystemApp:
         header = tk.Frame(panel, bg=Colors.BG_DARK)
         header.pack(fill="x", padx=Spacing.XL, pady=Spacing.LG)
 
-        tk.Label(
-            header, text="Rule Editor",
-            font=Fonts.get_sans_bold(Fonts.SIZE_LARGE),
-            fg=Colors.BLUE, bg=Colors.BG_DARK,
-        ).pack(side="left")
+        _mklabel(
+            header, "Rule Editor",
+            font=Fonts.get_sans_bold(Fonts.SIZE_LARGE), fg=Colors.BLUE,
+            side="left",
+        )
 
-        tk.Label(
-            header, text="Write or load rules, initial facts, and queries",
-            font=Fonts.get_sans(Fonts.SIZE_SMALL),
-            fg=Colors.TEXT_MUTED, bg=Colors.BG_DARK,
-        ).pack(side="right")
+        _mklabel(
+            header, "Write or load rules, initial facts, and queries",
+            font=Fonts.get_sans(Fonts.SIZE_SMALL), fg=Colors.TEXT_MUTED,
+            side="right",
+        )
 
         # Editor widget
         self.editor = LineNumberedText(panel)
@@ -260,11 +355,11 @@ class ExpertSystemApp:
         header = tk.Frame(panel, bg=Colors.BG_DARK)
         header.pack(fill="x", padx=Spacing.XL, pady=Spacing.LG)
 
-        tk.Label(
-            header, text="Query Results",
-            font=Fonts.get_sans_bold(Fonts.SIZE_LARGE),
-            fg=Colors.BLUE, bg=Colors.BG_DARK,
-        ).pack(side="left")
+        _mklabel(
+            header, "Query Results",
+            font=Fonts.get_sans_bold(Fonts.SIZE_LARGE), fg=Colors.BLUE,
+            side="left",
+        )
 
         ttk.Button(
             header, text="▶  Run Inference", command=self._on_run,
@@ -293,11 +388,11 @@ class ExpertSystemApp:
         header = tk.Frame(panel, bg=Colors.BG_DARK)
         header.pack(fill="x", padx=Spacing.XL, pady=Spacing.LG)
 
-        tk.Label(
-            header, text="Reasoning Visualization",
-            font=Fonts.get_sans_bold(Fonts.SIZE_LARGE),
-            fg=Colors.BLUE, bg=Colors.BG_DARK,
-        ).pack(side="left")
+        _mklabel(
+            header, "Reasoning Visualization",
+            font=Fonts.get_sans_bold(Fonts.SIZE_LARGE), fg=Colors.BLUE,
+            side="left",
+        )
 
         ttk.Button(
             header, text="▶  Run Inference", command=self._on_run,
@@ -315,11 +410,11 @@ class ExpertSystemApp:
         header = tk.Frame(panel, bg=Colors.BG_DARK)
         header.pack(fill="x", padx=Spacing.XL, pady=Spacing.LG)
 
-        tk.Label(
-            header, text="Rule Set Statistics",
-            font=Fonts.get_sans_bold(Fonts.SIZE_LARGE),
-            fg=Colors.BLUE, bg=Colors.BG_DARK,
-        ).pack(side="left")
+        _mklabel(
+            header, "Rule Set Statistics",
+            font=Fonts.get_sans_bold(Fonts.SIZE_LARGE), fg=Colors.BLUE,
+            side="left",
+        )
 
         ttk.Button(
             header, text="⟳  Refresh", command=self._on_run,
@@ -337,54 +432,69 @@ class ExpertSystemApp:
         header = tk.Frame(panel, bg=Colors.BG_DARK)
         header.pack(fill="x", padx=Spacing.XL, pady=Spacing.LG)
 
-        tk.Label(
-            header, text="Interactive Facts",
-            font=Fonts.get_sans_bold(Fonts.SIZE_LARGE),
-            fg=Colors.BLUE, bg=Colors.BG_DARK,
-        ).pack(side="left")
+        _mklabel(
+            header, "Interactive Facts",
+            font=Fonts.get_sans_bold(Fonts.SIZE_LARGE), fg=Colors.BLUE,
+            side="left",
+        )
 
-        tk.Label(
-            header, text="Toggle facts on/off, then run inference",
-            font=Fonts.get_sans(Fonts.SIZE_SMALL),
-            fg=Colors.TEXT_MUTED, bg=Colors.BG_DARK,
-        ).pack(side="right")
+        _mklabel(
+            header, "Toggle facts on/off, then run inference",
+            font=Fonts.get_sans(Fonts.SIZE_SMALL), fg=Colors.TEXT_MUTED,
+            side="right",
+        )
 
         # Fact toggle area
         toggle_frame = tk.Frame(panel, bg=Colors.BG_DARK)
         toggle_frame.pack(fill="x", padx=Spacing.XL, pady=Spacing.LG)
 
-        tk.Label(
-            toggle_frame, text="Initial Facts",
+        _mklabel(
+            toggle_frame, "Initial Facts",
             font=Fonts.get_sans_bold(Fonts.SIZE_MEDIUM),
-            fg=Colors.TEXT_SECONDARY, bg=Colors.BG_DARK,
-        ).pack(anchor="w", pady=(0, Spacing.MD))
+            anchor="w", pady=(0, Spacing.MD),
+        )
 
-        self.fact_buttons_frame = tk.Frame(toggle_frame, bg=Colors.BG_DARK)
-        self.fact_buttons_frame.pack(fill="x")
+        # One canvas draws the 26 toggles instead of 26 button widgets
+        cell_w, cell_h, gap = self.FACT_CELL_W, self.FACT_CELL_H, Spacing.XS * 2
+        canvas = tk.Canvas(
+            toggle_frame, bg=Colors.BG_DARK, highlightthickness=0,
+            width=13 * (cell_w + gap), height=2 * (cell_h + gap),
+        )
+        canvas.pack(anchor="w")
 
-        self.fact_buttons = {}
+        self.fact_cells = {}
         for i, letter in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZ"):
-            col = i % 13
-            row = i // 13
-            btn = ttk.Button(
-                self.fact_buttons_frame,
-                text=f" {letter} ",
-                style="Fact.TButton",
-                width=3,
-                command=lambda l=letter: self._toggle_fact(l),
+            x = (i % 13) * (cell_w + gap)
+            y = (i // 13) * (cell_h + gap)
+            rect = canvas.create_rectangle(
+                x, y, x + cell_w, y + cell_h,
+                outline=Colors.BORDER, tags=("cell", letter),
             )
-            btn.grid(row=row, column=col, padx=2, pady=2)
-            self.fact_buttons[letter] = btn
+            text = canvas.create_text(
+                x + cell_w / 2, y + cell_h / 2, text=letter,
+                font=Fonts.get_mono(Fonts.SIZE_MEDIUM), tags=("label", letter),
+            )
+            self.fact_cells[letter] = (rect, text)
+
+        def on_click(event):
+            tags = canvas.gettags("current")
+            if tags:
+                self._toggle_fact(tags[1])
+
+        canvas.tag_bind("cell", "<Button-1>", on_click)
+        canvas.tag_bind("label", "<Button-1>", on_click)
+        canvas.configure(cursor="hand2")
+        self.fact_canvas = canvas
 
         # Query input
         query_frame = tk.Frame(panel, bg=Colors.BG_DARK)
         query_frame.pack(fill="x", padx=Spacing.XL, pady=Spacing.LG)
 
-        tk.Label(
-            query_frame, text="Queries",
+        _mklabel(
+            query_frame, "Queries",
             font=Fonts.get_sans_bold(Fonts.SIZE_MEDIUM),
-            fg=Colors.TEXT_SECONDARY, bg=Colors.BG_DARK,
-        ).pack(anchor="w", pady=(0, Spacing.MD))
+            anchor="w", pady=(0, Spacing.MD),
+        )
 
         input_row = tk.Frame(query_frame, bg=Colors.BG_DARK)
         input_row.pack(fill="x")
@@ -413,13 +523,24 @@ class ExpertSystemApp:
     #  Navigation
     # ------------------------------------------------------------------ #
     def _switch_panel(self, key):
-        # Hide all panels
-        for panel in self.panels.values():
-            panel.pack_forget()
+        if key not in self.panels:
+            self._panel_builders.pop(key)()
+            if key == "facts":
+                self._update_fact_buttons()
+        if key in self._stale_panels:
+            self._stale_panels.discard(key)
+            self._fill_panel(key)
+
+        previous = self._active_nav
+        if previous == key:
+            return
 
-        # Update nav button styles
-        for k, btn in self.nav_buttons.items():
-            btn.configure(style="NavActive.TButton" if k == key else "Nav.TButton")
+        # Hide the shown panel and move the active nav style; the other
+        # panels and buttons are already in the right state.
+        if previous is not None:
+            self.panels[previous].pack_forget()
+            self.nav_buttons[previous].configure(style="Nav.TButton")
+        self.nav_buttons[key].configure(style="NavActive.TButton")
 
         # Show selected panel
         self.panels[key].pack(fill="both", expand=True)
@@ -455,16 +576,28 @@ class ExpertSystemApp:
         if filepath:
             self._load_file(filepath)
 
+    def _when_done(self, future, callback):
+        """Call callback(future) on the Tk thread once future finishes."""
+        if future.done():
+            callback(future)
+        else:
+            self.root.after(self.IO_POLL_MS, self._when_done, future, callback)
+
     def _load_file(self, filepath):
+        self.statusbar.set_status(f"Loading: {filepath}")
+        future = self._io_executor.submit(Path(filepath).read_text)
+        self._when_done(future, lambda f: self._on_file_loaded(filepath, f))
+
+    def _on_file_loaded(self, filepath, future):
         try:
-            with open(filepath, 'r') as f:
-                content = f.read()
+            content = future.result()
             self.current_file = filepath
             self.editor.set_content(content)
             self.file_label.configure(text=os.path.basename(filepath))
             self.statusbar.set_status(f"Loaded: {filepath}", Colors.SUCCESS)
             self._parse_current()
-            self._build_prediction_selectors()
+            with self.results_scroll.batch():
+                self._build_prediction_selectors()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load file:\n{e}")
             self.statusbar.set_status(f"Error loading file: {e}", Colors.ERROR)
@@ -479,14 +612,19 @@ class ExpertSystemApp:
                 filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
             )
         if filepath:
-            try:
-                with open(filepath, 'w') as f:
-                    f.write(self.editor.get_content())
-                self.current_file = filepath
-                self.file_label.configure(text=os.path.basename(filepath))
-                self.statusbar.set_status(f"Saved: {filepath}", Colors.SUCCESS)
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to save file:\n{e}")
+            self.statusbar.set_status(f"Saving: {filepath}")
+            future = self._io_executor.submit(
+                Path(filepath).write_text, self.editor.get_content())
+            self._when_done(future, lambda f: self._on_file_saved(filepath, f))
+
+    def _on_file_saved(self, filepath, future):
+        try:
+            future.result()
+            self.current_file = filepath
+            self.file_label.configure(text=os.path.basename(filepath))
+            self.statusbar.set_status(f"Saved: {filepath}", Colors.SUCCESS)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save file:\n{e}")
 
     def _try_load_default(self):
         """Try to load a default test file."""
@@ -510,22 +648,37 @@ class ExpertSystemApp:
             self.rules = []
             self.initial_facts = set()
             self.queries = []
+            self._clear_parse_caches()
             self._update_info()
             return False
 
         try:
-            self.rules, self.initial_facts, self.queries = parse_input_file(content)
-            self.active_facts = set(self.initial_facts)
+            previous_rules = self.rules
+            self.rules, self.initial_facts, self.queries = _parse_content(content)
+            # Rules and facts come from one cached parse, so the same
+            # rules object means the same text: still-valid caches, and
+            # fact toggles that need not be reset to the initial facts.
+            if self.rules is not previous_rules:
+                self._clear_parse_caches()
+                self.active_facts = set(self.initial_facts)
+                self._active_facts_str = None
+                self._update_fact_buttons()
             self._update_info()
-            self._update_fact_buttons()
             return True
         except Exception as e:
             self.statusbar.set_status(f"Parse error: {e}", Colors.ERROR)
             return False
 
+    def _clear_parse_caches(self):
+        self._explain_cache.clear()
+        self._interactive_cache.clear()
+        self._stats_segments = None
+
     def _update_info(self):
-        facts_str = ", ".join(sorted(self.initial_facts)) if self.initial_facts else "-"
-        queries_str = ", ".join(self.queries) if self.queries else "-"
+        self._initial_facts_str = ", ".join(sorted(self.initial_facts))
+        self._queries_str = ", ".join(self.queries)
+        facts_str = self._initial_facts_str or "-"
+        queries_str = self._queries_str or "-"
         self.info_rules.configure(text=f"Rules: {len(self.rules)}")
         self.info_facts.configure(text=f"Facts: {facts_str}")
         self.info_queries.configure(text=f"Queries: {queries_str}")
@@ -534,19 +687,36 @@ class ExpertSystemApp:
         )
 
     def _update_fact_buttons(self):
-        for letter, btn in self.fact_buttons.items():
-            if letter in self.active_facts:
-                btn.configure(style="FactActive.TButton")
-            else:
-                btn.configure(style="Fact.TButton")
+        for letter in self.fact_cells:
+            self._paint_fact_cell(letter)
+
+    def _paint_fact_cell(self, letter):
+        rect, text = self.fact_cells[letter]
+        if letter in self.active_facts:
+            fill, fg = Colors.GREEN, Colors.TEXT_DARK
+        else:
+            fill, fg = Colors.BG_OVERLAY, Colors.TEXT_SECONDARY
+        self.fact_canvas.itemconfigure(rect, fill=fill)
+        self.fact_canvas.itemconfigure(text, fill=fg)
 
     # ------------------------------------------------------------------ #
     #  Predictions
     # ------------------------------------------------------------------ #
+    def _pooled_rows(self):
+        """Frames in the results panel that are reused, not destroyed."""
+        frames = [row["frame"] for row in self._prediction_rows]
+        frames.extend(row["frame"] for row in self._result_rows.values())
+        for row in (self._badge_row, self._score_row, self._hint_row):
+            if row is not None:
+                frames.append(row["frame"])
+        if self._results_separator is not None:
+            frames.append(self._results_separator)
+        return frames
+
     def _build_prediction_selectors(self):
         """Build prediction dropdown for each query after loading a file."""
-        self.results_scroll.clear()
-        self.prediction_vars.clear()
+        self.results_scroll.clear(keep=self._pooled_rows())
+        self._results_layout = None
         self.predictions.clear()
 
         if not self.queries:
@@ -560,70 +730,90 @@ class ExpertSystemApp:
             return
 
         # Instruction
-        tk.Label(
+        _mklabel(
             self.results_scroll.scrollable_frame,
-            text="Select your prediction for each query, then press ▶ Run",
+            "Select your prediction for each query, then press ▶ Run",
             font=Fonts.get_sans(Fonts.SIZE_MEDIUM),
-            fg=Colors.TEXT_SECONDARY, bg=Colors.BG_DARK,
-        ).pack(anchor="w", pady=(0, Spacing.LG))
-
-        for query in self.queries:
-            row = tk.Frame(
-                self.results_scroll.scrollable_frame,
-                bg=Colors.BG_OVERLAY, padx=Spacing.LG, pady=Spacing.MD,
-            )
-            row.pack(fill="x", pady=Spacing.XS)
+            anchor="w", pady=(0, Spacing.LG),
+        )
 
-            # Fact label
-            tk.Label(
-                row, text=query,
-                font=Fonts.get_mono(Fonts.SIZE_TITLE),
-                fg=Colors.BLUE, bg=Colors.BG_OVERLAY,
-                width=3, anchor="w",
-            ).pack(side="left", padx=(0, Spacing.XL))
+        # Reuse pooled rows, building more only when there are more
+        # queries than rows so far.
+        while len(self._prediction_rows) < len(self.queries):
+            self._prediction_rows.append(self._make_prediction_row())
 
-            tk.Label(
-                row, text="Your prediction:",
-                font=Fonts.get_sans(Fonts.SIZE_NORMAL),
-                fg=Colors.TEXT_MUTED, bg=Colors.BG_OVERLAY,
-            ).pack(side="left", padx=(0, Spacing.MD))
-
-            # Radio buttons for TRUE / FALSE / UNDETERMINED
-            var = tk.StringVar(value="")
-            self.prediction_vars[query] = var
-
-            btn_frame = tk.Frame(row, bg=Colors.BG_OVERLAY)
-            btn_frame.pack(side="left", padx=Spacing.SM)
-
-            for value, symbol, color in [
-                ("TRUE", "✓ TRUE", Colors.SUCCESS),
-                ("FALSE", "✗ FALSE", Colors.ERROR),
-                ("UNDETERMINED", "? UNDETERMINED", Colors.WARNING),
-            ]:
-                rb = tk.Radiobutton(
-                    btn_frame,
-                    text=symbol,
-                    variable=var,
-                    value=value,
-                    font=Fonts.get_sans_bold(Fonts.SIZE_NORMAL),
-                    fg=color,
-                    bg=Colors.BG_OVERLAY,
-                    selectcolor=Colors.BG_HIGHLIGHT,
-                    activebackground=Colors.BG_OVERLAY,
-                    activeforeground=color,
-                    indicatoron=0,
-                    padx=Spacing.LG,
-                    pady=Spacing.SM,
-                    bd=0,
-                    relief="flat",
-                    highlightthickness=0,
-                    cursor="hand2",
-                )
-                rb.pack(side="left", padx=2)
+        for query, row in zip(self.queries, self._prediction_rows):
+            row["fact_label"].configure(text=query)
+            row["query"] = query
+            row["var"].set("")
+            row["frame"].pack(fill="x", pady=Spacing.XS)
 
         # Switch to results panel so user sees the selectors
         self._switch_panel("results")
 
+    def _make_prediction_row(self):
+        """Build one unpacked prediction row for the pool."""
+        row = tk.Frame(
+            self.results_scroll.scrollable_frame,
+            bg=Colors.BG_OVERLAY, padx=Spacing.LG, pady=Spacing.MD,
+        )
+
+        # Fact label
+        fact_label = tk.Label(
+            row,
+            font=Fonts.get_mono(Fonts.SIZE_TITLE),
+            fg=Colors.BLUE, bg=Colors.BG_OVERLAY,
+            width=3, anchor="w",
+        )
+        fact_label.pack(side="left", padx=(0, Spacing.XL))
+
+        tk.Label(
+            row, text="Your prediction:",
+            font=Fonts.get_sans(Fonts.SIZE_NORMAL),
+            fg=Colors.TEXT_MUTED, bg=Colors.BG_OVERLAY,
+        ).pack(side="left", padx=(0, Spacing.MD))
+
+        # Radio buttons for TRUE / FALSE / UNDETERMINED. The variable
+        # only drives the selection display; clicks record the
+        # prediction directly, so Run never reads the Tcl variables.
+        var = tk.StringVar(value="")
+        pooled = {"frame": row, "fact_label": fact_label, "var": var, "query": None}
+
+        btn_frame = tk.Frame(row, bg=Colors.BG_OVERLAY)
+        btn_frame.pack(side="left", padx=Spacing.SM)
+
+        for value, symbol, color in [
+            ("TRUE", "✓ TRUE", Colors.SUCCESS),
+            ("FALSE", "✗ FALSE", Colors.ERROR),
+            ("UNDETERMINED", "? UNDETERMINED", Colors.WARNING),
+        ]:
+            rb = tk.Radiobutton(
+                btn_frame,
+                text=symbol,
+                variable=var,
+                value=value,
+                font=Fonts.get_sans_bold(Fonts.SIZE_NORMAL),
+                fg=color,
+                bg=Colors.BG_OVERLAY,
+                selectcolor=Colors.BG_HIGHLIGHT,
+                activebackground=Colors.BG_OVERLAY,
+                activeforeground=color,
+                indicatoron=0,
+                padx=Spacing.LG,
+                pady=Spacing.SM,
+                bd=0,
+                relief="flat",
+                highlightthickness=0,
+                cursor="hand2",
+                command=lambda v=value: self._set_prediction(pooled, v),
+            )
+            rb.pack(side="left", padx=2)
+
+        return pooled
+
+    def _set_prediction(self, row, value):
+        self.predictions[row["query"]] = value
+
     # ------------------------------------------------------------------ #
     #  Inference
     # ------------------------------------------------------------------ #
@@ -636,25 +826,21 @@ class ExpertSystemApp:
             self.statusbar.set_status("No queries defined. Add ?XYZ line.", Colors.WARNING)
             return
 
-        # Collect predictions before clearing the panel
-        self.predictions = {}
-        for query, var in self.prediction_vars.items():
-            val = var.get()
-            if val:
-                self.predictions[query] = val
-
         try:
             self.engine = InferenceEngine(self.rules, self.initial_facts)
             self.results = self.engine.query_all(self.queries)
 
-            self._display_results()
-            self._display_reasoning()
-            self._display_statistics()
+            # One layout pass and one scroll-region update per panel,
+            # not one per widget or text chunk added.
+            with self.results_scroll.batch():
+                self._display_results()
 
             self.statusbar.set_status("Inference complete ✓", Colors.SUCCESS)
 
-            # Switch to results
+            # Switch to results; the text panels are filled when next shown
             self._switch_panel("results")
+            self._render_panel("reasoning")
+            self._render_panel("statistics")
 
         except Exception as e:
             messagebox.showerror("Inference Error", f"Error during inference:\n{e}")
@@ -662,126 +848,216 @@ class ExpertSystemApp:
 
     def _display_results(self):
         """Display query results as cards with prediction comparison."""
-        self.results_scroll.clear()
-
-        # --- Score calculation ---
+        # --- Score calculation and value counts, in one pass ---
         total_queries = len(self.results)
+        pred_tv = {q: _PRED_TO_TV[v] for q, v in self.predictions.items() if v}
         correct = 0
         predicted_count = 0
+        value_counts = Counter()
         for fact, value in self.results.items():
-            user_pred = self.predictions.get(fact, "")
-            if user_pred:
+            value_counts[value] += 1
+            predicted = pred_tv.get(fact)
+            if predicted is not None:
                 predicted_count += 1
-                if user_pred == value.name:
+                if predicted is value:
                     correct += 1
 
+        # Every row is pooled, so the panel only needs unpacking and
+        # repacking when the sequence of rows changes. Otherwise the
+        # packed rows are reconfigured where they are.
+        layout = (predicted_count > 0, tuple(self.results))
+        repack = layout != self._results_layout
+        if repack:
+            self.results_scroll.clear(keep=self._pooled_rows())
+            self._results_layout = layout
+
         # --- Big score banner ---
         if predicted_count > 0:
             score_pct = int(correct / predicted_count * 100)
             if score_pct == 100:
                 score_color = Colors.SUCCESS
-                score_bg = "#2d4a2d"
+                score_bg = Colors.SUCCESS_BG
                 score_emoji = "🎉"
             elif score_pct >= 50:
                 score_color = Colors.YELLOW
-                score_bg = "#4a442d"
+                score_bg = Colors.WARNING_BG
                 score_emoji = "🤔"
             else:
                 score_color = Colors.ERROR
-                score_bg = "#4a2d2d"
+                score_bg = Colors.ERROR_BG
                 score_emoji = "💥"
 
-            score_frame = tk.Frame(
-                self.results_scroll.scrollable_frame,
-                bg=score_bg, padx=Spacing.XXL, pady=Spacing.LG,
-            )
-            score_frame.pack(fill="x", pady=(0, Spacing.LG))
-
-            tk.Label(
-                score_frame,
+            if self._score_row is None:
+                self._score_row = self._make_score_row()
+            row = self._score_row
+            row["frame"].configure(bg=score_bg)
+            row["label"].configure(
                 text=f"{score_emoji}  {correct} / {predicted_count} correct  ({score_pct}%)",
-                font=Fonts.get_sans_bold(Fonts.SIZE_HEADER),
                 fg=score_color, bg=score_bg,
-            ).pack()
-
+            )
             if predicted_count < total_queries:
-                tk.Label(
-                    score_frame,
+                row["missing"].configure(
                     text=f"{total_queries - predicted_count} query(ies) had no prediction",
-                    font=Fonts.get_sans(Fonts.SIZE_SMALL),
-                    fg=Colors.TEXT_MUTED, bg=score_bg,
-                ).pack()
-        else:
+                    bg=score_bg,
+                )
+                row["missing"].pack()
+            else:
+                row["missing"].pack_forget()
+            if repack:
+                row["frame"].pack(fill="x", pady=(0, Spacing.LG))
+        elif repack:
             # No predictions were made
-            hint = tk.Frame(
-                self.results_scroll.scrollable_frame,
-                bg=Colors.BG_OVERLAY, padx=Spacing.LG, pady=Spacing.MD,
-            )
-            hint.pack(fill="x", pady=(0, Spacing.LG))
-            tk.Label(
-                hint,
-                text="💡 Tip: Load a file and select predictions before running to see your score!",
-                font=Fonts.get_sans(Fonts.SIZE_NORMAL),
-                fg=Colors.SAPPHIRE, bg=Colors.BG_OVERLAY,
-            ).pack()
+            if self._hint_row is None:
+                self._hint_row = self._make_hint_row()
+            self._hint_row["frame"].pack(fill="x", pady=(0, Spacing.LG))
 
         # --- Summary badges ---
-        true_count = sum(1 for v in self.results.values() if v == TruthValue.TRUE)
-        false_count = sum(1 for v in self.results.values() if v == TruthValue.FALSE)
-        undet_count = sum(1 for v in self.results.values() if v == TruthValue.UNDETERMINED)
+        true_count = value_counts[TruthValue.TRUE]
+        false_count = value_counts[TruthValue.FALSE]
+        undet_count = value_counts[TruthValue.UNDETERMINED]
+
+        if self._badge_row is None:
+            self._badge_row = self._make_badge_row()
+        for count_label, count in zip(self._badge_row["counts"],
+                                      (true_count, false_count, undet_count)):
+            count_label.configure(text=f"{count}")
+
+        if repack:
+            self._badge_row["frame"].pack(fill="x", pady=(0, Spacing.LG))
+
+            # Separator
+            if self._results_separator is None:
+                self._results_separator = tk.Frame(
+                    self.results_scroll.scrollable_frame, bg=Colors.BORDER, height=1,
+                )
+            self._results_separator.pack(fill="x", pady=Spacing.LG)
+
+        # --- Result cards with prediction comparison ---
+        for fact, value in self.results.items():
+            row = self._result_rows.get(fact)
+            if row is None:
+                row = self._result_rows[fact] = self._make_result_row()
+            predicted = pred_tv.get(fact)
+            name_str = value.name
+
+            if row["value"] is not value:
+                row["card"].set_result(fact, name_str)
+                row["value"] = value
+            if repack:
+                row["frame"].pack(fill="x", pady=Spacing.XS)
+
+            # Prediction feedback row
+            if predicted is not None:
+                user_pred = predicted.name
+                if predicted is value:
+                    fb_bg = Colors.SUCCESS_BG
+                    fb_text = f"✓  Your prediction: {user_pred}  —  Correct!"
+                    fb_color = Colors.SUCCESS
+                else:
+                    fb_bg = Colors.ERROR_BG
+                    fb_text = f"✗  Your prediction: {user_pred}  —  Wrong (actual: {name_str})"
+                    fb_color = Colors.ERROR
+
+                row["feedback"].configure(bg=fb_bg)
+                row["feedback_label"].configure(text=fb_text, fg=fb_color, bg=fb_bg)
+                row["feedback"].pack(fill="x")
+            else:
+                row["feedback"].pack_forget()
+
+    def _make_score_row(self):
+        """Build the unpacked score banner; colours are set per run."""
+        frame = tk.Frame(
+            self.results_scroll.scrollable_frame,
+            padx=Spacing.XXL, pady=Spacing.LG,
+        )
+        label = tk.Label(frame, font=Fonts.get_sans_bold(Fonts.SIZE_HEADER))
+        label.pack()
+        missing = tk.Label(
+            frame, font=Fonts.get_sans(Fonts.SIZE_SMALL), fg=Colors.TEXT_MUTED,
+        )
+        return {"frame": frame, "label": label, "missing": missing}
 
+    def _make_hint_row(self):
+        """Build the unpacked tip shown when no predictions were made."""
+        hint = tk.Frame(
+            self.results_scroll.scrollable_frame,
+            bg=Colors.BG_OVERLAY, padx=Spacing.LG, pady=Spacing.MD,
+        )
+        tk.Label(
+            hint,
+            text="💡 Tip: Load a file and select predictions before running to see your score!",
+            font=Fonts.get_sans(Fonts.SIZE_NORMAL),
+            fg=Colors.SAPPHIRE, bg=Colors.BG_OVERLAY,
+        ).pack()
+        return {"frame": hint}
+
+    def _make_badge_row(self):
+        """Build the unpacked TRUE / FALSE / UNDETERMINED count badges."""
         badge_frame = tk.Frame(self.results_scroll.scrollable_frame, bg=Colors.BG_DARK)
-        badge_frame.pack(fill="x", pady=(0, Spacing.LG))
+        counts = []
 
-        for count, label, color, bg_color in [
-            (true_count, "TRUE", Colors.SUCCESS, "#2d4a2d"),
-            (false_count, "FALSE", Colors.ERROR, "#4a2d2d"),
-            (undet_count, "UNDETERMINED", Colors.WARNING, "#4a442d"),
+        for label, color, bg_color in [
+            ("TRUE", Colors.SUCCESS, Colors.SUCCESS_BG),
+            ("FALSE", Colors.ERROR, Colors.ERROR_BG),
+            ("UNDETERMINED", Colors.WARNING, Colors.WARNING_BG),
         ]:
             badge = tk.Frame(badge_frame, bg=bg_color, padx=Spacing.LG, pady=Spacing.SM)
             badge.pack(side="left", padx=(0, Spacing.MD))
-            tk.Label(badge, text=f"{count}", font=Fonts.get_sans_bold(Fonts.SIZE_LARGE),
-                     fg=color, bg=bg_color).pack(side="left", padx=(0, Spacing.SM))
+            count_label = tk.Label(badge, font=Fonts.get_sans_bold(Fonts.SIZE_LARGE),
+                                   fg=color, bg=bg_color)
+            count_label.pack(side="left", padx=(0, Spacing.SM))
+            counts.append(count_label)
             tk.Label(badge, text=label, font=Fonts.get_sans(Fonts.SIZE_SMALL),
                      fg=color, bg=bg_color).pack(side="left")
 
-        # Separator
-        tk.Frame(self.results_scroll.scrollable_frame, bg=Colors.BORDER, height=1).pack(
-            fill="x", pady=Spacing.LG
-        )
+        return {"frame": badge_frame, "counts": counts}
 
-        # --- Result cards with prediction comparison ---
-        for fact, value in self.results.items():
-            user_pred = self.predictions.get(fact, "")
-            is_correct = (user_pred == value.name) if user_pred else None
+    def _make_result_row(self):
+        """Build one unpacked result card row, with its feedback strip."""
+        card_wrapper = tk.Frame(
+            self.results_scroll.scrollable_frame, bg=Colors.BG_DARK,
+        )
 
-            # Card wrapper
-            card_wrapper = tk.Frame(
-                self.results_scroll.scrollable_frame, bg=Colors.BG_DARK,
-            )
-            card_wrapper.pack(fill="x", pady=Spacing.XS)
+        card = ResultCard(card_wrapper, "", "UNDETERMINED")
+        card.pack(fill="x")
 
-            card = ResultCard(card_wrapper, fact, value.name)
-            card.pack(fill="x")
+        fb = tk.Frame(card_wrapper, padx=Spacing.LG, pady=Spacing.SM)
+        fb_label = tk.Label(fb, font=Fonts.get_sans(Fonts.SIZE_NORMAL))
+        fb_label.pack(side="left")
 
-            # Prediction feedback row
-            if user_pred:
-                if is_correct:
-                    fb_bg = "#2d4a2d"
-                    fb_text = f"✓  Your prediction: {user_pred}  —  Correct!"
-                    fb_color = Colors.SUCCESS
-                else:
-                    fb_bg = "#4a2d2d"
-                    fb_text = f"✗  Your prediction: {user_pred}  —  Wrong (actual: {value.name})"
-                    fb_color = Colors.ERROR
+        return {
+            "frame": card_wrapper, "card": card, "value": None,
+            "feedback": fb, "feedback_label": fb_label,
+        }
 
-                fb = tk.Frame(card_wrapper, bg=fb_bg, padx=Spacing.LG, pady=Spacing.SM)
-                fb.pack(fill="x")
-                tk.Label(
-                    fb, text=fb_text,
-                    font=Fonts.get_sans(Fonts.SIZE_NORMAL),
-                    fg=fb_color, bg=fb_bg,
-                ).pack(side="left")
+    def _render_panel(self, key):
+        """
+        Fill the reasoning or statistics panel if it is shown. Otherwise
+        mark it stale, and _switch_panel fills it on its next visit.
+        """
+        if key == self._active_nav:
+            self._fill_panel(key)
+        else:
+            self._stale_panels.add(key)
+
+    def _fill_panel(self, key):
+        if key == "reasoning":
+            # The rules object stands for the whole parse, initial facts
+            # included; see _parse_current.
+            shown = (self.rules, tuple(self.queries))
+            last = self._reasoning_shown
+            if last is not None and last[0] is shown[0] and last[1] == shown[1]:
+                return
+            with self.reasoning_text.batch():
+                self._display_reasoning()
+            self._reasoning_shown = shown
+        else:
+            if self._stats_segments is None:
+                self._stats_segments = self._statistics_segments()
+            if self._stats_shown is self._stats_segments:
+                return
+            self.statistics_text.bulk_write(self._stats_segments)
+            self._stats_shown = self._stats_segments
 
     def _display_reasoning(self):
         """Display reasoning visualization."""
@@ -790,126 +1066,100 @@ class ExpertSystemApp:
         if not self.rules:
             return
 
-        visualizer = ReasoningVisualizer(self.rules, self.initial_facts)
+        visualizer = None
+        cache = self._explain_cache
 
         # Header
         self.reasoning_text.append("REASONING VISUALIZATION\n", "header")
-        facts_str = ", ".join(sorted(self.initial_facts)) if self.initial_facts else "None"
+        facts_str = self._initial_facts_str or "None"
         self.reasoning_text.append(f"Initial facts: {facts_str}\n", "info")
-        self.reasoning_text.append(f"Queries: {', '.join(self.queries)}\n\n", "info")
+        self.reasoning_text.append(f"Queries: {self._queries_str}\n\n", "info")
 
         for query in self.queries:
-            self.reasoning_text.append("─" * 60 + "\n", "separator")
+            self.reasoning_text.append(_SEP_THICK, "separator")
             self.reasoning_text.append(f"QUERY: {query}\n", "subheader")
-            self.reasoning_text.append("─" * 60 + "\n\n", "separator")
-
-            summary, result, steps = visualizer.explain_query(query)
-
-            for step in steps:
-                # Detect formal notation lines
-                stripped = step.lstrip()
-                if stripped.startswith("Formal:"):
-                    self.reasoning_text.append(step + "\n", "formal")
-                elif "TRUE" in step and "=" in step:
-                    self.reasoning_text.append(step + "\n", "true_text")
-                elif "FALSE" in step and "=" in step:
-                    self.reasoning_text.append(step + "\n", "false_text")
-                elif "UNDETERMINED" in step:
-                    self.reasoning_text.append(step + "\n", "undetermined_text")
-                else:
-                    self.reasoning_text.append(step + "\n", "step")
-
-            self.reasoning_text.append("\n", None)
-
-            # Conclusion
-            if result == TruthValue.TRUE:
-                tag = "true_text"
-            elif result == TruthValue.FALSE:
-                tag = "false_text"
-            else:
-                tag = "undetermined_text"
-            self.reasoning_text.append(f"CONCLUSION: {summary}\n\n", tag)
-
-    def _display_statistics(self):
-        """Display statistics."""
-        self.statistics_text.clear()
-
+            self.reasoning_text.append(_SEP_THICK + "\n", "separator")
+
+            # Steps are classified once per query and parse, not on
+            # every render.
+            segments = cache.get(query)
+            if segments is None:
+                if visualizer is None:
+                    visualizer = ReasoningVisualizer(self.rules, self.initial_facts)
+                summary, result, steps = visualizer.explain_query(query)
+                segments = [(step + "\n", _step_tag(step)) for step in steps]
+                segments.append(("\n", None))
+                segments.append((f"CONCLUSION: {summary}\n\n", _RESULT_TAGS[result]))
+                cache[query] = segments
+
+            for text, tag in segments:
+                self.reasoning_text.append(text, tag)
+
+    def _statistics_segments(self):
+        """Build the statistics panel text as (text, tag) segments."""
         if not self.rules:
-            self.statistics_text.append("No rules loaded.\n", "info")
-            return
+            return [("No rules loaded.\n", "info")]
+
+        segments = []
+        add = segments.append
 
         analyzer = StatisticsAnalyzer(self.rules, self.initial_facts)
         stats = analyzer.analyze_rules()
-        deps = analyzer.analyze_dependencies()
 
         # Header
-        self.statistics_text.append("RULE SET STATISTICS\n\n", "header")
+        add(("RULE SET STATISTICS\n\n", "header"))
 
         # Basic metrics
-        self.statistics_text.append("BASIC METRICS\n", "subheader")
-        self.statistics_text.append("─" * 50 + "\n", "separator")
-        self.statistics_text.append(f"  Total rules:         {stats['total_rules']}\n", "step")
-        self.statistics_text.append(f"  Biconditional:       {stats['biconditional_rules']}\n", "step")
+        add(("BASIC METRICS\n", "subheader"))
+        add((_SEP_THIN, "separator"))
+        add((f"  Total rules:         {stats['total_rules']}\n", "step"))
+        add((f"  Biconditional:       {stats['biconditional_rules']}\n", "step"))
         regular = stats['total_rules'] - stats['biconditional_rules']
-        self.statistics_text.append(f"  Regular:             {regular}\n\n", "step")
+        add((f"  Regular:             {regular}\n\n", "step"))
 
         # Facts
-        self.statistics_text.append("FACTS\n", "subheader")
-        self.statistics_text.append("─" * 50 + "\n", "separator")
-        init_str = ", ".join(sorted(self.initial_facts)) if self.initial_facts else "None"
-        self.statistics_text.append(f"  Initial facts:       {init_str}\n", "step")
+        add(("FACTS\n", "subheader"))
+        add((_SEP_THIN, "separator"))
+        init_str = self._initial_facts_str or "None"
+        add((f"  Initial facts:       {init_str}\n", "step"))
         used_str = ", ".join(stats['facts_used'])
-        self.statistics_text.append(f"  Facts used:          {len(stats['facts_used'])} ({used_str})\n", "step")
+        add((f"  Facts used:          {len(stats['facts_used'])} ({used_str})\n", "step"))
         concl_str = ", ".join(stats['facts_concluded'])
-        self.statistics_text.append(f"  Facts concluded:     {len(stats['facts_concluded'])} ({concl_str})\n\n", "step")
+        add((f"  Facts concluded:     {len(stats['facts_concluded'])} ({concl_str})\n\n", "step"))
 
         # Operators
-        from parser import NodeType
-        op_names = {
-            NodeType.NOT: "NOT (!)",
-            NodeType.AND: "AND (+)",
-            NodeType.OR: "OR (|)",
-            NodeType.XOR: "XOR (^)",
-            NodeType.IMPLIES: "IMPLIES (=>)",
-            NodeType.IFF: "IFF (<=>)",
-        }
-
-        self.statistics_text.append("OPERATORS\n", "subheader")
-        self.statistics_text.append("─" * 50 + "\n", "separator")
-        sorted_ops = sorted(stats['total_operators'].items(), key=lambda x: -x[1])
-        for op_type, count in sorted_ops:
-            name = op_names.get(op_type, str(op_type))
-            self.statistics_text.append(f"  {name:20s} {count:3d}×\n", "step")
-        self.statistics_text.append("\n", None)
+        add(("OPERATORS\n", "subheader"))
+        add((_SEP_THIN, "separator"))
+        for op_type, count in stats['sorted_operators']:
+            name = _OP_NAMES.get(op_type, str(op_type))
+            add((_OPERATOR_LINE(name, count), "step"))
+        add(("\n", None))
 
         # Complexity
         if stats['complexity_scores']:
-            self.statistics_text.append("COMPLEXITY\n", "subheader")
-            self.statistics_text.append("─" * 50 + "\n", "separator")
-            self.statistics_text.append(f"  Average complexity:  {stats['avg_complexity']:.2f}\n", "step")
-            self.statistics_text.append(f"  Max complexity:      {stats['max_complexity']}\n", "step")
-            self.statistics_text.append(f"  Min complexity:      {stats['min_complexity']}\n", "step")
-            self.statistics_text.append(f"  Max nesting depth:   {stats['max_depth']}\n\n", "step")
+            add(("COMPLEXITY\n", "subheader"))
+            add((_SEP_THIN, "separator"))
+            add((f"  Average complexity:  {stats['avg_complexity']:.2f}\n", "step"))
+            add((f"  Max complexity:      {stats['max_complexity']}\n", "step"))
+            add((f"  Min complexity:      {stats['min_complexity']}\n", "step"))
+            add((f"  Max nesting depth:   {stats['max_depth']}\n\n", "step"))
 
         # Dependencies
-        if deps:
-            self.statistics_text.append("DEPENDENCIES\n", "subheader")
-            self.statistics_text.append("─" * 50 + "\n", "separator")
-            for fact, dependencies in sorted(deps.items()):
-                if dependencies:
-                    dep_str = ", ".join(sorted(dependencies))
-                    self.statistics_text.append(f"  {fact} → {dep_str}\n", "step")
-            self.statistics_text.append("\n", None)
+        if stats['formatted_dependencies']:
+            add(("DEPENDENCIES\n", "subheader"))
+            add((_SEP_THIN, "separator"))
+            for fact, dep_str in stats['formatted_dependencies']:
+                add((f"  {fact} → {dep_str}\n", "step"))
+            add(("\n", None))
 
         # Most complex rules
         if stats['complexity_scores']:
-            self.statistics_text.append("MOST COMPLEX RULES\n", "subheader")
-            self.statistics_text.append("─" * 50 + "\n", "separator")
-            rules_with_complexity = list(zip(self.rules, stats['complexity_scores']))
-            rules_with_complexity.sort(key=lambda x: -x[1])
-            for i, (rule, complexity) in enumerate(rules_with_complexity[:5], 1):
-                rule_str = analyzer.format_rule(rule)
-                self.statistics_text.append(f"  {i}. [{complexity}] {rule_str}\n", "step")
+            add(("MOST COMPLEX RULES\n", "subheader"))
+            add((_SEP_THIN, "separator"))
+            for i, (complexity, rule_str) in enumerate(stats['top_complex_rules'], 1):
+                add((f"  {i}. [{complexity}] {rule_str}\n", "step"))
+
+        return segments
 
     # ------------------------------------------------------------------ #
     #  Interactive Facts
@@ -919,20 +1169,21 @@ class ExpertSystemApp:
             self.active_facts.discard(letter)
         else:
             self.active_facts.add(letter)
-        self._update_fact_buttons()
+        self._active_facts_str = None
+        self._paint_fact_cell(letter)
 
     def _on_interactive_query(self):
         """Run inference with interactively selected facts."""
         query_text = self.query_entry.get().strip().upper()
-        if not query_text:
+        if query_text:
+            queries = list(_NON_UPPER_RE.sub("", query_text))
+        elif self.queries:
             # Use queries from file
-            query_text = "".join(self.queries) if self.queries else ""
-
-        if not query_text:
+            queries = list(self.queries)
+        else:
             self.statusbar.set_status("Enter query letters (e.g. GVX)", Colors.WARNING)
             return
 
-        queries = [ch for ch in query_text if ch.isupper()]
         if not queries:
             self.statusbar.set_status("Enter uppercase letters for queries", Colors.WARNING)
             return
@@ -942,30 +1193,58 @@ class ExpertSystemApp:
             return
 
         try:
-            engine = InferenceEngine(self.rules, self.active_facts)
-            results = engine.query_all(queries)
-
-            # Clear old results
-            for w in self.interactive_results_frame.winfo_children():
-                w.destroy()
+            # Toggling back to an explored fact set reuses its results
+            unique = tuple(dict.fromkeys(queries))
+            key = (frozenset(self.active_facts), unique)
+            results = self._interactive_cache.get(key)
+            if results is None:
+                # Active facts are TRUE by definition; only the rest
+                # need the engine, which may not be needed at all.
+                to_solve = [q for q in unique if q not in self.active_facts]
+                solved = {}
+                if to_solve:
+                    engine = InferenceEngine(self.rules, self.active_facts)
+                    solved = engine.query_all(to_solve)
+                results = self._interactive_cache[key] = {
+                    q: solved.get(q, TruthValue.TRUE) for q in unique
+                }
+
+            # The header and cards are kept between queries; cards are
+            # only repacked when the queried facts or their order change.
+            if self._interactive_header is None:
+                _mklabel(
+                    self.interactive_results_frame, "Results",
+                    font=Fonts.get_sans_bold(Fonts.SIZE_MEDIUM),
+                    anchor="w", pady=(0, Spacing.MD),
+                )
+                self._interactive_header = _mklabel(
+                    self.interactive_results_frame, "",
+                    font=Fonts.get_sans(Fonts.SIZE_SMALL), fg=Colors.TEXT_MUTED,
+                    anchor="w", pady=(0, Spacing.MD),
+                )
 
-            tk.Label(
-                self.interactive_results_frame, text="Results",
-                font=Fonts.get_sans_bold(Fonts.SIZE_MEDIUM),
-                fg=Colors.TEXT_SECONDARY, bg=Colors.BG_DARK,
-            ).pack(anchor="w", pady=(0, Spacing.MD))
+            facts_str = self._active_facts_str
+            if facts_str is None:
+                facts_str = ", ".join(sorted(self.active_facts)) or "None"
+                self._active_facts_str = facts_str
+            self._interactive_header.configure(text=f"Active facts: {facts_str}")
 
-            facts_str = ", ".join(sorted(self.active_facts)) if self.active_facts else "None"
-            tk.Label(
-                self.interactive_results_frame,
-                text=f"Active facts: {facts_str}",
-                font=Fonts.get_sans(Fonts.SIZE_SMALL),
-                fg=Colors.TEXT_MUTED, bg=Colors.BG_DARK,
-            ).pack(anchor="w", pady=(0, Spacing.MD))
+            cards = self._interactive_cards
+            layout = tuple(results)
+            repack = layout != self._interactive_layout
+            if repack:
+                for card in cards.values():
+                    card.pack_forget()
+                self._interactive_layout = layout
 
             for fact, value in results.items():
-                card = ResultCard(self.interactive_results_frame, fact, value.name)
-                card.pack(fill="x", pady=Spacing.XS)
+                card = cards.get(fact)
+                if card is None:
+                    card = cards[fact] = ResultCard(self.interactive_results_frame, fact, value.name)
+                else:
+                    card.set_result(fact, value.name)
+                if repack:
+                    card.pack(fill="x", pady=Spacing.XS)
 
             self.statusbar.set_status("Interactive query complete ✓", Colors.SUCCESS)
 
@@ -978,3 +1257,4 @@ class ExpertSystemApp:
     def run(self):
         """Start the application."""
         self.root.mainloop()
+        self._io_executor.shutdown(wait=False)
@@ -4,6 +4,8 @@ Theme configuration for the Expert System UI.
 Modern dark theme inspired by popular code editors.
 """
 
+from functools import lru_cache
+
 
 class Colors:
     """Color palette - Catppuccin Mocha inspired dark theme."""
@@ -41,6 +43,11 @@ class Colors:
     INFO = BLUE
     UNDETERMINED = YELLOW
 
+    # Tinted backgrounds for semantic badges, banners and feedback
+    SUCCESS_BG = "#2d4a2d"
+    ERROR_BG = "#4a2d2d"
+    WARNING_BG = "#4a442d"
+
     # Editor syntax highlighting
     SYN_COMMENT = "#6c7086"
     SYN_OPERATOR = "#fab387"
@@ -82,18 +89,21 @@ class Fonts:
     SIZE_HEADER = 20
 
     @staticmethod
+    @lru_cache(maxsize=32)
     def get_mono(size=None):
         if size is None:
             size = Fonts.SIZE_NORMAL
         return (Fonts.FAMILY_MONO, size)
 
     @staticmethod
+    @lru_cache(maxsize=32)
     def get_sans(size=None):
         if size is None:
             size = Fonts.SIZE_NORMAL
         return (Fonts.FAMILY_SANS, size)
 
     @staticmethod
+    @lru_cache(maxsize=32)
     def get_sans_bold(size=None):
         if size is None:
             size = Fonts.SIZE_NORMAL
@@ -111,12 +121,20 @@ class Spacing:
 
 
 def apply_theme(root):
-    """Apply the dark theme to the root window and ttk styles."""
+    """
+    Apply the dark theme to the root window and ttk styles. Styles live
+    in the root's Tcl interpreter, so they are configured once per root;
+    later calls return the configured style.
+    """
     import tkinter.ttk as ttk
 
+    style = getattr(root, "_theme_style", None)
+    if style is not None:
+        return style
+
     root.configure(bg=Colors.BG_DARK)
 
-    style = ttk.Style()
+    style = ttk.Style(root)
 
     try:
         style.theme_use("clam")
@@ -222,32 +240,6 @@ def apply_theme(root):
         background=[("active", Colors.BG_OVERLAY)],
         foreground=[("active", Colors.TEXT_PRIMARY)],
     )
-    style.configure(
-        "Fact.TButton",
-        background=Colors.BG_OVERLAY,
-        foreground=Colors.TEXT_SECONDARY,
-        font=Fonts.get_mono(Fonts.SIZE_MEDIUM),
-        padding=(Spacing.SM, Spacing.XS),
-        borderwidth=1,
-    )
-    style.map(
-        "Fact.TButton",
-        background=[("active", Colors.BG_HIGHLIGHT)],
-    )
-    style.configure(
-        "FactActive.TButton",
-        background=Colors.GREEN,
-        foreground=Colors.TEXT_DARK,
-        font=Fonts.get_mono(Fonts.SIZE_MEDIUM),
-        padding=(Spacing.SM, Spacing.XS),
-        borderwidth=1,
-    )
-    style.map(
-        "FactActive.TButton",
-        background=[("active", Colors.TEAL)],
-        foreground=[("active", Colors.TEXT_DARK)],
-    )
-
     style.configure(
         "Nav.TButton",
         background=Colors.BG_DARK,
@@ -312,4 +304,5 @@ def apply_theme(root):
         background=[("active", Colors.SCROLLBAR_FG)],
     )
 
+    root._theme_style = style
     return style
@@ -3,17 +3,102 @@
 Custom widgets for the Expert System UI.
 """
 
+import re
 import tkinter as tk
+import tkinter.font as tkfont
 import tkinter.ttk as ttk
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 from ui.theme import Colors, Fonts, Spacing
 
+# Font specs used by the widgets below
+_MONO_NORMAL = Fonts.get_mono(Fonts.SIZE_NORMAL)
+_MONO_SMALL = Fonts.get_mono(Fonts.SIZE_SMALL)
+_MONO_TITLE = Fonts.get_mono(Fonts.SIZE_TITLE)
+_SANS_NORMAL = Fonts.get_sans(Fonts.SIZE_NORMAL)
+_SANS_SMALL = Fonts.get_sans(Fonts.SIZE_SMALL)
+_SANS_BOLD_MEDIUM = Fonts.get_sans_bold(Fonts.SIZE_MEDIUM)
+_SANS_BOLD_LARGE = Fonts.get_sans_bold(Fonts.SIZE_LARGE)
+
+# Rule-line tokens, named after the highlight tag each one gets
+_TOKEN_RE = re.compile(r"(?P<operator><=>|=>|[!+|^])|(?P<paren>[()])|(?P<fact>[A-Z])")
+
+
+@lru_cache(maxsize=4096)
+def _line_tokens(line):
+    """
+    Highlight spans of one editor line as (tag, start column, end
+    column). Cached by the line's text, so a pass re-scans only the
+    lines edited since they were last seen, wherever they moved.
+    """
+    # Comment highlighting; a whole-line comment has nothing else
+    comment_start = line.find("#")
+    if comment_start == 0:
+        return (("comment", 0, len(line)),)
+
+    spans = []
+    stripped = line.lstrip()
+
+    # Only highlight before the comment
+    if comment_start > 0:
+        spans.append(("comment", comment_start, len(line)))
+        line = line[:comment_start]
+
+    if stripped.startswith("="):
+        # Initial facts line
+        spans.append(("initial_line", 0, len(line)))
+    elif stripped.startswith("?"):
+        # Query line
+        spans.append(("query_line", 0, len(line)))
+    else:
+        # Operators and facts in rule lines
+        spans.extend((m.lastgroup, m.start(), m.end())
+                     for m in _TOKEN_RE.finditer(line))
+    return tuple(spans)
+
+
+def _forget_widget(widget):
+    """
+    Drop tkinter's references to a widget Tk has already destroyed,
+    and to its descendants: BaseWidget.destroy minus the Tcl destroy.
+    """
+    for child in list(widget.children.values()):
+        _forget_widget(child)
+    widget.master.children.pop(widget._name, None)
+    # Deletes the Tcl commands registered for the widget's callbacks
+    tk.Misc.destroy(widget)
+
 
 class LineNumberedText(tk.Frame):
     """Text editor with line numbers and syntax highlighting."""
 
+    REFRESH_DELAY_MS = 150
+
+    # Tag configurations, shared by every editor
+    SYNTAX_TAGS = {
+        "comment": {"foreground": Colors.SYN_COMMENT, "font": _MONO_NORMAL},
+        "operator": {"foreground": Colors.SYN_OPERATOR, "font": _MONO_NORMAL},
+        "fact": {"foreground": Colors.SYN_FACT, "font": _MONO_NORMAL},
+        "initial_line": {"foreground": Colors.SYN_INITIAL, "font": _MONO_NORMAL},
+        "query_line": {"foreground": Colors.SYN_QUERY, "font": _MONO_NORMAL},
+        "paren": {"foreground": Colors.SYN_PAREN, "font": _MONO_NORMAL},
+    }
+
     def __init__(self, parent, **kwargs):
         super().__init__(parent, bg=Colors.BG_SURFACE, bd=0)
 
+        self._refresh_after_id = None
+        # Lines highlighted since the last content refresh; the rest are
+        # highlighted when scrolled into view.
+        self._highlighted = set()
+        self._line_count = 0          # lines numbered in the gutter
+        # Highlight tags that may be on some text; the others need no
+        # tag_remove before a pass.
+        self._used_tags = set()
+
         self._build_widgets()
         self._bind_events()
         self._syntax_rules = self._build_syntax_rules()
@@ -29,7 +114,7 @@ class LineNumberedText(tk.Frame):
             border=0,
             background=Colors.BG_OVERLAY,
             foreground=Colors.TEXT_MUTED,
-            font=Fonts.get_mono(Fonts.SIZE_NORMAL),
+            font=_MONO_NORMAL,
             state="disabled",
             wrap="none",
             cursor="arrow",
@@ -57,7 +142,7 @@ class LineNumberedText(tk.Frame):
             insertbackground=Colors.BLUE,
             selectbackground=Colors.BG_HIGHLIGHT,
             selectforeground=Colors.TEXT_PRIMARY,
-            font=Fonts.get_mono(Fonts.SIZE_NORMAL),
+            font=_MONO_NORMAL,
             undo=True,
             autoseparators=True,
             maxundo=-1,
@@ -65,203 +150,229 @@ class LineNumberedText(tk.Frame):
         )
 
         scrollbar = ttk.Scrollbar(
-            text_frame, orient="vertical", command=self._on_scroll
+            text_frame, orient="vertical", command=self.text.yview
         )
         scrollbar.pack(side="right", fill="y")
+        self._scrollbar = scrollbar
 
-        self.text.configure(yscrollcommand=scrollbar.set)
+        self.text.configure(yscrollcommand=self._on_yscroll)
         self.text.pack(side="left", fill="both", expand=True)
 
-    def _on_scroll(self, *args):
-        self.text.yview(*args)
-        self.line_numbers.yview(*args)
+    def _on_yscroll(self, first, last):
+        # Every view change (wheel, scrollbar, keys, clicks, resizing,
+        # a new line) passes here once, after the text has moved, so
+        # the gutter and highlighting follow without per-event binds.
+        self._scrollbar.set(first, last)
+        self.line_numbers.yview_moveto(first)
+        self._highlight_visible()
 
     def _bind_events(self):
-        self.text.bind("<KeyRelease>", self._on_text_change)
-        self.text.bind("<ButtonRelease>", self._on_text_change)
-        self.text.bind("<MouseWheel>", self._on_mousewheel)
-        self.text.bind("<Button-4>", self._on_mousewheel)
-        self.text.bind("<Button-5>", self._on_mousewheel)
+        # Content changes arrive through <<Modified>>, view changes
+        # through _on_yscroll.
         self.text.bind("<<Modified>>", self._on_modified)
 
-    def _on_mousewheel(self, event):
-        self.line_numbers.yview_moveto(self.text.yview()[0])
-
     def _on_modified(self, event=None):
         if self.text.edit_modified():
-            self._update_line_numbers()
-            self._apply_syntax_highlighting()
+            self._schedule_refresh()
             self.text.edit_modified(False)
 
-    def _on_text_change(self, event=None):
+    def _schedule_refresh(self):
+        """
+        Coalesce a burst of edits into one line-number and highlighting
+        pass, run once typing pauses instead of on every keystroke.
+        """
+        if self._refresh_after_id is not None:
+            self.after_cancel(self._refresh_after_id)
+        self._refresh_after_id = self.after(self.REFRESH_DELAY_MS, self._refresh)
+
+    def _refresh(self):
+        self._refresh_after_id = None
         self._update_line_numbers()
-        self._apply_syntax_highlighting()
+        self._highlighted.clear()
+        self._highlight_visible()
         self.line_numbers.yview_moveto(self.text.yview()[0])
 
+    def _highlight_visible(self):
+        """
+        Highlight the visible lines not highlighted since the last
+        refresh, so a refresh costs the viewport rather than the file.
+        Tags move with the text, so lines off screen keep their tags.
+        """
+        text = self.text
+        first = int(text.index("@0,0").split(".")[0])
+        last = int(text.index(f"@0,{text.winfo_height()}").split(".")[0])
+        missing = [n for n in range(first, last + 1) if n not in self._highlighted]
+        if missing:
+            self._apply_syntax_highlighting(missing[0], missing[-1])
+            self._highlighted.update(range(missing[0], missing[-1] + 1))
+
     def _update_line_numbers(self):
-        self.line_numbers.configure(state="normal")
-        self.line_numbers.delete("1.0", "end")
+        """Add or drop only the gutter numbers the line count changed by."""
+        old = self._line_count
+        # Newlines before the final one, as an int; tkinter gives None
+        # rather than (0,) for a one-line buffer.
+        new = (self.text.count("1.0", "end-1c", "lines") or (0,))[0] + 1
+        if new == old:
+            return
 
-        line_count = int(self.text.index("end-1c").split(".")[0])
-        line_str = "\n".join(str(i) for i in range(1, line_count + 1))
-        self.line_numbers.insert("1.0", line_str)
+        self.line_numbers.configure(state="normal")
+        if new > old:
+            numbers = "\n".join(map(str, range(old + 1, new + 1)))
+            self.line_numbers.insert("end", "\n" + numbers if old else numbers)
+        else:
+            self.line_numbers.delete(f"{new}.end", "end")
         self.line_numbers.configure(state="disabled")
+        self._line_count = new
 
     def _build_syntax_rules(self):
-        """Define syntax highlighting tag configurations."""
-        tags = {
-            "comment": {"foreground": Colors.SYN_COMMENT, "font": Fonts.get_mono(Fonts.SIZE_NORMAL)},
-            "operator": {"foreground": Colors.SYN_OPERATOR, "font": Fonts.get_mono(Fonts.SIZE_NORMAL)},
-            "fact": {"foreground": Colors.SYN_FACT, "font": Fonts.get_mono(Fonts.SIZE_NORMAL)},
-            "initial_line": {"foreground": Colors.SYN_INITIAL, "font": Fonts.get_mono(Fonts.SIZE_NORMAL)},
-            "query_line": {"foreground": Colors.SYN_QUERY, "font": Fonts.get_mono(Fonts.SIZE_NORMAL)},
-            "paren": {"foreground": Colors.SYN_PAREN, "font": Fonts.get_mono(Fonts.SIZE_NORMAL)},
-        }
-        for tag_name, config in tags.items():
+        """Configure the syntax highlighting tags."""
+        for tag_name, config in self.SYNTAX_TAGS.items():
             self.text.tag_configure(tag_name, **config)
 
         # Priority: comment > initial_line > query_line > operator > paren > fact
         self.text.tag_raise("comment")
-        return tags
-
-    def _apply_syntax_highlighting(self):
-        """Apply syntax highlighting to the entire text."""
-        for tag in self._syntax_rules:
-            self.text.tag_remove(tag, "1.0", "end")
-
-        content = self.text.get("1.0", "end")
+        return self.SYNTAX_TAGS
+
+    def _apply_syntax_highlighting(self, first_line, last_line):
+        """
+        Apply syntax highlighting to lines first_line..last_line. Only
+        that slice of the buffer is copied out of Tk and split.
+        """
+        range_start = f"{first_line}.0"
+        range_end = f"{last_line}.end"
+        for tag in self._used_tags:
+            self.text.tag_remove(tag, range_start, range_end)
+
+        content = self.text.get(range_start, range_end)
         lines = content.split("\n")
 
-        for line_idx, line in enumerate(lines):
-            line_num = line_idx + 1
-            stripped = line.lstrip()
-
-            # Comment highlighting
-            if "#" in line:
-                comment_start = line.index("#")
-                start = f"{line_num}.{comment_start}"
-                end = f"{line_num}.end"
-                self.text.tag_add("comment", start, end)
-                # Only highlight before the comment
-                line_before_comment = line[:comment_start]
-            else:
-                line_before_comment = line
-
-            # Initial facts line
-            if stripped.startswith("="):
-                start = f"{line_num}.0"
-                comment_end = len(line_before_comment)
-                end = f"{line_num}.{comment_end}"
-                self.text.tag_add("initial_line", start, end)
-                continue
+        # Index pairs per tag, added in one tag_add call per tag
+        ranges = defaultdict(list)
 
-            # Query line
-            if stripped.startswith("?"):
-                start = f"{line_num}.0"
-                comment_end = len(line_before_comment)
-                end = f"{line_num}.{comment_end}"
-                self.text.tag_add("query_line", start, end)
+        for line_num, line in enumerate(lines, first_line):
+            spans = _line_tokens(line)
+            if not spans:
                 continue
+            prefix = f"{line_num}."
+            for tag, start, end in spans:
+                ranges[tag].extend((prefix + str(start), prefix + str(end)))
 
-            # Operators and facts in rule lines
-            i = 0
-            while i < len(line_before_comment):
-                ch = line_before_comment[i]
-
-                # Check for <=>
-                if ch == "<" and i + 2 < len(line_before_comment) and line_before_comment[i:i+3] == "<=>":
-                    self.text.tag_add("operator", f"{line_num}.{i}", f"{line_num}.{i+3}")
-                    i += 3
-                    continue
-                # Check for =>
-                if ch == "=" and i + 1 < len(line_before_comment) and line_before_comment[i:i+2] == "=>":
-                    self.text.tag_add("operator", f"{line_num}.{i}", f"{line_num}.{i+2}")
-                    i += 2
-                    continue
-                # Single-char operators
-                if ch in "!+|^":
-                    self.text.tag_add("operator", f"{line_num}.{i}", f"{line_num}.{i+1}")
-                    i += 1
-                    continue
-                # Parentheses
-                if ch in "()":
-                    self.text.tag_add("paren", f"{line_num}.{i}", f"{line_num}.{i+1}")
-                    i += 1
-                    continue
-                # Facts (uppercase letters)
-                if ch.isupper():
-                    self.text.tag_add("fact", f"{line_num}.{i}", f"{line_num}.{i+1}")
-                    i += 1
-                    continue
-
-                i += 1
+        for tag, indices in ranges.items():
+            self.text.tag_add(tag, *indices)
+        self._used_tags.update(ranges)
 
     def get_content(self):
         """Get the text content."""
         return self.text.get("1.0", "end-1c")
 
     def set_content(self, content):
-        """Set the text content."""
-        self.text.delete("1.0", "end")
-        self.text.insert("1.0", content)
-        self._update_line_numbers()
-        self._apply_syntax_highlighting()
+        """
+        Set the text content as one undo step, then refresh the gutter
+        and highlighting once. The debounced refresh the edit would
+        trigger through <<Modified>> is dropped, as this one covers it.
+        """
+        text = self.text
+        text.configure(autoseparators=False)
+        text.edit_separator()
+        text.delete("1.0", "end")
+        self._used_tags.clear()
+        text.insert("1.0", content)
+        text.edit_separator()
+        text.configure(autoseparators=True)
+
+        text.edit_modified(False)
+        if self._refresh_after_id is not None:
+            self.after_cancel(self._refresh_after_id)
+        self._refresh()
 
     def clear(self):
         """Clear the text."""
         self.text.delete("1.0", "end")
+        self._used_tags.clear()
         self._update_line_numbers()
 
 
-class ResultCard(tk.Frame):
-    """A card-style widget for displaying a single result."""
+class ResultCard(tk.Canvas):
+    """
+    A card-style widget for displaying a single result. The badge, fact
+    and value are drawn on one canvas rather than built from a frame
+    of labels.
+    """
+
+    # (badge width, badge height, card height) in pixels, measured from
+    # the fonts once, so the card fits its text at any Tk scaling
+    _geometry = None
 
     def __init__(self, parent, fact, value_name, **kwargs):
-        super().__init__(parent, bg=Colors.BG_OVERLAY, padx=Spacing.LG, pady=Spacing.MD, **kwargs)
+        badge_w, badge_h, height = self._measure(parent)
+        super().__init__(
+            parent, bg=Colors.BG_OVERLAY, highlightthickness=0, bd=0,
+            width=1, height=height, **kwargs,
+        )
+        self._mid = mid = height / 2
+        badge_top = (height - badge_h) / 2
+
+        # Left: badge with symbol
+        self.badge = self.rounded_rect(
+            self, Spacing.LG, badge_top,
+            Spacing.LG + badge_w, badge_top + badge_h, radius=6,
+        )
+        self.symbol_text = self.create_text(
+            Spacing.LG + badge_w / 2, mid, font=_SANS_BOLD_LARGE,
+        )
 
+        # Middle: fact name
+        self.fact_text = self.create_text(
+            Spacing.LG * 2 + badge_w, mid, anchor="w",
+            font=_MONO_TITLE, fill=Colors.TEXT_PRIMARY,
+        )
+
+        # Right: value, kept at the right edge as the card is resized
+        self.value_text = self.create_text(
+            0, mid, anchor="e", font=_SANS_BOLD_MEDIUM,
+        )
+        self.bind("<Configure>", self._on_resize)
+
+        self.set_result(fact, value_name)
+
+    @classmethod
+    def _measure(cls, widget):
+        """Size the badge and card with the padding the labels had."""
+        if cls._geometry is None:
+            symbol = tkfont.Font(root=widget, font=_SANS_BOLD_LARGE)
+            badge_w = max(map(symbol.measure, "✓✗?")) + 2 * Spacing.MD
+            badge_h = symbol.metrics("linespace") + 2 * Spacing.SM
+            line = max(
+                tkfont.Font(root=widget, font=font).metrics("linespace")
+                for font in (_MONO_TITLE, _SANS_BOLD_MEDIUM)
+            )
+            cls._geometry = (
+                badge_w, badge_h, max(badge_h, line) + 2 * Spacing.MD,
+            )
+        return cls._geometry
+
+    def _on_resize(self, event):
+        self.coords(self.value_text, event.width - Spacing.LG, self._mid)
+
+    def set_result(self, fact, value_name):
+        """Show a result, reconfiguring the existing items in place."""
         if value_name == "TRUE":
             symbol = "✓"
             color = Colors.SUCCESS
-            badge_bg = "#2d4a2d"
+            badge_bg = Colors.SUCCESS_BG
         elif value_name == "FALSE":
             symbol = "✗"
             color = Colors.ERROR
-            badge_bg = "#4a2d2d"
+            badge_bg = Colors.ERROR_BG
         else:
             symbol = "?"
             color = Colors.WARNING
-            badge_bg = "#4a442d"
-
-        # Left: badge with symbol
-        badge = tk.Frame(self, bg=badge_bg, padx=Spacing.MD, pady=Spacing.SM)
-        badge.pack(side="left", padx=(0, Spacing.LG))
-
-        symbol_label = tk.Label(
-            badge,
-            text=symbol,
-            font=Fonts.get_sans_bold(Fonts.SIZE_LARGE),
-            fg=color,
-            bg=badge_bg,
-        )
-        symbol_label.pack()
-
-        # Middle: fact name
-        tk.Label(
-            self,
-            text=fact,
-            font=Fonts.get_mono(Fonts.SIZE_TITLE),
-            fg=Colors.TEXT_PRIMARY,
-            bg=Colors.BG_OVERLAY,
-        ).pack(side="left", padx=(0, Spacing.LG))
+            badge_bg = Colors.WARNING_BG
 
-        # Right: value
-        tk.Label(
-            self,
-            text=value_name,
-            font=Fonts.get_sans_bold(Fonts.SIZE_MEDIUM),
-            fg=color,
-            bg=Colors.BG_OVERLAY,
-        ).pack(side="right")
+        self.itemconfigure(self.badge, fill=badge_bg)
+        self.itemconfigure(self.symbol_text, text=symbol, fill=color)
+        self.itemconfigure(self.fact_text, text=fact)
+        self.itemconfigure(self.value_text, text=value_name, fill=color)
 
     def rounded_rect(self, canvas, x1, y1, x2, y2, radius=10, **kwargs):
         """Draw a rounded rectangle on a canvas."""
@@ -294,11 +405,9 @@ class ScrollableFrame(tk.Frame):
             self, orient="vertical", command=self.canvas.yview
         )
         self.scrollable_frame = tk.Frame(self.canvas, bg=bg)
+        self._bulk_depth = 0
 
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")),
-        )
+        self.scrollable_frame.bind("<Configure>", self._on_frame_configure)
 
         self.canvas_window = self.canvas.create_window(
             (0, 0), window=self.scrollable_frame, anchor="nw"
@@ -311,22 +420,58 @@ class ScrollableFrame(tk.Frame):
         # Resize inner frame to canvas width
         self.canvas.bind("<Configure>", self._on_canvas_configure)
 
-        # Mouse wheel scrolling
-        self.scrollable_frame.bind("<Enter>", self._bind_mousewheel)
-        self.scrollable_frame.bind("<Leave>", self._unbind_mousewheel)
+        # Mouse wheel scrolling: one application-wide binding, sent to
+        # the scrollable frame under the pointer
+        root = self._root()
+        if not getattr(root, "_wheel_bound", False):
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                root.bind_all(sequence, ScrollableFrame._dispatch_wheel, add="+")
+            root._wheel_bound = True
+
+    def _on_frame_configure(self, event=None):
+        if self._bulk_depth:
+            return
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
 
     def _on_canvas_configure(self, event):
         self.canvas.itemconfig(self.canvas_window, width=event.width)
 
-    def _bind_mousewheel(self, event):
-        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
-        self.canvas.bind_all("<Button-4>", self._on_mousewheel)
-        self.canvas.bind_all("<Button-5>", self._on_mousewheel)
-
-    def _unbind_mousewheel(self, event):
-        self.canvas.unbind_all("<MouseWheel>")
-        self.canvas.unbind_all("<Button-4>")
-        self.canvas.unbind_all("<Button-5>")
+    def begin_bulk(self):
+        """
+        Hold scroll region updates while the contents are rebuilt.
+        Calls nest; only the outermost end_bulk resumes the updates.
+        """
+        self._bulk_depth += 1
+
+    def end_bulk(self):
+        """Resume updates and catch up on any skipped while held."""
+        self._bulk_depth -= 1
+        if self._bulk_depth == 0:
+            self._on_frame_configure()
+
+    @contextmanager
+    def batch(self):
+        """Rebuild the contents between begin_bulk and end_bulk."""
+        self.begin_bulk()
+        try:
+            yield self.scrollable_frame
+        finally:
+            self.end_bulk()
+
+    @staticmethod
+    def _dispatch_wheel(event):
+        """Scroll the innermost ScrollableFrame under the pointer, if any."""
+        if isinstance(event.widget, str):
+            return
+        try:
+            widget = event.widget.winfo_containing(event.x_root, event.y_root)
+        except KeyError:
+            # Pointer over a Tk-internal window tkinter does not wrap
+            return
+        while widget is not None and not isinstance(widget, ScrollableFrame):
+            widget = widget.master
+        if widget is not None:
+            widget._on_mousewheel(event)
 
     def _on_mousewheel(self, event):
         if event.num == 4:
@@ -336,15 +481,43 @@ class ScrollableFrame(tk.Frame):
         else:
             self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
 
-    def clear(self):
-        """Remove all children of the scrollable frame."""
+    def clear(self, keep=()):
+        """
+        Remove all children of the scrollable frame. Widgets in keep
+        are only unpacked, so their owner can pack them again.
+        """
+        keep = set(keep)
+        doomed = []
         for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+            if widget in keep:
+                widget.pack_forget()
+            else:
+                doomed.append(widget)
+        if doomed:
+            # One Tcl destroy takes the widgets and their descendants;
+            # tkinter's side is then cleared without further destroys.
+            self.tk.call("destroy", *(widget._w for widget in doomed))
+            for widget in doomed:
+                _forget_widget(widget)
 
 
 class ReasoningText(tk.Text):
     """A read-only text widget styled for reasoning output."""
 
+    # Reasoning tags, shared by every instance
+    TAGS = {
+        "header": {"foreground": Colors.LAVENDER, "font": _SANS_BOLD_LARGE},
+        "subheader": {"foreground": Colors.BLUE, "font": _SANS_BOLD_MEDIUM},
+        "true_text": {"foreground": Colors.SUCCESS, "font": _MONO_NORMAL},
+        "false_text": {"foreground": Colors.ERROR, "font": _MONO_NORMAL},
+        "undetermined_text": {"foreground": Colors.WARNING, "font": _MONO_NORMAL},
+        "step": {"foreground": Colors.TEXT_SECONDARY, "font": _MONO_NORMAL},
+        "formal": {"foreground": Colors.MAUVE, "font": _MONO_SMALL},
+        "separator": {"foreground": Colors.BORDER, "font": _MONO_SMALL},
+        "conclusion": {"foreground": Colors.LAVENDER, "font": _SANS_BOLD_MEDIUM},
+        "info": {"foreground": Colors.SAPPHIRE, "font": _SANS_NORMAL},
+    }
+
     def __init__(self, parent, **kwargs):
         super().__init__(
             parent,
@@ -354,7 +527,7 @@ class ReasoningText(tk.Text):
             border=0,
             background=Colors.BG_SURFACE,
             foreground=Colors.TEXT_PRIMARY,
-            font=Fonts.get_mono(Fonts.SIZE_NORMAL),
+            font=_MONO_NORMAL,
             state="disabled",
             cursor="arrow",
             selectbackground=Colors.BG_HIGHLIGHT,
@@ -362,20 +535,18 @@ class ReasoningText(tk.Text):
             **kwargs,
         )
 
-        # Reasoning tags
-        self.tag_configure("header", foreground=Colors.LAVENDER, font=Fonts.get_sans_bold(Fonts.SIZE_LARGE))
-        self.tag_configure("subheader", foreground=Colors.BLUE, font=Fonts.get_sans_bold(Fonts.SIZE_MEDIUM))
-        self.tag_configure("true_text", foreground=Colors.SUCCESS, font=Fonts.get_mono(Fonts.SIZE_NORMAL))
-        self.tag_configure("false_text", foreground=Colors.ERROR, font=Fonts.get_mono(Fonts.SIZE_NORMAL))
-        self.tag_configure("undetermined_text", foreground=Colors.WARNING, font=Fonts.get_mono(Fonts.SIZE_NORMAL))
-        self.tag_configure("step", foreground=Colors.TEXT_SECONDARY, font=Fonts.get_mono(Fonts.SIZE_NORMAL))
-        self.tag_configure("formal", foreground=Colors.MAUVE, font=Fonts.get_mono(Fonts.SIZE_SMALL))
-        self.tag_configure("separator", foreground=Colors.BORDER, font=Fonts.get_mono(Fonts.SIZE_SMALL))
-        self.tag_configure("conclusion", foreground=Colors.LAVENDER, font=Fonts.get_sans_bold(Fonts.SIZE_MEDIUM))
-        self.tag_configure("info", foreground=Colors.SAPPHIRE, font=Fonts.get_sans(Fonts.SIZE_NORMAL))
+        # (text, tag) segments buffered by batch(), or None outside it
+        self._segments = None
+        self._replace = False
+
+        for tag_name, config in self.TAGS.items():
+            self.tag_configure(tag_name, **config)
 
     def append(self, text, tag=None):
         """Append text with an optional tag."""
+        if self._segments is not None:
+            self._segments.append((text, tag))
+            return
         self.configure(state="normal")
         if tag:
             self.insert("end", text, tag)
@@ -385,9 +556,54 @@ class ReasoningText(tk.Text):
 
     def clear(self):
         """Clear all text."""
+        if self._segments is not None:
+            self._segments.clear()
+            self._replace = True
+            return
+        self.configure(state="normal")
+        self.delete("1.0", "end")
+        self.configure(state="disabled")
+
+    def bulk_write(self, segments):
+        """
+        Replace the text with (text, tag) segments, written by a
+        single insert call.
+        """
         self.configure(state="normal")
         self.delete("1.0", "end")
+        self._insert_segments(segments)
         self.configure(state="disabled")
+        self.mark_set("insert", "1.0")
+        self.see("1.0")
+
+    def _insert_segments(self, segments):
+        # Text insert takes any number of "chars tagList" pairs, so each
+        # run of equally tagged segments becomes one pair of one call.
+        args = []
+        for tag, run in groupby(segments, key=itemgetter(1)):
+            args.append("".join(text for text, _ in run))
+            args.append(tag or ())
+        if args:
+            self.insert("end", *args)
+
+    @contextmanager
+    def batch(self):
+        """
+        Buffer clear/append calls and write them out in one go on exit:
+        with bulk_write after a clear, otherwise appended at the end.
+        """
+        self._segments = []
+        self._replace = False
+        try:
+            yield self
+        finally:
+            segments, self._segments = self._segments, None
+            if self._replace:
+                self.bulk_write(segments)
+            elif segments:
+                self.configure(state="normal")
+                self._insert_segments(segments)
+                self.configure(state="disabled")
 
 
 class StatusBar(tk.Frame):
@@ -401,7 +617,7 @@ class StatusBar(tk.Frame):
         self.status_label = tk.Label(
             self,
             text="Ready",
-            font=Fonts.get_sans(Fonts.SIZE_SMALL),
+            font=_SANS_SMALL,
             fg=Colors.TEXT_MUTED,
             bg=Colors.BG_OVERLAY,
             anchor="w",
@@ -413,7 +629,7 @@ class StatusBar(tk.Frame):
         self.info_label = tk.Label(
             self,
             text="",
-            font=Fonts.get_sans(Fonts.SIZE_SMALL),
+            font=_SANS_SMALL,
             fg=Colors.TEXT_MUTED,
             bg=Colors.BG_OVERLAY,
             anchor="e",